@@ -0,0 +1,137 @@
+"""
+Benchmark BuckCR2.get_buck_mirror_ctl against the original per-sample loop,
+which is reproduced here, and check that both give identical results.
+
+Usage:
+    python benchmarks/bench_buck.py [hours]
+"""
+import sys
+import timeit
+
+import numpy as np
+
+from ppodd.pod.p_buck import BuckCR2
+
+
+def legacy_mirror_ctl(buck_mirr_temp):
+    """The original per-sample implementation of get_buck_mirror_ctl."""
+    interval = 30
+    recovery = 0
+    mirrormin = 0
+    mirrormax = 0
+    DTmax = 0
+    DTmin = 0
+    DT = 0
+    timing = 0
+
+    buck_mirror_control = np.zeros(buck_mirr_temp.size, dtype=int)-9999
+    for i in range(interval+1, buck_mirr_temp.size-interval-1):
+        DT = np.mean(
+            buck_mirr_temp[i:i+interval] - buck_mirr_temp[i-1:i+interval-1]
+        )
+
+        if buck_mirr_temp[i] < 220:
+            DTmax = 1 / (220 * 0.0172438 - 3.6602) * 0.5
+        else:
+            DTmax = 1 / (buck_mirr_temp[i] * 0.0172438 - 3.6602) * 0.5
+
+        if buck_mirr_temp[i] > 290:
+            DTmin = 1 / (290 * 0.041044 - 12.232) * 0.5
+        else:
+            DTmin = 1 / (buck_mirr_temp[i] * 0.041044 - 12.232) * 0.5
+
+        buck_mirror_control[i] = 2
+
+        # Make a first cut at guessing the mirror state -
+        #   0=water (above 273K),
+        #   1=ice (when the mirror has been cold and then not above zero)
+        #   2=not known.
+        # these will be used to calculate the uncertainty
+        # owing to mirror state.
+        if buck_mirr_temp[i] > 273.15:
+            buck_mirror_control[i] = 0
+
+        if buck_mirr_temp[i] < 243.15:
+            mirrormin = 1
+            mirrormax = 1
+
+        if buck_mirr_temp[i] > 273.15:
+            timing = 0
+        else:
+            timing += 1
+
+        if buck_mirr_temp[i] > 243.15:
+            if mirrormin > 0:
+                if buck_mirr_temp[i] < 273.15:
+                    mirrormax = 1
+                else:
+                    mirrormin = 0
+                    mirrormax = 0
+
+        if mirrormin > 0:
+            if mirrormax > 0:
+                buck_mirror_control[i] = 1
+            else:
+                buck_mirror_control[i] = 2
+
+        if timing > 600:
+            buck_mirror_control[i] = 1
+
+        # If Mirror Delta T outside acceptable range then flag as 3.
+        # Start an 80s counter (320 4hz cycles)(recovery) following flag,
+        # and only unflag when this has expired
+
+        if DT > DTmax:
+            buck_mirror_control[i] = 3
+            recovery = 80
+        else:
+            if recovery > 0:
+                buck_mirror_control[i] = 3
+                recovery -= 1
+
+        if DT < DTmin:
+            buck_mirror_control[i] = 3
+            recovery = 80
+        else:
+            if recovery > 0:
+                buck_mirror_control[i] = 3
+                recovery -= 1
+
+    return buck_mirror_control
+
+
+def mirror_temperature(n, seed=0):
+    """
+    Synthetic 1 Hz mirror temperatures, wandering through the water and ice
+    regimes, with occasional steps and gaps.
+    """
+    rng = np.random.default_rng(seed)
+    temp = 260 + np.cumsum(rng.normal(0, 0.3, n))
+    temp = 255 + 30 * np.sin(np.linspace(0, 20, n)) + (temp - temp.mean()) / 10
+    temp[rng.integers(0, n, n // 1000)] += 10
+    temp[rng.random(n) < 0.001] = np.nan
+    return temp
+
+
+def main(hours=5):
+    temp = mirror_temperature(int(hours * 3600))
+
+    new = BuckCR2.get_buck_mirror_ctl(None, temp)
+    old = legacy_mirror_ctl(temp)
+    if not np.array_equal(new, old):
+        raise AssertionError('Mirror control differs from the legacy loop')
+
+    t_old = min(timeit.repeat(lambda: legacy_mirror_ctl(temp), number=1,
+                              repeat=3))
+    t_new = min(timeit.repeat(
+        lambda: BuckCR2.get_buck_mirror_ctl(None, temp), number=1, repeat=5
+    ))
+
+    print('get_buck_mirror_ctl, {} samples'.format(temp.size))
+    print('  legacy loop: {:10.4f} s'.format(t_old))
+    print('  vectorised:  {:10.4f} s'.format(t_new))
+    print('  speedup:     {:10.1f} x'.format(t_old / t_new))
+
+
+if __name__ == '__main__':
+    main(*[float(i) for i in sys.argv[1:]])
@@ -0,0 +1,109 @@
+"""
+Benchmark ppodd.utils.winds.wind_vector against the original einsum based
+wind calculation, which is reproduced here, and check that both give
+identical results.
+
+Usage:
+    python benchmarks/bench_winds.py [hours]
+"""
+import sys
+import timeit
+
+import numpy as np
+
+from ppodd.utils.winds import wind_vector
+
+MATMUL = 'ij...,jk...->ik...'
+DOT = 'ij...,j...->i...'
+
+
+def legacy_winds(vn, ve, vz, r, th, ph, rdot, thdot, phdot, tas, alpha, beta,
+                 l):
+    """The original wind calculation, from p_winds and p_turbwinds."""
+    n = len(r)
+
+    A1 = np.array([
+        [np.ones(n), np.zeros(n), np.zeros(n)],
+        [np.zeros(n), np.cos(r), -np.sin(r)],
+        [np.zeros(n), np.sin(r), np.cos(r)]
+    ])
+
+    A2 = np.array([
+        [np.cos(th), np.zeros(n), -np.sin(th)],
+        [np.zeros(n), np.ones(n), np.zeros(n)],
+        [np.sin(th), np.zeros(n), np.cos(th)]
+    ])
+
+    A3 = np.array([
+        [np.cos(ph), np.sin(ph), np.zeros(n)],
+        [-np.sin(ph), np.cos(ph), np.zeros(n)],
+        [np.zeros(n), np.zeros(n), np.ones(n)]
+    ])
+
+    V = np.array([vn, ve, vz])
+
+    R = np.einsum(MATMUL, np.einsum(MATMUL, A3, A2), A1)
+
+    tas_p = tas / (1 + np.tan(beta)**2 + np.tan(alpha)**2)**.5
+    TAS = np.array([-tas_p, -tas_p * np.tan(beta), tas_p * np.tan(alpha)])
+    TASR = np.einsum(DOT, R, TAS)
+
+    LEV_L1 = np.array([np.zeros(n), np.zeros(n), -phdot])
+    LEV_L2 = np.einsum(
+        DOT, A3, np.array([np.zeros(n), -thdot, np.zeros(n)])
+    )
+    LEV_L3 = np.einsum(
+        DOT, np.einsum(MATMUL, A3, A2),
+        np.array([rdot, np.zeros(n), np.zeros(n)])
+    )
+
+    LEV_L = LEV_L1 + LEV_L2 + LEV_L3
+    LEV_R = np.einsum(DOT, R, l)
+    LEV = np.cross(LEV_L.T, LEV_R.T).T
+
+    return V + TASR + LEV
+
+
+def winds_inputs(n, seed=0):
+    """
+    Synthetic single precision 32 Hz GIN and turbulence probe inputs, with
+    angles in radians, and occasional gaps.
+    """
+    rng = np.random.default_rng(seed)
+
+    def _series(mean, sd):
+        _x = (mean + rng.normal(0, sd, n)).astype(np.float32)
+        _x[rng.random(n) < 0.001] = np.nan
+        return _x
+
+    return [
+        _series(100, 10), _series(0, 10), _series(0, 1),
+        np.deg2rad(_series(0, 10)), np.deg2rad(_series(3, 2)),
+        np.deg2rad(_series(90, 90)), np.deg2rad(_series(0, 2)),
+        np.deg2rad(_series(0, 2)), np.deg2rad(_series(0, 2)),
+        _series(120, 10), np.deg2rad(_series(4, 2)),
+        np.deg2rad(_series(0, 1)), [16, -1, -.5]
+    ]
+
+
+def main(hours=1):
+    args = winds_inputs(int(hours * 3600 * 32))
+
+    new = wind_vector(*args)
+    old = legacy_winds(*args)
+    if not np.array_equal(new, old, equal_nan=True):
+        raise AssertionError('Winds differ from the legacy calculation')
+
+    t_old = min(timeit.repeat(lambda: legacy_winds(*args), number=1,
+                              repeat=3))
+    t_new = min(timeit.repeat(lambda: wind_vector(*args), number=1,
+                              repeat=3))
+
+    print('wind_vector, {} samples'.format(args[0].size))
+    print('  legacy einsum: {:10.4f} s'.format(t_old))
+    print('  fused kernel:  {:10.4f} s'.format(t_new))
+    print('  speedup:       {:10.1f} x'.format(t_old / t_new))
+
+
+if __name__ == '__main__':
+    main(*[float(i) for i in sys.argv[1:]])
@@ -1,11 +1,16 @@
 import collections
+import collections.abc
 import datetime
 import gc
 import glob
 import importlib
+import io
 import sys
 import re
 import os
+import struct
+import types
+import zipfile
 
 from pydoc import locate
 
@@ -20,10 +25,51 @@ from .attributes import AttributesCollection, Attribute
 from .flags import DecadesClassicFlag
 from ..standard import faam_globals, faam_attrs
 from ..utils import pd_freq, infer_freq
+from ..utils.plugins import Plugin
 from ..writers import NetCDFWriter
 
+# Matches directives, of the form <action args>, in global attributes
+DIRECTIVE_REGEX = re.compile('<(?P<action>[a-z]+) (?P<value>.+)>')
+
+# The fixed length part of a zip local file header: signature, versions,
+# flags, compression, time, date, crc, sizes, and the lengths of the file name
+# and extra field which follow it
+ZIP_LOCAL_HEADER = struct.Struct('<4s2B4HL2L2H')
+ZIP_LOCAL_SIGNATURE = b'PK\x03\x04'
+
+
+def _get_plugins(package, attr):
+    """
+    Get the plugins in a plugin package, from its manifest if available, so
+    that plugin modules are not imported until they are required. Packages
+    without a manifest are imported in full.
+
+    Args:
+        package: the name of the plugin package.
+        attr: the package attribute listing plugin classes, used if the
+              package does not provide get_manifest().
+
+    Returns:
+        a list of ppodd.utils.plugins.Plugin.
+    """
+    _package = importlib.import_module(package)
+
+    try:
+        return list(_package.get_manifest())
+    except AttributeError:
+        return [Plugin.from_class(i) for i in getattr(_package, attr)]
+
 
 class DecadesFile(object):
+    """
+    A file on disk to be read by a FileReader. Readers should access file
+    contents through open() or buffer(), rather than the filepath, so that
+    files which do not exist on disk (e.g. zip members) can be read.
+    """
+
+    # True if filepath refers to a file on disk
+    on_disk = True
+
     def __init__(self, filepath):
         self.filepath = filepath
 
@@ -32,31 +78,131 @@ class DecadesFile(object):
             self.__class__.__name__, self.filepath
         )
 
+    def open(self, mode='rb'):
+        """
+        Open the file.
 
-class DecadesVariable(object):
+        Kwargs:
+            mode: the mode to open the file in, either 'rb' (default) or 'r'.
 
-    def __init__(self, *args, **kwargs):
-        _flag = kwargs.pop('flag', DecadesClassicFlag)
-        _standard = kwargs.pop('standard', 'ppodd.standard.core')
-        _standard_version = kwargs.pop('standard_version', 1.0)
+        Returns:
+            a file object.
+        """
+        return open(self.filepath, mode)
 
-        self.attrs = AttributesCollection(
-            dataset=self, definition='.'.join((_standard, 'variable_attrs')),
-            version=_standard_version
+    def buffer(self):
+        """
+        Return the contents of the file as a read-only buffer. For files on
+        disk this is a memory map, so the file is not read into memory.
+
+        Returns:
+            a bytes-like object.
+        """
+        if not os.path.getsize(self.filepath):
+            return b''
+        return np.memmap(self.filepath, dtype=np.uint8, mode='r')
+
+    def close(self):
+        """
+        Release any resources held by the file, once it has been read.
+        """
+
+
+class ZipMemberFile(DecadesFile):
+    """
+    A member of a zip archive, which may be read without extracting it from
+    the archive. Stored (uncompressed) members are memory mapped directly
+    from the archive. Compressed members are inflated into memory when their
+    buffer is first requested, and held only until the file is closed, once
+    it has been read.
+    """
+
+    on_disk = False
+
+    def __init__(self, archive, info):
+        """
+        Initialize a class instance.
+
+        Args:
+            archive: the path to the zip archive.
+            info: the zipfile.ZipInfo describing the member.
+        """
+        super().__init__(os.path.join(archive, info.filename))
+        self.archive = archive
+        self.info = info
+        self._data = None
+
+    @property
+    def stored(self):
+        """
+        True if the member is stored uncompressed and unencrypted, in which
+        case it can be memory mapped directly from the archive.
+        """
+        return (
+            self.info.compress_type == zipfile.ZIP_STORED
+            and not self.info.flag_bits & 0x1
         )
 
-        self.name = kwargs.pop('name', None)
-        self.write = kwargs.pop('write', True)
+    def _data_offset(self):
+        """
+        Return the offset of the member data in the archive, from the member's
+        local file header.
+        """
+        with open(self.archive, 'rb') as f:
+            f.seek(self.info.header_offset)
+            header = f.read(ZIP_LOCAL_HEADER.size)
 
-        _attrs = self.attrs.REQUIRED_ATTRIBUTES + self.attrs.OPTIONAL_ATTRIBUTES
-        for _attr in _attrs:
-            try:
-                _default = self.attrs._definition[_attr]['default']
-            except KeyError:
-                _default = None
-            _val = kwargs.pop(_attr, _default)
-            if _val is not None:
-                self.attrs.add(Attribute(_attr, _val))
+        if len(header) != ZIP_LOCAL_HEADER.size:
+            raise zipfile.BadZipFile(
+                'Truncated local header for {}'.format(self.info.filename)
+            )
+
+        fields = ZIP_LOCAL_HEADER.unpack(header)
+        if fields[0] != ZIP_LOCAL_SIGNATURE:
+            raise zipfile.BadZipFile(
+                'Bad local header for {}'.format(self.info.filename)
+            )
+
+        # The header is followed by the file name and extra field, whose
+        # lengths are its last two fields
+        return (
+            self.info.header_offset + ZIP_LOCAL_HEADER.size
+            + fields[-2] + fields[-1]
+        )
+
+    def buffer(self):
+        if self._data is not None:
+            return self._data
+
+        if not self.info.file_size:
+            return b''
+
+        if self.stored:
+            return np.memmap(
+                self.archive, dtype=np.uint8, mode='r',
+                offset=self._data_offset(), shape=(self.info.file_size,)
+            )
+
+        with zipfile.ZipFile(self.archive) as zfile:
+            self._data = zfile.read(self.info)
+
+        return self._data
+
+    def open(self, mode='rb'):
+        _file = io.BytesIO(self.buffer())
+        if mode == 'r':
+            return io.TextIOWrapper(_file)
+        return _file
+
+    def close(self):
+        self._data = None
+
+
+class DecadesVariable(object):
+
+    def __init__(self, *args, **kwargs):
+        _flag = kwargs.pop('flag', DecadesClassicFlag)
+        self._init_attrs(kwargs)
 
         _df = pd.DataFrame(*args, **kwargs)
         _freq = self._get_freq(df=_df)
@@ -69,20 +215,100 @@ class DecadesVariable(object):
         if self.name is None:
             self.name = _df.columns[0]
 
-        if len(_df.index) != len(_df.index.unique()):
-            _df = _df.groupby(_df.index).last()
+        if _df.index.equals(_index):
+            # Data are already on a regular grid, so no need to reindex
+            _values = _df.values
+        else:
+            if len(_df.index) != len(_df.index.unique()):
+                _df = _df.groupby(_df.index).last()
 
-        self.array = self._downcast(np.array(
-            _df.reindex(
+            _values = _df.reindex(
                 _index, tolerance=_freq, method='nearest', limit=1
-            ).values.flatten()
-        ))
+            ).values
+
+        self.array = self._downcast(np.array(_values.flatten()))
 
         self.t0 = _index[0]
         self.t1 = _index[-1]
         self.flag = _flag(self)
         self.attrs.add(Attribute('ancillary_variables', f'{self.name}_FLAG'))
 
+    @classmethod
+    def from_array(cls, array, index, **kwargs):
+        """
+        Create a variable from a 1D array and a DatetimeIndex. If the index is
+        already a regular grid at the variable frequency, the array is used
+        directly, without building an intermediate DataFrame.
+
+        Args:
+            array: a 1D array of data.
+            index: a pd.DatetimeIndex, the length of array.
+
+        Kwargs:
+            name: the name of the variable. Required.
+            frequency: the frequency of the variable. If not given, or the
+                       index is not regular at this frequency, the variable
+                       is created as DecadesVariable({name: array}, ...).
+            Further keywords are handled as in DecadesVariable.
+
+        Returns:
+            a DecadesVariable.
+        """
+        try:
+            _period = pd.Timedelta(pd_freq[kwargs['frequency']]).value
+        except KeyError:
+            _period = None
+
+        _times = index.asi8
+        if (
+            _period is None or not len(_times)
+            or np.any(np.diff(_times) != _period)
+        ):
+            return cls({kwargs.get('name'): array}, index=index, **kwargs)
+
+        _flag = kwargs.pop('flag', DecadesClassicFlag)
+
+        self = cls.__new__(cls)
+        self._init_attrs(kwargs)
+
+        self.array = self._downcast(np.array(array))
+        self.t0 = index[0]
+        self.t1 = index[-1]
+        self.flag = _flag(self)
+        self.attrs.add(Attribute('ancillary_variables', f'{self.name}_FLAG'))
+
+        return self
+
+    def _init_attrs(self, kwargs):
+        """
+        Initialise the attributes collection of the variable, along with its
+        name and write status. Any keywords consumed here are popped from
+        kwargs.
+
+        Args:
+            kwargs: the keyword arguments passed to the variable constructor.
+        """
+        _standard = kwargs.pop('standard', 'ppodd.standard.core')
+        _standard_version = kwargs.pop('standard_version', 1.0)
+
+        self.attrs = AttributesCollection(
+            dataset=self, definition='.'.join((_standard, 'variable_attrs')),
+            version=_standard_version
+        )
+
+        self.name = kwargs.pop('name', None)
+        self.write = kwargs.pop('write', True)
+
+        _attrs = self.attrs.REQUIRED_ATTRIBUTES + self.attrs.OPTIONAL_ATTRIBUTES
+        for _attr in _attrs:
+            try:
+                _default = self.attrs._definition[_attr]['default']
+            except KeyError:
+                _default = None
+            _val = kwargs.pop(_attr, _default)
+            if _val is not None:
+                self.attrs.add(Attribute(_attr, _val))
+
     def __call__(self):
         i = pd.date_range(
             start=self.t0, end=self.t1,
@@ -207,6 +433,11 @@ class DecadesVariable(object):
         loc = (_df.index >= start) & (_df.index <= end)
         trimmed = _df.loc[loc]
         self.array = trimmed.values.flatten()
+
+        if trimmed.empty:
+            self.t1 = self.t0 - pd.Timedelta(self._get_freq())
+            return
+
         self.t0 = trimmed.index[0]
         self.t1 = trimmed.index[-1]
 
@@ -243,8 +474,9 @@ class DecadesDataset(object):
 
         self._date = date
         self.readers = []
+        self._readers_by_class = {}
         self.definitions = []
-        self.constants = {}
+        self.constants = collections.ChainMap({})
         self._variable_mods = {}
         self._flag_mods = {}
         self._mod_exclusions = []
@@ -270,6 +502,18 @@ class DecadesDataset(object):
         self._trim = False
         self._standard = standard
         self.allow_overwrite = False
+
+        # An optional (start, end) tuple, usually given to load(). Readers
+        # which support it will only read data within this window.
+        self.time_window = None
+
+        # Output variables requested through load() or process(), and the
+        # variables, and raw inputs, required to produce them. None if all
+        # modules are to be run.
+        self._targets = None
+        self._target_variables = None
+        self._required_inputs = None
+
         self._backend = backend()
 
     def __getitem__(self, item):
@@ -392,8 +636,8 @@ class DecadesDataset(object):
         call on that data. The final attribute may be a serializable literal,
         or a callable which resolves to one.
 
-        Dictionaries may be passed as values; these will be recursively
-        flattened.
+        Dictionaries, or other mappings, may be passed as values; these will
+        be recursively flattened.
 
         Args:
             key: the name of the global attribute to add
@@ -401,7 +645,7 @@ class DecadesDataset(object):
         """
 
         # Recursively flatten any dictionaries passed as values
-        if type(value) is dict:
+        if isinstance(value, collections.abc.Mapping):
             for _key, _val in value.items():
                 _key = '{}_{}'.format(key, _key)
                 self.add_global(_key, _val)
@@ -409,8 +653,7 @@ class DecadesDataset(object):
 
         # See if the value passed is a directive
         try:
-            rex = re.compile('<(?P<action>[a-z]+) (?P<value>.+)>')
-            result = rex.search(value)
+            result = DIRECTIVE_REGEX.search(value)
         except TypeError:
             result = None
 
@@ -452,14 +695,13 @@ class DecadesDataset(object):
 
     @staticmethod
     def infer_reader(dfile):
-        from ppodd.readers import reader_patterns
-        _filename = os.path.basename(dfile.filepath)
+        from ppodd.readers import match_reader
+        _reader = match_reader(os.path.basename(dfile.filepath))
 
-        for pattern in reader_patterns:
-            if re.fullmatch(pattern, _filename):
-                return reader_patterns[pattern]
+        if _reader is None:
+            print('No reader found for {}'.format(dfile))
 
-        print('No reader found for {}'.format(dfile))
+        return _reader
 
     def add_definition(self, definition):
         self.definitions.append(definition)
@@ -467,6 +709,38 @@ class DecadesDataset(object):
     def add_constant(self, name, data):
         self.constants[name] = data
 
+    def add_constants(self, constants):
+        """
+        Add a mapping of constants to the dataset. The mapping is not copied,
+        but added as a read-only view, which takes precedence over any
+        constants previously added.
+
+        Args:
+            constants: a mapping of constant names to values.
+        """
+        view = types.MappingProxyType(constants)
+
+        for key in view:
+            self.constants.maps[0].pop(key, None)
+
+        self.constants.maps.insert(1, view)
+
+    def requires(self, name):
+        """
+        Check whether a raw variable is required. Readers should use this to
+        avoid decoding variables which are not required.
+
+        Args:
+            name: the name of the variable.
+
+        Returns:
+            True if the variable is required, or if no required variables
+            have been given to load().
+        """
+        if self._required_inputs is None:
+            return True
+        return name in self._required_inputs
+
     def add_input(self, variable):
         """
         Add a new DecadesVariable to this DecadesDataset. If the variable
@@ -476,6 +750,8 @@ class DecadesDataset(object):
         args:
             variable: the DecadesVariable to add to this DecadesDataset.
         """
+        if not self.requires(variable.name):
+            return
 
         self._backend.add_input(variable)
 
@@ -517,10 +793,10 @@ class DecadesDataset(object):
         returns:
             The reader of type cls, if such a reader exists.
         """
-        for reader in self.readers:
-            if reader.__class__ == cls:
-                return reader
-        raise ValueError
+        try:
+            return self._readers_by_class[cls]
+        except KeyError:
+            raise ValueError
 
     def add_decades_file(self, dfile):
         """
@@ -554,7 +830,8 @@ class DecadesDataset(object):
         if reader is None:
             raise ValueError
 
-        if reader not in self.readers:
+        if reader.__class__ not in self._readers_by_class:
+            self._readers_by_class[reader.__class__] = reader
             self.readers.append(reader)
             self.readers.sort(key=lambda r: r.level)
 
@@ -580,19 +857,44 @@ class DecadesDataset(object):
         kwargs:
             file_type: the file type to pass to DecadesFile
         """
-        print('adding {}'.format(filename))
         try:
             self.add_decades_file(DecadesFile(filename))
         except ValueError:
             print('failed to add {}'.format(filename))
 
-    def load(self):
+    def load(self, targets=None, required=None, time_window=None):
         """
         Load all of the data from files associated with readers in this
         dataset.
+
+        Kwargs:
+            targets: an optional list of output variable names. If given, only
+                     the raw inputs required by the processing modules needed
+                     to produce these variables are read, and only those
+                     modules will be run by process().
+            required: an optional list of raw variable names to read, in
+                      addition to those required by targets. Readers skip
+                      decoding any other variables.
+            time_window: an optional (start, end) tuple of times. Readers
+                         which support it only read data within this window.
         """
-        import ppodd.qa
-        import ppodd.flags
+        if time_window is not None:
+            self.time_window = tuple(time_window)
+
+        if targets is not None:
+            self._set_targets(targets)
+
+        if required is not None and (
+            targets is None or self._required_inputs is not None
+        ):
+            if self._required_inputs is None:
+                self._required_inputs = set()
+            self._required_inputs |= set(required)
+
+        if self._required_inputs is not None:
+            # The weight on wheels flag is always kept, as it's used to
+            # determine takeoff and landing times
+            self._required_inputs.add('PRTAFT_wow_flag')
 
         for reader in self.readers:
             try:
@@ -600,23 +902,17 @@ class DecadesDataset(object):
             except Exception as e:
                 print(f'Error in reading module {reader}')
                 print(str(e))
+
+            for _file in reader.files:
+                _file.close()
+
             del reader
 
         self.readers = None
+        self._readers_by_class = {}
         gc.collect()
 
-        self.qa_modules = [qa(self) for qa in ppodd.qa.qa_modules]
-
-        # Initialise postprocessing modules
-        _pp_modules = []
-        for pp in importlib.import_module(self.pp_plugins).pp_modules:
-            try:
-                _pp_modules.append(pp(self))
-            except Exception as e:
-                print('Couldn\'t init {}: {}'.format(pp, str(e)))
-        self.pp_modules = collections.deque(_pp_modules)
-
-        self.flag_modules = [flag(self) for flag in ppodd.flags.flag_modules]
+        self._init_modules()
 
         self._interpolate_globals()
 
@@ -670,13 +966,243 @@ class DecadesDataset(object):
 
         return self._landing_time
 
+    def _get_pp_modules(self):
+        """
+        Get the postprocessing modules to run. Modules with inputs given in
+        the plugin manifest are returned as Plugins, and are only imported and
+        initialised when they are ready to run. Other modules are imported
+        and initialised here.
+
+        Returns:
+            a list of Plugins and initialised postprocessing modules.
+        """
+        _pp_modules = []
+        for pp in _get_plugins(self.pp_plugins, 'pp_modules'):
+            if pp.inputs is not None:
+                _pp_modules.append(pp)
+                continue
+
+            try:
+                _pp_modules.append(pp.load()(self))
+            except Exception as e:
+                print('Couldn\'t init {}: {}'.format(pp, str(e)))
+
+        return _pp_modules
+
+    @staticmethod
+    def _static_inputs(plugin):
+        """
+        Get the inputs of a plugin without initialising it: the inputs given
+        in the plugin manifest or, failing that, the names in the test data
+        of the plugin class, which must include every input.
+
+        Args:
+            plugin: a ppodd.utils.plugins.Plugin.
+
+        Returns:
+            a list of variable names, or None if these cannot be determined.
+        """
+        if plugin.inputs is not None:
+            return plugin.inputs
+
+        try:
+            _test = plugin.load().test
+            if callable(_test):
+                _test = _test()
+            return list(_test.keys())
+        except Exception:
+            return None
+
+    def _resolve_targets(self, targets, static=False):
+        """
+        Find the processing modules required to produce a list of output
+        variables: the modules which produce the targets and, transitively,
+        the modules which produce their inputs. Where several modules
+        declare the same output, all of them are required, as which of them
+        can run depends on the data available.
+
+        Modules whose outputs are not given in the plugin manifest are
+        initialised here to determine their declared outputs, which may
+        depend on the data available, so this should only be done once the
+        data have been read. Before then, static should be given.
+
+        Args:
+            targets: a list of variable names.
+
+        Kwargs:
+            static: if True, use only the plugin manifests, and don't
+                    initialise any modules. Modules whose outputs are not
+                    given in the manifest are then assumed to be required,
+                    along with everything required to produce their inputs.
+
+        Returns:
+            a 3-tuple (modules, variables, raw). modules is a list of required
+            modules, as Plugins or initialised modules, in the order they
+            would otherwise run. variables is a set of all of the variables
+            produced or consumed by those modules, and the targets. raw is
+            the subset of variables not produced by any module, i.e. those
+            which must be read from file or given as constants. If static is
+            True, and the inputs of a module with unknown outputs can't be
+            determined, raw is None.
+        """
+        modules = []
+        producers = {}
+        inputs = {}
+        required = set()
+        pending = list(targets)
+
+        if static:
+            _mods = _get_plugins(self.pp_plugins, 'pp_modules')
+        else:
+            _mods = self._get_pp_modules()
+
+        for mod in _mods:
+            if static:
+                inputs[id(mod)] = self._static_inputs(mod)
+                if mod.outputs is None:
+                    # Outputs can't be known until the data are read, so the
+                    # module may be required
+                    required.add(id(mod))
+                    pending += inputs[id(mod)] or []
+                    modules.append(mod)
+                    continue
+
+            elif isinstance(mod, Plugin) and mod.outputs is None:
+                try:
+                    mod = mod.load()(self)
+                except Exception as e:
+                    print('Couldn\'t init {}: {}'.format(mod, str(e)))
+                    continue
+
+            if isinstance(mod, Plugin):
+                outputs = mod.outputs
+            else:
+                outputs = mod.declarations
+
+            inputs.setdefault(id(mod), mod.inputs)
+            modules.append(mod)
+            for output in outputs:
+                producers.setdefault(output, []).append(mod)
+
+        variables = set()
+        raw = set()
+
+        while pending:
+            var = pending.pop()
+            if var in variables:
+                continue
+            variables.add(var)
+
+            try:
+                _producers = producers[var]
+            except KeyError:
+                raw.add(var)
+                continue
+
+            for mod in _producers:
+                if id(mod) not in required:
+                    required.add(id(mod))
+                    pending += inputs[id(mod)] or []
+
+        modules = [i for i in modules if id(i) in required]
+
+        if any(inputs[id(i)] is None for i in modules):
+            raw = None
+
+        return modules, variables, raw
+
+    def _set_targets(self, targets):
+        """
+        Restrict loading and processing to the raw inputs and modules
+        required to produce a given list of output variables.
+
+        Args:
+            targets: a list of variable names.
+        """
+        # No data have been read yet, so modules are resolved from the plugin
+        # manifests only, and again, in full, once the data have been read.
+        modules, variables, raw = self._resolve_targets(targets, static=True)
+
+        self._targets = list(targets)
+        self._target_variables = variables
+        self._required_inputs = raw
+
+        if raw is None:
+            print('Inputs of some modules are unknown, reading all inputs')
+
+        print('Targets {} require modules: {}'.format(
+            ', '.join(self._targets), ', '.join(str(i) for i in modules)
+        ))
+
+    def _init_modules(self, targets=None):
+        """
+        Initialise the processing, QA and flagging modules to be run. If
+        output targets have been set, only the processing modules required
+        to produce them, and the QA and flagging modules whose inputs are all
+        produced or consumed by those modules, are included.
+
+        Kwargs:
+            targets: an optional list of output variable names, overriding
+                     any targets previously given to load().
+        """
+        if targets is None:
+            targets = self._targets
+
+        qa_modules = _get_plugins('ppodd.qa', 'qa_modules')
+        flag_modules = _get_plugins('ppodd.flags', 'flag_modules')
+
+        if targets is None:
+            self.qa_modules = qa_modules
+            self.pp_modules = collections.deque(self._get_pp_modules())
+            self.flag_modules = flag_modules
+            return
+
+        pp_modules, variables, _ = self._resolve_targets(targets)
+
+        self._targets = list(targets)
+        self._target_variables = variables
+
+        def _wanted(plugin):
+            if plugin.inputs is None:
+                _inputs = plugin.load().inputs
+            else:
+                _inputs = plugin.inputs
+            return all(i in self._target_variables for i in _inputs)
+
+        self.qa_modules = [i for i in qa_modules if _wanted(i)]
+        self.pp_modules = collections.deque(pp_modules)
+        self.flag_modules = [i for i in flag_modules if _wanted(i)]
+
+    def _plugin_ready(self, plugin):
+        """
+        Check whether the inputs of a (not yet initialised) plugin are
+        available, as PPBase.ready().
+
+        Args:
+            plugin: a ppodd.utils.plugins.Plugin, with known inputs.
+
+        Returns:
+            a 2-tuple of (ready, missing), where missing is a list of missing
+            inputs, or None.
+        """
+        _available = set(self.variables) | set(self.constants.keys())
+        _missing_variables = [i for i in plugin.inputs if i not in _available]
+
+        if _missing_variables:
+            return False, _missing_variables
+
+        return True, None
+
     def _get_required_data(self):
         _required_inputs = []
         for mod in self.pp_modules:
             _required_inputs += mod.inputs
 
         for qa in self.qa_modules:
-            _required_inputs += qa.inputs
+            if qa.inputs is None:
+                _required_inputs += qa.load().inputs
+            else:
+                _required_inputs += qa.inputs
 
         for var in self.variables:
             try:
@@ -693,6 +1219,13 @@ class DecadesDataset(object):
                 # Likely an output modifier
                 pass
 
+        if self._target_variables is not None:
+            # Raw inputs requested through load(), including the weight on
+            # wheels flag, are always kept
+            _keep = set(self._target_variables)
+            _keep |= set(self._required_inputs or ())
+            _required_inputs = [i for i in _required_inputs if i in _keep]
+
         _required_inputs = list(set(_required_inputs))
 
         return _required_inputs
@@ -707,11 +1240,20 @@ class DecadesDataset(object):
 
         gc.collect()
 
+    def _release_handles(self):
+        """
+        Close any file handles held open for lazily loaded inputs. Handles
+        are reopened if the inputs are subsequently accessed.
+        """
+        from ..readers.netcdf import handles
+        handles.release(self)
+
     def run_qa(self):
 
         while self.qa_modules:
             _mod = self.qa_modules.pop()
             try:
+                _mod = _mod.load()(self)
                 _mod.run()
                 del _mod
             except Exception as e:
@@ -723,6 +1265,7 @@ class DecadesDataset(object):
             _flag = self.flag_modules.pop()
             try:
                 print('running {}'.format(_flag))
+                _flag = _flag.load()(self)
                 _flag.flag()
                 del _flag
             except Exception as e:
@@ -736,20 +1279,24 @@ class DecadesDataset(object):
             self._backend.trim(start_cutoff, end_cutoff)
 
 
-    def process(self, modname=None):
+    def process(self, modname=None, targets=None):
         """
         Run processing modules.
-        """
-        import ppodd.qa
-        import ppodd.flags
 
+        Kwargs:
+            modname: the name of a single processing module to run.
+            targets: an optional list of output variable names. If given,
+                     only the processing modules required to produce these
+                     variables, and their upstream dependencies, are run.
+                     Defaults to any targets given to load().
+        """
         if self.trim:
             self._trim_data()
 
         if modname is not None:
-            mods = importlib.import_module(self.pp_plugins).pp_modules
-            for mod in mods:
-                if mod.__name__ is modname:
+            for plugin in _get_plugins(self.pp_plugins, 'pp_modules'):
+                if plugin.name == modname:
+                    mod = plugin.load()
                     _mod = mod(self)
                     _mod_ready, _missing = _mod.ready()
                     if _mod_ready:
@@ -761,20 +1308,10 @@ class DecadesDataset(object):
                              'inputs not available {}').format(
                                  mod.__name__, ','.join(_missing))
                         )
+            self._release_handles()
             return
 
-        self.qa_modules = [qa(self) for qa in ppodd.qa.qa_modules]
-
-        # Initialise postprocessing modules
-        _pp_modules = []
-        for pp in importlib.import_module(self.pp_plugins).pp_modules:
-            try:
-                _pp_modules.append(pp(self))
-            except Exception as e:
-                print('Couldn\'t init {}: {}'.format(pp, str(e)))
-        self.pp_modules = collections.deque(_pp_modules)
-
-        self.flag_modules = [flag(self) for flag in ppodd.flags.flag_modules]
+        self._init_modules(targets)
 
         self._backend.clear_outputs()
 
@@ -790,7 +1327,10 @@ class DecadesDataset(object):
 
             pp_module = self.pp_modules.popleft()
 
-            _mod_ready, _missing = pp_module.ready()
+            if isinstance(pp_module, Plugin):
+                _mod_ready, _missing = self._plugin_ready(pp_module)
+            else:
+                _mod_ready, _missing = pp_module.ready()
             if not _mod_ready:
                 print('{} not ready (missing {})'.format(
                     pp_module, ', '.join(_missing)
@@ -804,6 +1344,14 @@ class DecadesDataset(object):
                 module_ran = True
                 del pp_module
                 continue
+            if isinstance(pp_module, Plugin):
+                # Only import and initialise the module once it's ready
+                try:
+                    pp_module = pp_module.load()(self)
+                except Exception as e:
+                    print('Couldn\'t init {}: {}'.format(pp_module, str(e)))
+                    module_ran = True
+                    continue
             try:
                 print('Running {}'.format(pp_module))
                 pp_module.process()
@@ -833,8 +1381,14 @@ class DecadesDataset(object):
                 for key, value in self._variable_mods[name].items():
                     setattr(var, key, value)
 
+        self._release_handles()
+
     def write(self, *args, **kwargs):
-        self.writer(self).write(*args, **kwargs)
+        try:
+            self.writer(self).write(*args, **kwargs)
+        finally:
+            self._release_handles()
 
     def cleanup(self):
+        self._release_handles()
         self._backend.cleanup()
@@ -28,7 +28,7 @@ class DecadesFlagABC(object):
             var: the DecadesVariable that this flag is attached to.
         """
 
-        self._df = pd.DataFrame(index=range(len(var.data)),
+        self._df = pd.DataFrame(index=range(len(var)),
                                 dtype=np.dtype('int8'))
         self._var = var
         self.t0 = var.t0
@@ -296,12 +296,29 @@ class DecadesBitmaskFlag(DecadesFlagABC):
         self.descriptions[col_name] = description
 
     @classmethod
-    def from_nc_variable(cls, ncvar, decadesvar):
+    def from_nc_variable(cls, ncvar, decadesvar, data=None):
+        """
+        Create a flag from a netCDF flag variable.
+
+        Args:
+            ncvar: the netCDF4 flag variable.
+            decadesvar: the DecadesVariable the flag is associated with.
+
+        Kwargs:
+            data: the flag data. If not given, this is read in full from
+                  ncvar. Allows a subset of the flag variable to be used.
+
+        Returns:
+            a DecadesBitmaskFlag.
+        """
         flag = cls(decadesvar)
         masks = np.atleast_1d(ncvar.flag_masks)
         meanings = np.atleast_1d(ncvar.flag_meanings.split())
 
-        _data = ncvar[:].ravel().data
+        if data is None:
+            _data = ncvar[:].ravel().data
+        else:
+            _data = np.array(data)
         _flags = []
 
         for mask, meaning in zip(masks[::-1], meanings[::-1]):
@@ -1,31 +1,37 @@
-import os
-import re
 import importlib
 
-from .base import FlaggingBase
+from ppodd.utils.plugins import manifest
 
+from .base import FlaggingBase
 
-def load_flagging_modules():
-    pysearchre = re.compile('.py$', re.IGNORECASE)
 
-    flag_files = filter(
-        pysearchre.search,
-        os.listdir(os.path.dirname(__file__))
-    )
+def get_manifest():
+    """
+    Get the manifest of flagging modules in this package. The manifest is
+    built without importing the modules, which are imported only when
+    required.
 
-    flaggers = map(lambda f: '.' + os.path.splitext(f)[0], flag_files)
+    Returns:
+        a list of ppodd.utils.plugins.Plugin.
+    """
+    return manifest(__name__, 'FlaggingBase')
 
-    importlib.import_module('ppodd.flags')
 
+def load_flagging_modules():
     modules = []
-    for flagger in flaggers:
-        if not flagger.startswith('_'):
-            modules.append(
-                importlib.import_module(flagger, package='ppodd.flags')
-            )
+    for module in dict.fromkeys(i.module for i in get_manifest()):
+        modules.append(importlib.import_module(module))
 
     return modules
 
 
-load_flagging_modules()
-flag_modules = FlaggingBase.__subclasses__()
+def __getattr__(name):
+    # flag_modules is provided for compatibility, and requires all of the
+    # flagging modules to be imported.
+    if name == 'flag_modules':
+        load_flagging_modules()
+        return FlaggingBase.__subclasses__()
+
+    raise AttributeError(
+        'module {!r} has no attribute {!r}'.format(__name__, name)
+    )
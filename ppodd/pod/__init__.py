@@ -1,28 +1,28 @@
-import os
-import re
 import importlib
-import sys
 
 import numpy as np
 
+from ppodd.utils.plugins import manifest
+
 from .base import PPBase
 
-def load_plugins():
-    pysearchre = re.compile('.py$', re.IGNORECASE)
 
-    pluginfiles = filter(
-        pysearchre.search,
-        os.listdir(os.path.dirname(__file__))
-    )
+def get_manifest():
+    """
+    Get the manifest of postprocessing modules in this package. The manifest
+    is built without importing the modules, which are imported only when
+    required.
 
-    plugins = map(lambda f: '.' + os.path.splitext(f)[0], pluginfiles)
+    Returns:
+        a list of ppodd.utils.plugins.Plugin.
+    """
+    return manifest(__name__, 'PPBase')
 
-    importlib.import_module('ppodd.pod')
 
+def load_plugins():
     modules = []
-    for plugin in plugins:
-        if not plugin.startswith('_'):
-            modules.append(importlib.import_module(plugin, package="ppodd.pod"))
+    for module in dict.fromkeys(i.module for i in get_manifest()):
+        modules.append(importlib.import_module(module))
 
     return modules
 
@@ -39,5 +39,13 @@ def compile_cython():
     )
 
 
-load_plugins()
-pp_modules = PPBase.__subclasses__()
+def __getattr__(name):
+    # pp_modules is provided for compatibility, and requires all of the
+    # postprocessing modules to be imported.
+    if name == 'pp_modules':
+        load_plugins()
+        return PPBase.__subclasses__()
+
+    raise AttributeError(
+        'module {!r} has no attribute {!r}'.format(__name__, name)
+    )
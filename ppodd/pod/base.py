@@ -4,7 +4,9 @@ import datetime
 import numpy as np
 import pandas as pd
 
-from ..utils import pd_freq, unwrap_array
+from ..utils import pd_freq
+from ..utils.align import onto, outerjoin
+from ..utils.circular import interp as circular_interp
 from ..decades import DecadesDataset, DecadesVariable
 
 class PPBase(abc.ABC):
@@ -75,12 +77,11 @@ class PPBase(abc.ABC):
         self.outputs = None
         self.d = None
 
-    def onto(self, dataframe, index, limit=1, period=None):
-        return dataframe.reindex(
-            index.union(dataframe.index).sort_values()
-        ).interpolate(
-            'time', limit=limit, period=period
-        ).loc[index]
+    def onto(self, dataframe, index, limit=1):
+        return pd.DataFrame({
+            col: onto(dataframe[col], index, limit=limit, method='time')
+            for col in dataframe.columns
+        }, index=index)
 
     def get_dataframe(self, method='outerjoin', index=None, limit=1,
                       circular=None, exclude=None):
@@ -99,53 +100,32 @@ class PPBase(abc.ABC):
         ]
 
         if method == 'outerjoin':
-            for _input in _inputs:
-                df = df.join(self.dataset[_input]().dropna(), how='outer')
-
             _freq = np.max([self.dataset[i].frequency for i in _inputs])
-            df = df.reindex(pd.date_range(
-                start=df.index[0], end=df.index[-1], freq=pd_freq[_freq]
-            ))
+            df = outerjoin([self.dataset[i]() for i in _inputs], _freq)
 
         elif method == 'onto':
 
+            columns = {}
+
             if index is None:
-                df = self.dataset[_inputs[0]]()
-                index = df.index
+                _first = self.dataset[_inputs[0]]()
+                index = _first.index
+                columns[_first.name] = _first.values
                 _start = 1
             else:
-                df = pd.DataFrame(index=index)
                 _start = 0
 
-            for _input in _inputs[_start:]:
-                _input_name = _input
-
-                if _input in circular:
-
-                    _tmp = self.dataset[_input_name]()
-                    _data = _tmp.values.copy()
+            for _input_name in _inputs[_start:]:
+                _input = self.dataset[_input_name]()
 
-                    _input = pd.DataFrame(
-                        [],
-                        index=_tmp.index
+                if _input_name in circular:
+                    columns[_input_name] = circular_interp(
+                        _input, index, limit=limit
                     )
-
-                    _input[_input_name] = _data
-                    _input[_input_name] = unwrap_array(_input[_input_name])
-
                 else:
-                    _input = self.dataset[_input_name]()
+                    columns[_input_name] = onto(_input, index, limit=limit)
 
-                df[_input_name] = _input.reindex(
-                    index.union(
-                        _input.index
-                    ).sort_values()
-                ).interpolate(
-                    'linear', limit=limit
-                ).loc[index]
-
-                if _input_name in circular:
-                    df[_input_name] %= 360
+            df = pd.DataFrame(columns, index=index)
 
         self.d = df
 
@@ -1,4 +1,3 @@
-import datetime
 import numpy as np
 import pandas as pd
 
@@ -6,6 +5,7 @@ from ..decades import DecadesVariable, DecadesBitmaskFlag
 from .base import PPBase
 from .shortcuts import _c, _o, _z
 from ..utils import flagged_avg
+from ..utils.segments import dilate, runs, segments, to_mask
 
 INIT_SKIP = 100         # Number of datapoints to skip at the start
 SENS_CUTOFF = 0         # Sensitivity vals at or below considered bad
@@ -112,7 +112,7 @@ class AL52CO(PPBase):
         fdf[ZERO_COUNTS_FLAG] = 0
 
         # In the processing, we nan out the start of the data, we need to
-        # replace this so that the .shift()).cumsum() method works.
+        # replace this so that calibration periods are identified correctly.
         d['AL52CO_cal_status'].fillna(method='bfill', inplace=True)
         d['AL52CO_cal_status'].fillna(method='ffill', inplace=True)
 
@@ -125,31 +125,25 @@ class AL52CO(PPBase):
         # We want to flag not only the times when the instrument is in
         # calibration, but also a few seconds afterwards, while the calibration
         # gas is flushed.
-        _groups = (
-            d['AL52CO_cal_status'] != d['AL52CO_cal_status'].shift()
-        ).cumsum()
-
-        _groups[d['AL52CO_cal_status'] < 1] = np.nan
-        _groups.dropna(inplace=True)
-        groups = d.groupby(_groups)
-
-        for group in groups:
-            start = group[1].index[0]
-            end = group[1].index[-1] + datetime.timedelta(seconds=CAL_FLUSH_TIME)
-            fdf.loc[start:end, IN_CAL_FLAG] = 1
+        in_cal = ~(d['AL52CO_cal_status'] < 1).values
+        starts, stops = dilate(
+            *segments(in_cal), d.index, after=CAL_FLUSH_TIME
+        )
+        fdf.loc[to_mask(starts, stops, len(fdf)), IN_CAL_FLAG] = 1
 
         # Try to flag where CHFGGA_V1 = 1
         try:
             v1 = self.dataset['CHFGGA_V1'].data.reindex(fdf.index).dropna()
-            _v1_groups = (v1 != v1.shift()).cumsum()
-            _v1_groups[v1 < 1] = np.nan
-            _v1_groups.dropna(inplace=True)
-            v1_groups = v1.groupby(_v1_groups)
-            for group in v1_groups:
-                start = group[1].index[0]
-                end = group[1].index[-1]
-                end += datetime.timedelta(seconds=CAL_FLUSH_TIME)
-                fdf.loc[start:end, IN_CAL_FLAG] = 1
+
+            # Runs of different valve states are extended separately, as
+            # there may be gaps in the data between them
+            starts, stops = runs(v1.values)
+            _open = v1.values[starts] >= 1
+            starts, stops = dilate(
+                starts[_open], stops[_open], v1.index, after=CAL_FLUSH_TIME,
+                onto=fdf.index
+            )
+            fdf.loc[to_mask(starts, stops, len(fdf)), IN_CAL_FLAG] = 1
         except KeyError:
             pass
 
@@ -194,12 +188,10 @@ class AL52CO(PPBase):
         d.loc[d.index[indicies_p2], 'CAL_FLAG'] = 1
         d.loc[d.index[indicies], 'CAL_FLAG'] = 0
 
-        # Interpolate the zero
-        flagged_avg(d, 'CAL_FLAG', 'AL52CO_zero', out_name='ZERO', interp=True)
+        # Interpolate the zero and sensitivity
+        flagged_avg(d, 'CAL_FLAG', ['AL52CO_zero', 'AL52CO_sens'],
+                    out_name=['ZERO', 'SENS'], interp=True)
         d.ZERO.fillna(method='bfill', inplace=True)
-
-        # Interpolate the sensitivity
-        flagged_avg(d, 'CAL_FLAG', 'AL52CO_sens', out_name='SENS', interp=True)
         d.SENS.fillna(method='bfill', inplace=True)
 
         # Calculate concentration using interpolated sens & zero
@@ -1,15 +1,178 @@
-import warnings
-
 import numpy as np
 import pandas as pd
 
-from scipy.optimize import fsolve
-
 from ..decades import DecadesVariable
 from .base import PPBase
 from .shortcuts import _o, _z
 
 
+def _windowed_nanstd(x, start, stop):
+    """
+    Calculate the standard deviation of x, ignoring NaNs, over windows of
+    variable length, using cumulative sums of x and x**2.
+
+    Args:
+        x: a 1D float array.
+        start: an integer array of (inclusive) window starts.
+        stop: an integer array of (exclusive) window ends. Windows with
+              stop <= start are empty.
+
+    Returns:
+        an array of standard deviations, NaN where a window contains no valid
+        data.
+    """
+    valid = np.isfinite(x)
+
+    # Remove the mean, to limit loss of precision in the sums of squares
+    ref = np.mean(x[valid]) if valid.any() else 0.
+    _x = np.where(valid, x - ref, 0.)
+
+    cnt = np.concatenate([[0], np.cumsum(valid)])
+    sum1 = np.concatenate([[0.], np.cumsum(_x)])
+    sum2 = np.concatenate([[0.], np.cumsum(_x**2)])
+
+    stop = np.maximum(stop, start)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        _n = cnt[stop] - cnt[start]
+        _mean = (sum1[stop] - sum1[start]) / _n
+        _var = (sum2[stop] - sum2[start]) / _n - _mean**2
+
+    return np.sqrt(np.maximum(_var, 0))
+
+
+def _last_event(events, default):
+    """
+    Get the index of the most recent event at or before each element of a
+    boolean array, or default if there has been no event.
+    """
+    idx = np.where(events, np.arange(events.size), default)
+    return np.maximum.accumulate(idx) if idx.size else idx
+
+
+# Range of dew points, in K, over which the saturation vapour pressure over
+# water is inverted. The vapour pressure is monotonic over this range.
+TDEW_RANGE = (100., 500.)
+
+
+def _ln_vp_water(tdew):
+    """
+    Get the natural log of the saturation vapour pressure over water, in Pa,
+    and its derivative with respect to temperature, at temperatures tdew, in
+    K.
+    """
+    _tanh = np.tanh(0.0415 * (tdew - 218.8))
+    _b = 53.878 - 1331.22 / tdew - 9.44523 * np.log(tdew) + 0.014025 * tdew
+
+    ln_vp = (
+        54.842763 - 6763.22 / tdew - 4.210 * np.log(tdew) + 0.000367 * tdew
+        + _tanh * _b
+    )
+
+    d_ln_vp = (
+        6763.22 / tdew**2 - 4.210 / tdew + 0.000367
+        + 0.0415 * (1 - _tanh**2) * _b
+        + _tanh * (1331.22 / tdew**2 - 9.44523 / tdew + 0.014025)
+    )
+
+    return ln_vp, d_ln_vp
+
+
+def _tdew_table(step=0.01):
+    """
+    Get a lookup table of the log of the saturation vapour pressure over
+    water against dew point, over TDEW_RANGE, built on first use.
+    """
+    try:
+        return _tdew_tables[step]
+    except KeyError:
+        pass
+
+    tdew = np.arange(TDEW_RANGE[0], TDEW_RANGE[1] + step, step)
+    ln_vp, _ = _ln_vp_water(tdew)
+    _tdew_tables[step] = (ln_vp, tdew)
+    return ln_vp, tdew
+
+
+_tdew_tables = {}
+
+
+def tdew_from_vp(vp, lookup=False, tol=1e-9, max_iter=50):
+    """
+    Invert the saturation vapour pressure over water to give the dew point.
+
+    The inversion uses Newton iterations over the whole array, using the
+    analytic derivative of the vapour pressure. Each sample is bracketed
+    within TDEW_RANGE, and any step which would leave the bracket is replaced
+    by bisection. Samples are only iterated until they have converged.
+
+    Args:
+        vp: an array of vapour pressures, in Pa.
+
+    Kwargs:
+        lookup: if True, interpolate in a precomputed table of vapour
+                pressure against dew point, rather than iterating. The table
+                has a resolution of 0.01 K.
+        tol: the convergence tolerance, in K.
+        max_iter: the maximum number of iterations.
+
+    Returns:
+        an array of dew points, in K. NaN where vp is not a positive number,
+        or gives a dew point outside of TDEW_RANGE.
+    """
+    vp = np.asarray(vp, dtype=float)
+    tdew = np.full(vp.shape, np.nan)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        target = np.log(vp)
+
+    lo, hi = TDEW_RANGE
+    ln_lo, _ = _ln_vp_water(lo)
+    ln_hi, _ = _ln_vp_water(hi)
+    valid = (target >= ln_lo) & (target <= ln_hi)
+
+    if lookup:
+        tdew[valid] = np.interp(target[valid], *_tdew_table())
+        return tdew
+
+    idx = np.flatnonzero(valid)
+    target = target[idx]
+    lo = np.full(idx.size, lo)
+    hi = np.full(idx.size, hi)
+
+    # Initial guess from the Clausius-Clapeyron relation
+    t = np.clip(
+        1 / (1 / 273.15 - (target - np.log(611.2)) / 5420), lo, hi
+    )
+
+    for _ in range(max_iter):
+        if not idx.size:
+            break
+
+        ln_vp, d_ln_vp = _ln_vp_water(t)
+        f = ln_vp - target
+
+        # The vapour pressure increases with temperature, so the root is
+        # below t where f > 0
+        above = f > 0
+        hi = np.where(above, t, hi)
+        lo = np.where(above, lo, t)
+
+        t_new = t - f / d_ln_vp
+        outside = ~((t_new > lo) & (t_new < hi))
+        t_new[outside] = 0.5 * (lo[outside] + hi[outside])
+
+        converged = np.abs(t_new - t) < tol
+        tdew[idx[converged]] = t_new[converged]
+
+        keep = ~converged
+        idx, target, lo, hi, t = (
+            idx[keep], target[keep], lo[keep], hi[keep], t_new[keep]
+        )
+
+    return tdew
+
+
 class BuckCR2(PPBase):
     r"""
     Produces dew point temperature and water vapour volume mixing ratio derived
@@ -83,171 +246,134 @@ class BuckCR2(PPBase):
     def calc_uncertainty(self, buck_mirr_temp, buck_pressure,
                          buck_mirr_control):
 
-        n = buck_mirr_temp.size
-        buck_unc_c = np.zeros(n)
-        buck_unc_r = np.zeros(n)
-        buck_unc_t = np.zeros(n)
-        buck_unc_i = np.zeros(n)
-        buck_unc_b = np.zeros(n)
-        buck_unc_k = np.zeros(n)
+        buck_mirr_temp = np.asarray(buck_mirr_temp, dtype=float)
+        buck_pressure = np.asarray(buck_pressure, dtype=float)
+        buck_mirr_control = np.asarray(buck_mirr_control)
 
-        buck_unc_temp = np.zeros(n)*np.nan
+        n = buck_mirr_temp.size
+        i = np.arange(n)
 
-        for i in range(0, n):
+        with np.errstate(all='ignore'):
             # Calibration Uncertainty
-            Uc = 0.02 + 5E+27 * buck_mirr_temp[i]**-12.5
-            buck_unc_c[i] = Uc
+            buck_unc_c = 0.02 + 5E+27 * buck_mirr_temp**-12.5
 
             # Repeatability
-            Ur = 0.01 + 4E+19 * buck_mirr_temp[i]**-9.0
-            buck_unc_r[i] = Ur
-
-            if buck_mirr_temp[i] > 248.0:
-                lag = 8
-            else:
-                lag = np.ceil(2e+29 * buck_mirr_temp[i]**-11.902)
-
-            if not np.isfinite(lag):
-                lag = 8
-
-            lag = int(lag)
-
-            if lag != np.nan:
-                with warnings.catch_warnings():
-                    warnings.simplefilter("ignore")
-                    fwdUt = np.nanstd(buck_mirr_temp[i:i+lag])
-                    backUt = np.nanstd(buck_mirr_temp[i-lag:i])
-            else:
-                fwdUt, backUt = 0, 0
-
-            if (buck_pressure[i] > 0.0):
-                Ut = np.max([fwdUt, backUt])
-                buck_unc_t[i] = Ut
-                buck_unc_temp[i] = Ut
-            else:
-                Ut = 0.0
-
-            if(buck_mirr_temp[i] > 233.15):
-                Ui = 0.025
-            else:
-                Ui = -0.0044 * buck_mirr_temp[i] + 1.051
-            buck_unc_i[i] = Ui
+            buck_unc_r = 0.01 + 4E+19 * buck_mirr_temp**-9.0
+
+            # Temperature variability, the larger of the std of the mirror
+            # temperature over lag samples forward and backward, where lag
+            # increases at low temperatures
+            lag = np.where(
+                buck_mirr_temp > 248.0, 8,
+                np.ceil(2e+29 * buck_mirr_temp**-11.902)
+            )
+            lag[~np.isfinite(lag)] = 8
+            lag = lag.astype(int)
 
-            # Bias uncertainty depending on knowledge of mirror state
-            if buck_mirr_control[i] < 2:
-                Ub = 0
-                buck_unc_b[i] = 0
+            # Backward windows follow python slicing semantics, as
+            # buck_mirr_temp[i-lag:i]
+            back_start = i - lag
+            back_start[back_start < 0] += n
+            back_start = np.maximum(back_start, 0)
 
-            if buck_mirr_control[i] == 2:
+            fwdUt = _windowed_nanstd(
+                buck_mirr_temp, i, np.minimum(i + lag, n)
+            )
+            backUt = _windowed_nanstd(buck_mirr_temp, back_start, i)
 
-                lnesw = np.log(611.2) + (
-                    17.62 * (buck_mirr_temp[i] - 273.15)
-                ) / (243.12 + buck_mirr_temp[i] - 273.15)
+            buck_unc_t = np.where(
+                buck_pressure > 0.0, np.maximum(fwdUt, backUt), 0.0
+            )
+
+            buck_unc_i = np.where(
+                buck_mirr_temp > 233.15, 0.025, -0.0044 * buck_mirr_temp + 1.051
+            )
 
-                dpi = 273.15 + (
-                    272.0 * (lnesw - np.log(611.2))
-                    / (22.46 - (lnesw - np.log(611.2)))
-                )
+            # Bias uncertainty depending on knowledge of mirror state
+            lnesw = np.log(611.2) + (
+                17.62 * (buck_mirr_temp - 273.15)
+            ) / (243.12 + buck_mirr_temp - 273.15)
 
-                buck_unc_b[i] = dpi-buck_mirr_temp[i]
-                Ub = dpi-buck_mirr_temp[i]
+            dpi = 273.15 + (
+                272.0 * (lnesw - np.log(611.2))
+                / (22.46 - (lnesw - np.log(611.2)))
+            )
 
-            Uc = buck_unc_c[i]
-            Ur = buck_unc_r[i]
-            Ut = buck_unc_t[i]
-            Ui = buck_unc_i[i]
-            Ub = buck_unc_b[i]
-            Uk = buck_unc_k[i]
+            buck_unc_b = np.where(
+                buck_mirr_control == 2, dpi - buck_mirr_temp, 0.0
+            )
 
-            buck_unc_k[i] = 2 * np.sqrt(Uc**2 + Ur**2 + Ut**2 + Ui**2 + Ub**2)
+            buck_unc_k = 2 * np.sqrt(
+                buck_unc_c**2 + buck_unc_r**2 + buck_unc_t**2
+                + buck_unc_i**2 + buck_unc_b**2
+            )
 
-        ix = np.where(buck_mirr_control[i] == 3)[0]
-        buck_unc_k[ix] = np.nan
+        buck_unc_k[buck_mirr_control == 3] = np.nan
 
         return buck_unc_k
 
     def get_buck_mirror_ctl(self, buck_mirr_temp):
+        """
+        Determine the mirror state at each sample: 0=water, 1=ice, 2=not
+        known, 3=mirror temperature changing too quickly (and for a recovery
+        period afterwards). Samples within interval of either end of the
+        data are not assessed, and are given -9999.
+
+        The state is determined by a sequence of counters, each of which is
+        reset by an event, so is evaluated here from the index of the most
+        recent event at each sample.
+        """
         interval = 30
-        recovery = 0
-        mirrormin = 0
-        mirrormax = 0
-        DTmax = 0
-        DTmin = 0
-        DT = 0
-        timing = 0
-
-        buck_mirror_control = np.zeros(buck_mirr_temp.size, dtype=np.int)-9999
-        for i in range(interval+1, buck_mirr_temp.size-interval-1):
-            DT = np.mean(
-                buck_mirr_temp[i:i+interval] - buck_mirr_temp[i-1:i+interval-1]
-            )
 
-            if buck_mirr_temp[i] < 220:
-                DTmax = 1 / (220 * 0.0172438 - 3.6602) * 0.5
-            else:
-                DTmax = 1 / (buck_mirr_temp[i] * 0.0172438 - 3.6602) * 0.5
-
-            if buck_mirr_temp[i] > 290:
-                DTmin = 1 / (290 * 0.041044 - 12.232) * 0.5
-            else:
-                DTmin = 1 / (buck_mirr_temp[i] * 0.041044 - 12.232) * 0.5
-
-            buck_mirror_control[i] = 2
-
-            # Make a first cut at guessing the mirror state -
-            #   0=water (above 273K),
-            #   1=ice (when the mirror has been cold and then not above zero)
-            #   2=not known.
-            # these will be used to calculate the uncertainty
-            # owing to mirror state.
-            if buck_mirr_temp[i] > 273.15:
-                buck_mirror_control[i] = 0
-
-            if buck_mirr_temp[i] < 243.15:
-                mirrormin = 1
-                mirrormax = 1
-
-            if buck_mirr_temp[i] > 273.15:
-                timing = 0
-            else:
-                timing += 1
-
-            if buck_mirr_temp[i] > 243.15:
-                if mirrormin > 0:
-                    if buck_mirr_temp[i] < 273.15:
-                        mirrormax = 1
-                    else:
-                        mirrormin = 0
-                        mirrormax = 0
-
-            if mirrormin > 0:
-                if mirrormax > 0:
-                    buck_mirror_control[i] = 1
-                else:
-                    buck_mirror_control[i] = 2
-
-            if timing > 600:
-                buck_mirror_control[i] = 1
-
-            # If Mirror Delta T outside acceptable range then flag as 3.
-            # Start an 80s counter (320 4hz cycles)(recovery) following flag,
-            # and only unflag when this has expired
-
-            if DT > DTmax:
-                buck_mirror_control[i] = 3
-                recovery = 80
-            else:
-                if recovery > 0:
-                    buck_mirror_control[i] = 3
-                    recovery -= 1
-
-            if DT < DTmin:
-                buck_mirror_control[i] = 3
-                recovery = 80
-            else:
-                if recovery > 0:
-                    buck_mirror_control[i] = 3
-                    recovery -= 1
+        buck_mirr_temp = np.asarray(buck_mirr_temp, dtype=float)
+        n = buck_mirr_temp.size
+
+        buck_mirror_control = np.zeros(n, dtype=int) - 9999
+
+        start = interval + 1
+        stop = n - interval - 1
+        if stop <= start:
+            return buck_mirror_control
+
+        i = np.arange(stop - start)
+        temp = buck_mirr_temp[start:stop]
+
+        # Mean temperature change over the following interval samples
+        diffs = buck_mirr_temp[1:] - buck_mirr_temp[:-1]
+        DT = np.lib.stride_tricks.sliding_window_view(
+            diffs, interval
+        )[start - 1:stop - 1].mean(axis=1)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            DTmax = 1 / (np.where(temp < 220, 220, temp) * 0.0172438
+                         - 3.6602) * 0.5
+            DTmin = 1 / (np.where(temp > 290, 290, temp) * 0.041044
+                         - 12.232) * 0.5
+
+            # The mirror is assumed to be icy once it has been below
+            # 243.15 K, until it is next at or above 273.15 K.
+            ice_on = temp < 243.15
+            ice_off = ~ice_on & (temp >= 273.15)
+            above_zero = temp > 273.15
+
+            trigger = (DT > DTmax) | (DT < DTmin)
+
+        ice = _last_event(ice_on, -1) > _last_event(ice_off, -1)
+
+        # Number of samples since the mirror was last above 273.15 K
+        timing = i - _last_event(above_zero, -1)
+
+        # Samples since the mirror temperature last changed too quickly. The
+        # recovery counter is set to 80 and decremented twice per sample,
+        # so state 3 persists for 40 samples after the last trigger.
+        since_trigger = i - _last_event(trigger, -n)
+
+        control = np.where(above_zero, 0, 2)
+        control[ice] = 1
+        control[timing > 600] = 1
+        control[since_trigger <= 40] = 3
+
+        buck_mirror_control[start:stop] = control
 
         return buck_mirror_control
 
@@ -347,45 +473,28 @@ class BuckCR2(PPBase):
         flag[buck_dewpoint_flag == 2] = 3
         return flag
 
-    def calc_tdew_corrected(self, buck_mirr_control, vmr_buck, ps_rvsm, enhance):
-        n = vmr_buck.size
-        tfrost_corrected = np.zeros(n)
-        result = np.zeros(n)
-        vp_corrected = np.zeros(n)
+    def calc_tdew_corrected(self, buck_mirr_control, vmr_buck, ps_rvsm, enhance,
+                            lookup=False):
         vp_corrected = 100 * ps_rvsm * vmr_buck / (
             enhance * 10e5 + enhance * vmr_buck
         )
 
-        def tdew_function(tdew):
-            return (
-                54.842763 - 6763.22 / tdew - 4.210 * np.log(tdew)
-                + 0.000367 * tdew + np.tanh(0.0415 * (tdew - 218.8))
-                * (53.878 - 1331.22 / tdew - 9.44523 * np.log(tdew)
-                   + 0.014025*tdew)
-            ) - np.log(vp_here)
-
-        tdew_corrected = np.zeros(n)
-        vp_here = np.zeros(n)
-
-        tdew_initial_guess = 300
-        with warnings.catch_warnings():
-            warnings.filterwarnings("ignore")
-            for i in range(0, n):
-                vp_here = vp_corrected[i]
-                tdew_corrected[i] = fsolve(tdew_function, tdew_initial_guess)
-
-        tfrost_corrected = (
-            (1.814625 * np.log(vp_corrected) + 6190.134)
-            / (29.120 - np.log(vp_corrected))
+        water = buck_mirr_control < 1
+
+        # The dew point is only required where the mirror is water
+        tdew_corrected = np.full(vp_corrected.size, np.nan)
+        tdew_corrected[water] = tdew_from_vp(
+            vp_corrected[water], lookup=lookup
         )
 
-        for j in range(0, n):
-            if buck_mirr_control[j] < 1:
-                result[j] = tdew_corrected[j]
-            if buck_mirr_control[j] >= 1:
-                result[j] = tfrost_corrected[j]
-            if buck_mirr_control[j] > 2:
-                result[j] = np.nan
+        with np.errstate(invalid='ignore', divide='ignore'):
+            tfrost_corrected = (
+                (1.814625 * np.log(vp_corrected) + 6190.134)
+                / (29.120 - np.log(vp_corrected))
+            )
+
+        result = np.where(water, tdew_corrected, tfrost_corrected)
+        result[buck_mirr_control > 2] = np.nan
 
         return result
 
@@ -5,6 +5,8 @@ from scipy.optimize import curve_fit
 
 from ..decades import DecadesVariable, DecadesBitmaskFlag
 from ..decades import flags
+from ..utils.segments import fill_short_runs
+from ..utils.windows import sliding_ptp
 from .base import PPBase
 from .shortcuts import _o, _z
 
@@ -36,27 +38,25 @@ def get_no_cloud_mask(twc_col_p, wow, window_secs=3, min_period=5, freq=64):
     range_limits = (1E-12, 0.1)
 
     vals = np.array(twc_col_p.values)
-    out = np.zeros_like(vals)
+    out = np.zeros(len(vals), dtype=int)
 
     # Window sizes
     window_size = window_secs * freq
     min_length = min_period * freq
     _half_window = int(np.floor(window_size / 2))
 
-    # Calculate range through a sliding window
-    for i in range(0, len(vals) - _half_window):
-        _range = np.ptp(vals[i:i+window_size])
-        out[i + _half_window] = range_limits[0] < _range < range_limits[1]
+    # Calculate range through a sliding window, which is truncated at the end
+    # of the data
+    _range = sliding_ptp(vals, window_size, partial=True)
+    _range = _range[:max(len(vals) - _half_window, 0)]
 
-    out = out.astype(int)
+    with np.errstate(invalid='ignore'):
+        out[_half_window:] = (
+            (range_limits[0] < _range) & (_range < range_limits[1])
+        )
 
     # Ensure that sectors marked as clear air are not too short
-    _split = np.split(out, np.where(np.abs(np.diff(out)) != 0)[0] + 1)
-    for _group in _split:
-        if len(_group) < min_length:
-            _group[:] = 0
-
-    out = np.concatenate(_split)
+    out = fill_short_runs(out, min_length)
 
     # Don't allow clear air calculations when we're on the ground
     out[wow == 1] = 0
@@ -6,6 +6,8 @@ from scipy.optimize import curve_fit
 from ..decades import DecadesVariable, DecadesBitmaskFlag
 from ..decades import flags
 from ..utils import slrs
+from ..utils.segments import time_mask
+from ..utils.windows import sliding_max, sliding_min
 from .base import PPBase
 from .shortcuts import _o, _r, _z
 
@@ -71,13 +73,21 @@ def get_cloud_mask(el_temperature, var_thresh=0.6, set_temp=140, var_temp=1):
     t_lo = set_temp - var_temp
     t_hi = set_temp + var_temp
 
-    _ptp = el_temperature.rolling(20).apply(np.ptp, raw=True) >= var_thresh
-    _tmin = el_temperature.rolling(20).min() < t_lo
-    _tmax = el_temperature.rolling(20).max() > t_hi
+    window = 20
 
-    _mask = (_ptp | _tmin | _tmax).astype(bool)
+    # Trailing window extrema, NaN where the window is incomplete or contains
+    # missing data
+    _max = np.full(len(el_temperature), np.nan)
+    _min = np.full(len(el_temperature), np.nan)
+    _max[window - 1:] = sliding_max(el_temperature.values, window)
+    _min[window - 1:] = sliding_min(el_temperature.values, window)
 
-    return _mask
+    with np.errstate(invalid='ignore'):
+        _mask = ((_max - _min) >= var_thresh) | (_min < t_lo) | (_max > t_hi)
+
+    return pd.Series(
+        _mask, index=el_temperature.index, name=el_temperature.name
+    )
 
 
 def get_slr_mask(wow, ps, roll):
@@ -96,12 +106,7 @@ def get_slr_mask(wow, ps, roll):
     """
 
     _slrs = slrs(wow, ps, roll, min_length=10, roll_lim=1, ps_lim=.2)
-    mask = pd.Series(0, index=wow.index)
-
-    for slr in _slrs:
-        mask.loc[(mask.index >= slr[0]) & (mask.index <= slr[-1])] = 1
-
-    return mask.astype(bool)
+    return pd.Series(time_mask(*_slrs, wow.index), index=wow.index)
 
 
 def dryair_calc(p_sense, T, ts, ps, tas, cloud_mask=None, rtn_func=False,
@@ -1,10 +1,7 @@
-from datetime import timedelta
-
-import numpy as np
-
 from ..decades import DecadesVariable, DecadesBitmaskFlag
 from ..decades import flags
 from ..utils import flagged_avg
+from ..utils.segments import dilate, segments, to_mask
 from .base import PPBase
 from .shortcuts import _c, _o, _z
 
@@ -86,14 +83,11 @@ class TecoSO2(PPBase):
         d.loc[d.index < first_zero, 'ZERO_FLAG'] = 1
 
         # Instrument in calibration is flagged
-        _groups = (d.zero_flag != d.zero_flag.shift()).cumsum()
-        _groups[d.zero_flag == 0] = np.nan
-        _groups.dropna(inplace=True)
-        groups = d.groupby(_groups)
-        for group in groups:
-            start = group[1].index[0]
-            end = group[1].index[-1] + timedelta(seconds=CAL_FLUSH_END)
-            d.loc[start:end, 'CALIB_FLAG'] = 1
+        starts, stops = dilate(
+            *segments(~(d.zero_flag == 0).values), d.index,
+            after=CAL_FLUSH_END
+        )
+        d.loc[to_mask(starts, stops, len(d)), 'CALIB_FLAG'] = 1
 
         # Instrument in alarm is flagged as 3
         alarm = self.d.CHTSOO_flags.apply(lambda x: str(x)[-4:-1] != '000')
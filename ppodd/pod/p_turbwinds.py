@@ -1,11 +1,11 @@
-from functools import reduce
-
 import numpy as np
 
 from .base import PPBase
 from .shortcuts import _c, _o, _r, _z
 from ..decades import DecadesVariable, DecadesBitmaskFlag, flags
 from ..utils import slrs, get_range_flag
+from ..utils.segments import time_mask
+from ..utils.winds import lever_arm, rotation, tas_vector, wind_vector
 
 TAS_VALID_RANGE = (50, 250)
 AOA_VALID_RANGE = (-10, 15)
@@ -16,55 +16,15 @@ WIND_VALID_RANGE = (-60, 60)
 def mach(p, q):
     return np.sqrt(5*((1 + q / p)**(2./7.) - 1))
 
-def _rotation_arrays(r, th, ph):
+def _turb(d, consts):
     """
-    Return matricies which define transformations between aircraft and
-    geographical frames of reference.
-
-    A1 = | 1     0       0       |
-         | 0     cos(r)  -sin(r) |
-         | 0     sin(r)  cos(r)  |
-
-    A2 = | cos(th)  0   -sin(th) |
-         | 0        1   0        |
-         | sin(th)  0   cos(th)  |
-
-    A3 = | cos(ph)  sin(ph) 0 |
-         | -sin(ph) cos(ph) 0 |
-         | 0        0       1 |
-
-    Args:
-        r: the aircraft roll, in radians
-        th: the aircraft pitch, in radians
-        ph: the aircraft heading, in radians
+    Iteratively calculate angle of attack, angle of sideslip, true airspeed
+    and pitot-static pressure from the turbulence probe, without the
+    ALPHA_COR and BETA_COR corrections.
 
     Returns:
-        A1, A2, A3: Roll, pitch and heading correction tensors.
+        aoa, aoss, tas, q: pd.Series of each.
     """
-    n = len(r)
-
-    A1 = np.array([
-        [np.ones(n), np.zeros(n), np.zeros(n)],
-        [np.zeros(n), np.cos(r), -np.sin(r)],
-        [np.zeros(n), np.sin(r), np.cos(r)]
-    ])
-
-    A2 = np.array([
-        [np.cos(th), np.zeros(n), -np.sin(th)],
-        [np.zeros(n), np.ones(n), np.zeros(n)],
-        [np.sin(th), np.zeros(n), np.cos(th)]
-    ])
-
-    A3 = np.array([
-        [np.cos(ph), np.sin(ph), np.zeros(n)],
-        [-np.sin(ph), np.cos(ph), np.zeros(n)],
-        [np.zeros(n), np.zeros(n), np.ones(n)]
-    ])
-
-    return A1, A2, A3
-
-
-def p_turb(d, consts):
     _mach = mach(d['PS_RVSM'], d['Q_RVSM'])
 
     a0 = np.polyval(consts['AOA_A0'][::-1], _mach)
@@ -125,8 +85,22 @@ def p_turb(d, consts):
         * np.sqrt(d['TAT_DI_R'] / 288.15)
     )
 
+    return aoa, aoss, tas, q
+
+
+def _correct(aoa, aoss, consts):
+    """
+    Apply the ALPHA_COR and BETA_COR corrections to angle of attack and
+    angle of sideslip.
+    """
     aoss = aoss * consts['BETA_COR'][1] + consts['BETA_COR'][0]
     aoa = aoa * consts['ALPHA_COR'][1] + consts['ALPHA_COR'][0]
+    return aoa, aoss
+
+
+def p_turb(d, consts):
+    aoa, aoss, tas, q = _turb(d, consts)
+    aoa, aoss = _correct(aoa, aoss, consts)
 
     d['AOA'] = aoa
     d['AOSS'] = aoss
@@ -135,61 +109,33 @@ def p_turb(d, consts):
 
     return d
 
-def p_winds(d, consts):
-    l = consts['INSPOSN']
-    n = len(d)
-
-    MATMUL = 'ij...,jk...->ik...'
-    DOT = 'ij...,j...->i...'
-
-     # Create compactly named input variable, with required reansformations.
-    vn = d['VELE_GIN']
-    ve = d['VELN_GIN']
-    vz = -d['VELD_GIN']
-    r = np.deg2rad(d['ROLL_GIN'])
-    th = np.deg2rad(d['PTCH_GIN'])
-    ph = np.deg2rad(d['HDG_GIN']-90)
-    rdot = np.deg2rad(d['ROLR_GIN'])
-    thdot = np.deg2rad(d['PITR_GIN'])
-    phdot = np.deg2rad(d['HDGR_GIN'])
-    tas = d['TAS']
-    alpha = np.deg2rad(d['AOA'])
-    beta = np.deg2rad(d['AOSS'])
-
-    # Get the transformation matricies required to rotate from geographical
-    # to platform relative coordinate systems
-    A1, A2, A3 = _rotation_arrays(r, th, ph)
-
-    # Aircraft velocity vector in, geo relative
-    V = np.array([vn, ve, vz])
-
-    # Build compound rotation matrix to convert aircraft <-> geo coords.
-    # This is (A3.A2).A1
-    R = np.einsum(MATMUL, np.einsum(MATMUL, A3, A2), A1)
-
-    # Transform the aircraft TAS vector to geo coords
-    tas_p = tas / (1 + np.tan(beta)**2 + np.tan(alpha)**2)**.5
-    TAS = np.array([-tas_p, -tas_p * np.tan(beta), tas_p * np.tan(alpha)])
-    TASR = np.einsum(DOT, R, TAS)
-
-    # Corrections for the offset between the gust probe (radome) and the
-    # GIN
-    LEV_L1 = np.array([np.zeros(n), np.zeros(n), -phdot])
-    LEV_L2 = np.einsum(
-        DOT, A3, np.array([np.zeros(n), -thdot, np.zeros(n)])
-    )
-    LEV_L3 = np.einsum(
-        DOT, np.einsum(MATMUL, A3, A2),
-        np.array([rdot, np.zeros(n), np.zeros(n)])
-    )
+def _winds_inputs(d):
+    """
+    Get the GIN inputs to the wind calculation from a DataFrame, with the
+    required transformations, as a list of arrays: the aircraft velocity
+    components, roll, pitch and heading, and their rates of change.
+    """
+    return [
+        np.asarray(i) for i in (
+            d['VELE_GIN'],
+            d['VELN_GIN'],
+            -d['VELD_GIN'],
+            np.deg2rad(d['ROLL_GIN']),
+            np.deg2rad(d['PTCH_GIN']),
+            np.deg2rad(d['HDG_GIN']-90),
+            np.deg2rad(d['ROLR_GIN']),
+            np.deg2rad(d['PITR_GIN']),
+            np.deg2rad(d['HDGR_GIN'])
+        )
+    ]
 
-    LEV_L = LEV_L1 + LEV_L2 + LEV_L3
-    LEV_R = np.einsum(DOT, R, l)
-    LEV = np.cross(LEV_L.T, LEV_R.T).T
 
-    # Wind velocity vector is the sum of the aircraft ground velocity
-    # vector, the geo relative TAS vector and the GIN offset correction.
-    U = V + TASR + LEV
+def p_winds(d, consts):
+    U = wind_vector(
+        *_winds_inputs(d), np.asarray(d['TAS']),
+        np.deg2rad(np.asarray(d['AOA'])), np.deg2rad(np.asarray(d['AOSS'])),
+        consts['INSPOSN']
+    )
 
     d['U_C'] = U[0, :]
     d['V_C'] = U[1, :]
@@ -334,14 +280,41 @@ class TurbulentWinds(PPBase):
              'INSPOSN', 'BETA_COR', 'ALPHA_COR')
         }
 
-        _slrs = reduce(
-            lambda x, y: x.union(y),
-            slrs(d.WOW_IND, d.PS_RVSM, d.ROLL_GIN, freq=32)
-        )
-
-        print(_slrs)
-
-        _in_roll = d.ROLL_GIN.abs() > 10
+        # The turbulence probe iteration does not depend on the AOA/AOSS
+        # corrections, so is evaluated once.
+        aoa, aoss, tas, q = _turb(d, consts)
+
+        _slrs = time_mask(*slrs(d.WOW_IND, d.PS_RVSM, d.ROLL_GIN), d.index)
+        _in_roll = (d.ROLL_GIN.abs() > 10).values
+
+        # The corrections are fitted using only data in straight and level
+        # runs, and data at high roll angles, so the winds are only
+        # calculated for these during the calibration. Terms which do not
+        # depend on the corrections are calculated once.
+        _cal = _slrs | _in_roll
+        _slrs_cal = _slrs[_cal]
+        _in_roll_cal = _in_roll[_cal]
+
+        vn, ve, vz, r, th, ph, rdot, thdot, phdot = [
+            i[_cal] for i in _winds_inputs(d)
+        ]
+        R_cal = rotation(r, th, ph)
+        LEV_cal = lever_arm(r, th, ph, rdot, thdot, phdot, consts['INSPOSN'])
+        aoa_cal = aoa.values[_cal]
+        aoss_cal = aoss.values[_cal]
+        tas_cal = tas.values[_cal]
+        roll_cal = d.ROLL_GIN.values[_cal][_in_roll_cal]
+
+        W_cal = np.empty(vz.shape)
+
+        def _w_cal():
+            _aoa, _aoss = _correct(aoa_cal, aoss_cal, consts)
+            TASR = tas_vector(
+                R_cal[2:], tas_cal, np.deg2rad(_aoa), np.deg2rad(_aoss)
+            )
+            np.add(vz, TASR[0], out=W_cal)
+            np.add(W_cal, LEV_cal[2], out=W_cal)
+            return W_cal
 
         for i in range(2):
             ws = []
@@ -349,9 +322,7 @@ class TurbulentWinds(PPBase):
 
             for alpha in alphas:
                 consts['ALPHA_COR'] = [alpha, 1]
-                d = p_turb(d.copy(deep=True), consts)
-                d = p_winds(d.copy(deep=True), consts)
-                ws.append(d.W_C[_slrs].mean())
+                ws.append(np.nanmean(_w_cal()[_slrs_cal]))
             fit = np.polyfit(ws, alphas, 1)
             consts['ALPHA_COR'] = [np.polyval(fit, 0), 1]
 
@@ -360,11 +331,9 @@ class TurbulentWinds(PPBase):
 
             for beta in betas:
                 consts['BETA_COR'] = [beta, 1]
-
-                d = p_turb(d.copy(deep=True), consts)
-                d = p_winds(d.copy(deep=True), consts)
-
-                covs.append((np.cov(d.W_C[_in_roll], d.ROLL_GIN[_in_roll]))[0, 1])
+                covs.append(
+                    np.cov(_w_cal()[_in_roll_cal], roll_cal)[0, 1]
+                )
 
             try:
                 fit = np.polyfit(covs, betas, 1)
@@ -376,8 +345,19 @@ class TurbulentWinds(PPBase):
 
             print(consts['ALPHA_COR'][0], consts['BETA_COR'][0])
 
-        d = p_turb(d, consts)
-        d = p_winds(d, consts)
+        aoa, aoss = _correct(aoa, aoss, consts)
+        d['AOA'] = aoa
+        d['AOSS'] = aoss
+        d['TAS'] = tas
+        d['PSP_TURB'] = q
+
+        U = wind_vector(
+            *_winds_inputs(d), tas.values, np.deg2rad(aoa.values),
+            np.deg2rad(aoss.values), consts['INSPOSN']
+        )
+        d['U_C'] = U[0, :]
+        d['V_C'] = U[1, :]
+        d['W_C'] = U[2, :]
 
         # Create outputs
         u_out = DecadesVariable(
@@ -2,6 +2,7 @@ import numpy as np
 
 from ..decades import DecadesVariable
 from ..decades.flags import DecadesBitmaskFlag
+from ..utils.winds import wind_vector
 from .base import PPBase
 from .shortcuts import _o, _z
 
@@ -68,64 +69,12 @@ class TurbWinds(PPBase):
             standard_name='upward_air_velocity'
         )
 
-    def _rotation_arrays(self, r, th, ph):
-        """
-        Return matricies which define transformations between aircraft and
-        geographical frames of reference.
-
-        A1 = | 1     0       0       |
-             | 0     cos(r)  -sin(r) |
-             | 0     sin(r)  cos(r)  |
-
-        A2 = | cos(th)  0   -sin(th) |
-             | 0        1   0        |
-             | sin(th)  0   cos(th)  |
-
-        A3 = | cos(ph)  sin(ph) 0 |
-             | -sin(ph) cos(ph) 0 |
-             | 0        0       1 |
-
-        Args:
-            r: the aircraft roll, in radians
-            th: the aircraft pitch, in radians
-            ph: the aircraft heading, in radians
-
-        Returns:
-            A1, A2, A3: Roll, pitch and heading correction tensors.
-        """
-        n = len(r)
-
-        A1 = np.array([
-            [np.ones(n), np.zeros(n), np.zeros(n)],
-            [np.zeros(n), np.cos(r), -np.sin(r)],
-            [np.zeros(n), np.sin(r), np.cos(r)]
-        ])
-
-        A2 = np.array([
-            [np.cos(th), np.zeros(n), -np.sin(th)],
-            [np.zeros(n), np.ones(n), np.zeros(n)],
-            [np.sin(th), np.zeros(n), np.cos(th)]
-        ])
-
-        A3 = np.array([
-            [np.cos(ph), np.sin(ph), np.zeros(n)],
-            [-np.sin(ph), np.cos(ph), np.zeros(n)],
-            [np.zeros(n), np.zeros(n), np.ones(n)]
-        ])
-
-        return A1, A2, A3
-
     def process(self):
         return
         self.get_dataframe()
         d = self.d
 
         l = np.array(self.dataset['INSPOSN'])
-        n = len(d)
-
-        # Define Einstein notation for required matrix operations
-        MATMUL = 'ij...,jk...->ik...'
-        DOT = 'ij...,j...->i...'
 
         # Create compactly named input variable, with required reansformations.
         vn = d.VELE_GIN
@@ -141,40 +90,11 @@ class TurbWinds(PPBase):
         alpha = np.deg2rad(d.AOA)
         beta = np.deg2rad(d.AOSS)
 
-        # Get the transformation matricies required to rotate from geographical
-        # to platform relative coordinate systems
-        A1, A2, A3 = self._rotation_arrays(r, th, ph)
-
-        # Aircraft velocity vector in, geo relative
-        V = np.array([vn, ve, vz])
-
-        # Build compound rotation matrix to convert aircraft <-> geo coords. 
-        # This is (A3.A2).A1
-        R = np.einsum(MATMUL, np.einsum(MATMUL, A3, A2), A1)
-
-        # Transform the aircraft TAS vector to geo coords
-        tas_p = tas / (1 + np.tan(beta)**2 + np.tan(alpha**2))**.5
-        TAS = np.array([-tas_p, -tas_p * np.tan(beta), tas_p * np.tan(alpha)])
-        TASR = np.einsum(DOT, R, TAS)
-
-        # Corrections for the offset between the gust probe (radome) and the
-        # GIN
-        LEV_L1 = np.array([np.zeros(n), np.zeros(n), -phdot])
-        LEV_L2 = np.einsum(
-            DOT, A3, np.array([np.zeros(n), -thdot, np.zeros(n)])
-        )
-        LEV_L3 = np.einsum(
-            DOT, np.einsum(MATMUL, A3, A2),
-            np.array([rdot, np.zeros(n), np.zeros(n)])
-        )
-
-        LEV_L = LEV_L1 + LEV_L2 + LEV_L3
-        LEV_R = np.einsum(DOT, R, l)
-        LEV = np.cross(LEV_L.T, LEV_R.T).T
-
         # Wind velocity vector is the sum of the aircraft ground velocity
         # vector, the geo relative TAS vector and the GIN offset correction.
-        U = V + TASR + LEV
+        U = wind_vector(
+            vn, ve, vz, r, th, ph, rdot, thdot, phdot, tas, alpha, beta, l
+        )
 
         d['U_C'] = U[0, :]
         d['V_C'] = U[1, :]
@@ -1,29 +1,40 @@
-import os
-import re
 import importlib
 
-from .base import QAMod
+from ppodd.utils.plugins import manifest
 
 
-def load_qa_modules():
-    pysearchre = re.compile('.py$', re.IGNORECASE)
-
-    qa_files = filter(
-        pysearchre.search,
-        os.listdir(os.path.dirname(__file__))
-    )
+def get_manifest():
+    """
+    Get the manifest of QA modules in this package. The manifest is built
+    without importing the modules (or matplotlib), which are imported only
+    when required.
 
-    qas = map(lambda f: '.' + os.path.splitext(f)[0], qa_files)
+    Returns:
+        a list of ppodd.utils.plugins.Plugin.
+    """
+    return manifest(__name__, 'QAMod')
 
-    importlib.import_module('ppodd.qa')
 
+def load_qa_modules():
     modules = []
-    for qa in qas:
-        if not qa.startswith('_'):
-            modules.append(importlib.import_module(qa, package='ppodd.qa'))
+    for module in dict.fromkeys(i.module for i in get_manifest()):
+        modules.append(importlib.import_module(module))
 
     return modules
 
 
-load_qa_modules()
-qa_modules = QAMod.__subclasses__()
+def __getattr__(name):
+    # QAMod and qa_modules are provided for compatibility, and require
+    # matplotlib and all of the QA modules, respectively, to be imported.
+    if name == 'QAMod':
+        from .base import QAMod
+        return QAMod
+
+    if name == 'qa_modules':
+        from .base import QAMod
+        load_qa_modules()
+        return QAMod.__subclasses__()
+
+    raise AttributeError(
+        'module {!r} has no attribute {!r}'.format(__name__, name)
+    )
@@ -1,12 +1,212 @@
+"""
+The reader registry. Readers are registered against filename patterns, either
+declaratively, as 'module:Class' strings which are only imported when a
+matching file is added to a dataset, or by decorating a FileReader subclass
+with register().
+
+Third party packages may register readers through the 'ppodd.readers' entry
+point group. Each entry point should refer to a sequence of
+(pattern, reader[, priority]) tuples, where reader is a 'module:Class' string
+or a FileReader subclass.
+"""
+import importlib
+import re
+import warnings
+
+from importlib.metadata import entry_points
+
+from ppodd.readers.base import FileReader
+
+ENTRY_POINT_GROUP = 'ppodd.readers'
+
+# The built in readers, as (pattern, reader, priority). Where a filename
+# matches more than one pattern, the highest priority wins, then the first
+# listed.
+READERS = (
+    (r'.*\.json', 'ppodd.readers.constants:JsonConstantsReader', 0),
+    (r'.*\.yaml', 'ppodd.readers.constants:YamlConstantsReader', 0),
+    (r'.*_faam_.*\.csv', 'ppodd.readers.tabular:CSVReader', 0),
+    (r'.*\.parquet', 'ppodd.readers.tabular:ArrowFileReader', 0),
+    (r'.*\.arrow', 'ppodd.readers.tabular:ArrowFileReader', 0),
+    (r'.*\.feather', 'ppodd.readers.tabular:ArrowFileReader', 0),
+    (r'.*\.nc', 'ppodd.readers.netcdf:CoreNetCDFReader', -1),
+    (r'core_faam_.*\.nc', 'ppodd.readers.netcdf:CoreNetCDFReader', 0),
+    (r'.*\.zip', 'ppodd.readers.archive:ZipFileReader', 0),
+    (r'(^SEAPROBE|.{8})_.+_\w\d{3}', 'ppodd.readers.tcp:TcpFileReader', 0),
+    (r'GINDAT.+\.bin', 'ppodd.readers.tcp:GinFileReader', 0),
+    (r'.+_TCP_?.*\.csv', 'ppodd.readers.tcp:CrioDefinitionReader', 0),
+    (r'.*\.wcm', 'ppodd.readers.sea.reader:WcmFileReader', 0),
+)
+
+# Where each reader (and supporting class) lives, for lazy attribute access
+# from this package
+_locations = {
+    'YamlLoader': 'ppodd.readers.constants',
+    'validate_flight_constants': 'ppodd.readers.constants',
+    'FlightConstantsReader': 'ppodd.readers.constants',
+    'JsonConstantsReader': 'ppodd.readers.constants',
+    'YamlConstantsReader': 'ppodd.readers.constants',
+    'CSVReader': 'ppodd.readers.tabular',
+    'ArrowFileReader': 'ppodd.readers.tabular',
+    'CoreNetCDFReader': 'ppodd.readers.netcdf',
+    'ZipFileReader': 'ppodd.readers.archive',
+    'C_BAD_TIME_DEV': 'ppodd.readers.tcp',
+    'TcpFileReader': 'ppodd.readers.tcp',
+    'CrioFileReader': 'ppodd.readers.tcp',
+    'GinFileReader': 'ppodd.readers.tcp',
+    'DefinitionReader': 'ppodd.readers.tcp',
+    'CrioDefinitionReader': 'ppodd.readers.tcp',
+    'CrioTcpDefintion': 'ppodd.readers.tcp',
+    'DataField': 'ppodd.readers.tcp',
+    'WcmFileReader': 'ppodd.readers.sea.reader',
+}
+
 reader_patterns = {}
+_pattern_priorities = {}
+_dispatch = None
+_entry_points_loaded = False
+
 
+def register(patterns=None, priority=0):
+    """
+    Register a FileReader class against a list of filename patterns.
 
-def register(patterns=None):
+    Kwargs:
+        patterns: a list of regular expressions, which must match the full
+                  basename of a file to be read by the reader.
+        priority: when a filename matches patterns registered by more than
+                  one reader, the pattern with the highest priority wins.
+                  Patterns of equal priority are tried in the order they were
+                  registered.
+    """
     def _register(f):
+        global _dispatch
         for pattern in patterns:
             reader_patterns[pattern] = f
+            _pattern_priorities[pattern] = priority
+        _dispatch = None
         return f
     return _register
 
-from ppodd.readers.readers import *
-from ppodd.readers.sea.reader import WcmFileReader
+
+def _register_table(table):
+    """
+    Register readers from a sequence of (pattern, reader[, priority]) tuples,
+    where reader is either a 'module:Class' string or a FileReader subclass.
+    """
+    for entry in table:
+        pattern, reader = entry[:2]
+        priority = entry[2] if len(entry) > 2 else 0
+        register(patterns=[pattern], priority=priority)(reader)
+
+
+def _load_entry_points():
+    """
+    Register readers advertised by installed packages through the
+    'ppodd.readers' entry point group.
+    """
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+
+    _eps = entry_points()
+    try:
+        _eps = _eps.select(group=ENTRY_POINT_GROUP)
+    except AttributeError:
+        # Python < 3.10
+        _eps = _eps.get(ENTRY_POINT_GROUP, [])
+
+    for _ep in _eps:
+        try:
+            _register_table(_ep.load())
+        except Exception as err:
+            print('Failed to load readers from {}: {}'.format(_ep.name, err))
+
+
+def _resolve(reader):
+    """
+    Resolve a reader, which may be a 'module:Class' string, to a class.
+    """
+    if not isinstance(reader, str):
+        return reader
+
+    module, _, cls = reader.partition(':')
+    return getattr(importlib.import_module(module), cls)
+
+
+def _compile_dispatch():
+    """
+    Compile each registered pattern, in priority order. Each pattern is
+    compiled on its own, so patterns may use backreferences and inline flags
+    freely, and a pattern which fails to compile is ignored, with a warning,
+    without affecting any other reader.
+
+    Returns:
+        a list of (compiled expression, registered pattern) 2-tuples.
+    """
+    patterns = sorted(
+        enumerate(reader_patterns),
+        key=lambda i: (-_pattern_priorities.get(i[1], 0), i[0])
+    )
+
+    dispatch = []
+    for _, pattern in patterns:
+        try:
+            dispatch.append((re.compile(pattern), pattern))
+        except re.error as err:
+            warnings.warn(
+                'Ignoring invalid reader pattern {!r}: {}'.format(
+                    pattern, err
+                ),
+                RuntimeWarning
+            )
+
+    return dispatch
+
+
+def match_reader(filename):
+    """
+    Get the FileReader class registered to read a given file, importing it
+    if required.
+
+    Args:
+        filename: the basename of the file.
+
+    Returns:
+        the FileReader class, or None if no registered pattern matches.
+    """
+    global _dispatch
+
+    _load_entry_points()
+
+    if _dispatch is None:
+        _dispatch = _compile_dispatch()
+
+    for regex, pattern in _dispatch:
+        if regex.fullmatch(filename) is None:
+            continue
+
+        reader = _resolve(reader_patterns[pattern])
+
+        # Cache the imported class, without invalidating the compiled
+        # patterns
+        reader_patterns[pattern] = reader
+
+        return reader
+
+    return None
+
+
+def __getattr__(name):
+    try:
+        module = _locations[name]
+    except KeyError:
+        raise AttributeError(
+            'module {!r} has no attribute {!r}'.format(__name__, name)
+        )
+
+    return getattr(importlib.import_module(module), name)
+
+
+_register_table(READERS)
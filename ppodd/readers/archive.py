@@ -0,0 +1,39 @@
+"""
+Readers for archives of other files.
+"""
+import zipfile
+
+from ppodd.decades import ZipMemberFile
+from ppodd.readers.base import FileReader
+
+
+class ZipFileReader(FileReader):
+    """
+    Read a Zip file. Zip files are assumed to comtain other files which all
+    have associated FileReaders.
+    """
+    level = 0
+
+    def read(self):
+        """
+        Reads a Zip file.
+        """
+        for _file in self.files:
+            print('Reading {}...'.format(_file))
+
+            with zipfile.ZipFile(_file.filepath) as _zipfile:
+                members = [
+                    ZipMemberFile(_file.filepath, info)
+                    for info in _zipfile.infolist() if not info.is_dir()
+                ]
+
+            # Only members which can be read are added to the dataset
+            members = [
+                m for m in members if _file.dataset.infer_reader(m) is not None
+            ]
+
+            for member in members:
+                try:
+                    _file.dataset.add_decades_file(member)
+                except ValueError:
+                    print('failed to add {}'.format(member))
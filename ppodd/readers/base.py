@@ -0,0 +1,25 @@
+"""
+The FileReader base class, which all decades file readers subclass.
+"""
+import abc
+
+
+class FileReader(abc.ABC):
+    """
+    An abstract class which should be subclassed to implement a decades
+    file reader.
+    """
+    level = 0
+
+    def __init__(self):
+        self.files = []
+        self.variables = []
+        self.metadata = []
+
+    @abc.abstractmethod
+    def read(self, decades_file):
+        """Override the read method to implement a FileReader."""
+
+    def __eq__(self, other):
+        return self.__class__ == other.__class__
+
@@ -0,0 +1,135 @@
+"""
+Readers for flight constants files.
+"""
+import json
+import os
+import types
+
+import yaml
+
+from ppodd.readers.base import FileReader
+from ppodd.utils.schema import compile_schema
+
+# Prefer the C accelerated yaml loader, if libyaml is available
+try:
+    YamlLoader = yaml.CSafeLoader
+except AttributeError:
+    YamlLoader = yaml.SafeLoader
+
+validate_flight_constants = compile_schema({
+    'Globals': {'*': object},
+    'Constants': {'*': dict},
+    'Modifications?': {
+        'Variables?': {'*': dict},
+        'Exclude?': list,
+        'Flags?': dict
+    }
+}, path='flight constants')
+
+# Parsed flight constants, keyed by filepath, with the (mtime, size) of the
+# file when it was parsed
+_flight_constants_cache = {}
+
+
+def _freeze(obj):
+    """
+    Get a read-only version of a parsed constants structure, recursively
+    replacing dicts with read-only views and lists with tuples.
+
+    Args:
+        obj: a structure of dicts, lists and scalars.
+
+    Returns:
+        the frozen structure.
+    """
+    if isinstance(obj, dict):
+        return types.MappingProxyType({k: _freeze(v) for k, v in obj.items()})
+
+    if isinstance(obj, list):
+        return tuple(_freeze(i) for i in obj)
+
+    return obj
+
+
+class FlightConstantsReader(FileReader):
+    """
+    Read a flight constants file. Parsed files are cached in memory, keyed on
+    their path and modification time, so the same constants file is only
+    parsed once per process. The cached constants are frozen, with dicts
+    replaced by read-only views and lists by tuples, so that they can be
+    shared between datasets without one dataset's changes leaking into
+    another.
+    """
+    def _load(self, *args, **kwargs):
+        raise NotImplementedError
+
+    def _load_cached(self, _file):
+        """
+        Load, validate and freeze a flight constants file, using the cached
+        constants if the file has not changed since it was last parsed.
+        """
+        if not _file.on_disk:
+            consts = self._load(_file)
+            validate_flight_constants(consts)
+            return _freeze(consts)
+
+        _stat = os.stat(_file.filepath)
+        _key = (_stat.st_mtime_ns, _stat.st_size)
+
+        try:
+            _cached_key, consts = _flight_constants_cache[_file.filepath]
+            if _cached_key == _key:
+                return consts
+        except KeyError:
+            pass
+
+        consts = self._load(_file)
+        validate_flight_constants(consts)
+        consts = _freeze(consts)
+        _flight_constants_cache[_file.filepath] = (_key, consts)
+
+        return consts
+
+    def read(self):
+        for _file in self.files:
+            print('Reading {}'.format(_file.filepath))
+            consts = self._load_cached(_file)
+
+            for key, value in consts['Globals'].items():
+                if type(value) is tuple:
+                    value = '\n'.join(value)
+
+                _file.dataset.add_global(key, value)
+
+            # Add a global indicating the flight constants file used
+            _file.dataset.add_global(
+                'constants_file', os.path.basename(_file.filepath)
+            )
+
+            for mod_name, mod_content in consts['Constants'].items():
+                _file.dataset.add_constants(mod_content)
+
+            modifications = consts.get('Modifications') or {}
+
+            for key, val in (modifications.get('Variables') or {}).items():
+                _file.dataset._variable_mods[key] = val
+
+            for pp_mod in modifications.get('Exclude') or []:
+                _file.dataset._mod_exclusions.append(pp_mod)
+
+            for key, val in (modifications.get('Flags') or {}).items():
+                _file.dataset._flag_mods[key] = val
+
+
+class JsonConstantsReader(FlightConstantsReader):
+    def _load(self, _file):
+        with _file.open('r') as _consts:
+            consts = json.loads(_consts.read())
+            return consts
+
+
+class YamlConstantsReader(FlightConstantsReader):
+    def _load(self, _file):
+        with _file.open('r') as _consts:
+            consts = yaml.load(_consts, Loader=YamlLoader)
+            return consts
@@ -0,0 +1,237 @@
+"""
+Time handling for GIN (Applanix POS) binary data. GIN timestamps are given as
+seconds of the GPS week, which are converted here to absolute times, in one
+vectorised pass, and regularised onto an exact, integer nanosecond grid.
+"""
+import datetime
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from dateutil import relativedelta
+
+from ppodd.utils import pd_freq
+
+__all__ = (
+    'SECONDS_PER_WEEK', 'LEAP_SECONDS', 'gps_utc_offset', 'week_start',
+    'unwrap_week', 'to_datetime64', 'regularise'
+)
+
+SECONDS_PER_WEEK = 604800
+
+# Time standards of GIN timestamps
+GPS = 'GPS'
+UTC = 'UTC'
+
+# The dates at which the offset GPS - UTC changed, with the offset from that
+# date, in seconds. GPS time was aligned with UTC at the GPS epoch,
+# 1980-01-06.
+LEAP_SECONDS = (
+    (datetime.datetime(1981, 7, 1), 1),
+    (datetime.datetime(1982, 7, 1), 2),
+    (datetime.datetime(1983, 7, 1), 3),
+    (datetime.datetime(1985, 7, 1), 4),
+    (datetime.datetime(1988, 1, 1), 5),
+    (datetime.datetime(1990, 1, 1), 6),
+    (datetime.datetime(1991, 1, 1), 7),
+    (datetime.datetime(1992, 7, 1), 8),
+    (datetime.datetime(1993, 7, 1), 9),
+    (datetime.datetime(1994, 7, 1), 10),
+    (datetime.datetime(1996, 1, 1), 11),
+    (datetime.datetime(1997, 7, 1), 12),
+    (datetime.datetime(1999, 1, 1), 13),
+    (datetime.datetime(2006, 1, 1), 14),
+    (datetime.datetime(2009, 1, 1), 15),
+    (datetime.datetime(2012, 7, 1), 16),
+    (datetime.datetime(2015, 7, 1), 17),
+    (datetime.datetime(2017, 1, 1), 18),
+)
+
+_LEAP_DATES = np.array(
+    [i[0] for i in LEAP_SECONDS], dtype='datetime64[ns]'
+).astype(np.int64)
+_LEAP_OFFSETS = np.array([0] + [i[1] for i in LEAP_SECONDS], dtype=np.int64)
+
+# Timestamps further than this fraction of a sample period from the sample
+# grid are reported as jitter.
+JITTER_TOLERANCE = 0.25
+
+
+def gps_utc_offset(times):
+    """
+    Get the offset GPS - UTC, in seconds, at given times.
+
+    Args:
+        times: an array of times, as integer nanoseconds since the epoch.
+
+    Returns:
+        an integer array of offsets, in seconds.
+    """
+    return _LEAP_OFFSETS[np.searchsorted(_LEAP_DATES, times, side='right')]
+
+
+def week_start(date):
+    """
+    Get the start of the GPS week containing a given date, which is the
+    Sunday on or before that date.
+
+    Args:
+        date: a datetime.datetime.
+
+    Returns:
+        a datetime.datetime, at midnight on the start of the GPS week.
+    """
+    start = date - relativedelta.relativedelta(
+        weekday=relativedelta.SU(-1)
+    )
+    return datetime.datetime.combine(start, datetime.datetime.min.time())
+
+
+def unwrap_week(seconds):
+    """
+    Unwrap a seconds-of-week timeseries across week rollovers, by adding a
+    week to all times following any backwards jump of more than half a
+    week.
+
+    Args:
+        seconds: an array of seconds of the GPS week.
+
+    Returns:
+        a float array of seconds since the start of the first week.
+    """
+    seconds = np.asarray(seconds, dtype=float)
+
+    if len(seconds) < 2:
+        return seconds
+
+    rollover = np.diff(seconds) < -SECONDS_PER_WEEK / 2
+    if not rollover.any():
+        return seconds
+
+    weeks = np.concatenate([[0], np.cumsum(rollover)])
+    return seconds + weeks * SECONDS_PER_WEEK
+
+
+def to_datetime64(seconds, date, standard=UTC):
+    """
+    Convert (unwrapped) seconds of the GPS week to absolute times.
+
+    Args:
+        seconds: an array of seconds since the start of the GPS week, as
+                 returned by unwrap_week.
+        date: the date of the data, used to determine the GPS week. If the
+              data start more than half a week after date, they are assumed
+              to belong to the previous week, i.e. the data started before
+              midnight at the end of a week.
+
+    Kwargs:
+        standard: the time standard of the timestamps, either 'UTC' (default)
+                  or 'GPS'. GPS times are converted to UTC using the leap
+                  second table.
+
+    Returns:
+        an array of times as integer nanoseconds since the epoch.
+    """
+    start = np.datetime64(week_start(date), 'ns').astype(np.int64)
+
+    seconds = np.asarray(seconds, dtype=float)
+    if len(seconds) and seconds[0] > SECONDS_PER_WEEK / 2 + (
+        date - week_start(date)
+    ).total_seconds():
+        seconds = seconds - SECONDS_PER_WEEK
+
+    times = start + np.around(seconds * 1e9).astype(np.int64)
+
+    if standard == GPS:
+        times -= gps_utc_offset(times) * 1000000000
+    elif standard != UTC:
+        raise ValueError('Unknown time standard: {}'.format(standard))
+
+    return times
+
+
+def regularise(times, frequency=None, name='GIN'):
+    """
+    Place a timeseries onto a regular grid of integer multiples of the sample
+    period, warning about gaps and jitter in the timestamps.
+
+    Args:
+        times: an array of times as integer nanoseconds since the epoch,
+               assumed to be (mostly) monotonic.
+
+    Kwargs:
+        frequency: the nominal sample frequency. If the frequency inferred
+                   from the median sample interval differs, the inferred
+                   frequency is used, with a warning.
+        name: a name for the timeseries, used in warnings.
+
+    Returns:
+        a 3-tuple of (frequency, index, positions), where index is a regular
+        pd.DatetimeIndex covering the data, and positions gives the location
+        of each input time in index. Where more than one input time maps to
+        the same location, only the last is retained, and the positions of
+        earlier times are -1.
+    """
+    times = np.asarray(times, dtype=np.int64)
+
+    if len(times) > 1:
+        _freq = 1e9 / np.median(np.diff(times))
+        _inferred = min(pd_freq, key=lambda i: abs(i - _freq))
+
+        if frequency is None:
+            frequency = _inferred
+        elif _inferred != frequency:
+            warnings.warn(
+                '{}: inferred frequency {} Hz differs from nominal {} '
+                'Hz'.format(name, _inferred, frequency),
+                RuntimeWarning
+            )
+            frequency = _inferred
+
+    if frequency is None:
+        frequency = 1
+
+    period = pd.Timedelta(pd_freq[frequency]).value
+
+    slots = np.floor_divide(times + period // 2, period)
+
+    jitter = np.abs(times - slots * period)
+    _n_jitter = np.sum(jitter > JITTER_TOLERANCE * period)
+    if _n_jitter:
+        warnings.warn(
+            '{}: {} timestamps jitter by more than {:.0%} of a '
+            'sample'.format(name, _n_jitter, JITTER_TOLERANCE),
+            RuntimeWarning
+        )
+
+    _dslots = np.diff(slots)
+    _n_gaps = np.sum(_dslots > 1)
+    if _n_gaps:
+        warnings.warn(
+            '{}: {} gaps, {} missing samples'.format(
+                name, _n_gaps, np.sum(_dslots[_dslots > 1] - 1)
+            ), RuntimeWarning
+        )
+
+    _n_back = np.sum(_dslots < 0)
+    if _n_back:
+        warnings.warn(
+            '{}: time goes backwards {} times'.format(name, _n_back),
+            RuntimeWarning
+        )
+
+    start = slots.min()
+    positions = slots - start
+
+    # Where multiple samples share a slot, keep only the last
+    _, _last = np.unique(positions[::-1], return_index=True)
+    _keep = np.zeros(len(positions), dtype=bool)
+    _keep[len(positions) - 1 - _last] = True
+    positions[~_keep] = -1
+
+    index = pd.DatetimeIndex(
+        (start + np.arange(slots.max() - start + 1)) * period
+    )
+
+    return frequency, index, positions
@@ -0,0 +1,380 @@
+"""
+Reader for core netCDF files, with lazy access to variables. File handles are
+kept open in a small, bounded pool, and variable data and flags are only read
+from file when they are first accessed.
+"""
+import collections
+import datetime
+import weakref
+
+import netCDF4
+import numpy as np
+import pandas as pd
+
+from ppodd.decades import DecadesVariable
+from ppodd.decades.attributes import Attribute
+from ppodd.decades.flags import DecadesBitmaskFlag, DecadesClassicFlag
+from ppodd.readers.base import FileReader
+from ppodd.utils import pd_freq
+
+__all__ = ('handles', 'LazyNetCDFVariable', 'CoreNetCDFReader')
+
+
+class NetCDFHandlePool(object):
+    """
+    A least-recently-used pool of open netCDF4.Dataset handles, keyed by file
+    path. When the pool is full, the least recently used handle is closed.
+    Handles which have been closed are transparently reopened on request.
+
+    Handles may be requested on behalf of an owner, typically a
+    DecadesDataset, so that all of the handles used by that owner can be
+    closed with release() once it is finished with them.
+    """
+
+    def __init__(self, maxsize=16):
+        """
+        Initialize a class instance.
+
+        Kwargs:
+            maxsize: the maximum number of handles to hold open at once.
+        """
+        self.maxsize = maxsize
+        self._handles = collections.OrderedDict()
+        self._owned = weakref.WeakKeyDictionary()
+
+    def get(self, filepath, memory=None, owner=None):
+        """
+        Get an open handle to a netCDF file.
+
+        Args:
+            filepath: the path to the netCDF file.
+
+        Kwargs:
+            memory: a buffer containing the netCDF file, for files which are
+                    not on disk. In this case filepath is used only as a key.
+            owner: an optional (weakly referenced) object on behalf of which
+                   the handle is opened. See release().
+
+        Returns:
+            an open netCDF4.Dataset.
+        """
+        if owner is not None:
+            self._owned.setdefault(owner, set()).add(filepath)
+
+        try:
+            self._handles.move_to_end(filepath)
+            return self._handles[filepath]
+        except KeyError:
+            pass
+
+        if memory is None:
+            handle = netCDF4.Dataset(filepath)
+        else:
+            handle = netCDF4.Dataset(filepath, memory=memory)
+        self._handles[filepath] = handle
+
+        while len(self._handles) > self.maxsize:
+            _, _old = self._handles.popitem(last=False)
+            _old.close()
+
+        return handle
+
+    def close(self, filepath=None):
+        """
+        Close pooled handles.
+
+        Kwargs:
+            filepath: the handle to close. If not given, all pooled handles
+                      are closed.
+        """
+        if filepath is None:
+            paths = list(self._handles.keys())
+        else:
+            paths = [filepath]
+
+        for path in paths:
+            try:
+                self._handles.pop(path).close()
+            except KeyError:
+                pass
+
+    def release(self, owner):
+        """
+        Close all handles which have been opened on behalf of an owner. Files
+        remain associated with the owner, so handles which are subsequently
+        reopened, for example by lazily loaded variables, are closed by the
+        next call to release().
+
+        Args:
+            owner: the owner passed to get().
+        """
+        for path in self._owned.get(owner, ()):
+            self.close(path)
+
+
+handles = NetCDFHandlePool()
+
+
+class LazyNetCDFVariable(DecadesVariable):
+    """
+    A DecadesVariable backed by a variable in a netCDF file with a regular,
+    1 Hz Time dimension. Neither the data nor the flag are read from file
+    until they are first accessed, and trimming the variable before then
+    simply narrows the window of samples which will eventually be read.
+    """
+
+    def __init__(self, filepath, ncname, time, **kwargs):
+        """
+        Initialize a class instance.
+
+        Args:
+            filepath: the path to the netCDF file containing the variable.
+            ncname: the name of the variable in the netCDF file.
+            time: a regular, 1 Hz DatetimeIndex giving the Time dimension of
+                  the netCDF file.
+
+        Kwargs:
+            memory: a buffer containing the netCDF file, if it is not on disk.
+            flag: the flag class associated with the variable, default
+                  DecadesClassicFlag.
+            frequency: the frequency of the variable. Required.
+            Further keywords are handled as in DecadesVariable.
+        """
+        _flag = kwargs.pop('flag', DecadesClassicFlag)
+        _memory = kwargs.pop('memory', None)
+        kwargs.setdefault('name', ncname)
+        self._init_attrs(kwargs)
+
+        self._filepath = filepath
+        self._memory = _memory
+        self._ncname = ncname
+        self._flag_class = _flag
+        self._array = None
+        self._flag = None
+
+        # The window of samples, in the flattened netCDF variable, which this
+        # variable represents.
+        self._sample_start = 0
+        self._sample_stop = len(time) * self.frequency
+
+        self.t0 = time[0]
+        self.t1 = time[-1] + pd.Timedelta(1, unit='s') - pd.Timedelta(
+            pd_freq[self.frequency]
+        )
+        self.attrs.add(Attribute('ancillary_variables', f'{self.name}_FLAG'))
+
+    def __len__(self):
+        if self._array is not None:
+            return len(self._array)
+        return self._sample_stop - self._sample_start
+
+    def __repr__(self):
+        return r'<LazyNetCDFVariable[{!r}]>'.format(self.name)
+
+    @property
+    def loaded(self):
+        """
+        True if the data have been read from file, False otherwise.
+        """
+        return self._array is not None
+
+    @property
+    def array(self):
+        if self._array is None:
+            self._array = self._load()
+        return self._array
+
+    @array.setter
+    def array(self, value):
+        self._array = value
+
+    @property
+    def flag(self):
+        if self._flag is None:
+            self._flag = self._load_flag()
+        return self._flag
+
+    @flag.setter
+    def flag(self, value):
+        self._flag = value
+
+    def _read_window(self, ncvar):
+        """
+        Read the current window of samples from a netCDF variable, reading
+        only the records which overlap the window.
+
+        Args:
+            ncvar: the netCDF4 variable to read from.
+
+        Returns:
+            a flattened (masked) array of the samples in the window.
+        """
+        freq = self.frequency
+        row_start = self._sample_start // freq
+        row_stop = -(-self._sample_stop // freq)
+
+        data = np.ma.asarray(ncvar[row_start:row_stop]).ravel()
+
+        offset = self._sample_start - row_start * freq
+        return data[offset:offset + self._sample_stop - self._sample_start]
+
+    def _load(self):
+        """
+        Read the variable data from file. Masked values are replaced with NaN.
+
+        Returns:
+            the (downcast) variable data.
+        """
+        ncvar = handles.get(self._filepath, memory=self._memory)[self._ncname]
+        data = self._read_window(ncvar)
+
+        if np.ma.is_masked(data):
+            data = data.astype(float).filled(np.nan)
+        else:
+            data = np.ma.getdata(data)
+
+        return self._downcast(data)
+
+    def _load_flag(self):
+        """
+        Build the flag for this variable from the associated netCDF flag
+        variable. Bitmask flags are decoded only over the current window.
+
+        Returns:
+            a flag instance, of the class given at initialisation.
+        """
+        nc = handles.get(self._filepath, memory=self._memory)
+
+        try:
+            ncflag = nc[f'{self._ncname}_FLAG']
+        except IndexError:
+            return self._flag_class(self)
+
+        if issubclass(self._flag_class, DecadesBitmaskFlag):
+            return self._flag_class.from_nc_variable(
+                ncflag, self, data=np.ma.getdata(self._read_window(ncflag))
+            )
+
+        return self._flag_class.from_nc_variable(ncflag, self)
+
+    def trim(self, start, end):
+        if self._array is not None:
+            return super().trim(start, end)
+
+        if self._flag is not None:
+            self._flag.trim(start, end)
+
+        _index = pd.date_range(
+            start=self.t0, end=self.t1, freq=pd_freq[self.frequency]
+        )
+        _keep = np.flatnonzero((_index >= start) & (_index <= end))
+
+        if not _keep.size:
+            # The window does not overlap the variable, which becomes empty
+            self._sample_stop = self._sample_start
+            self.t1 = self.t0 - pd.Timedelta(pd_freq[self.frequency])
+            return
+
+        self._sample_stop = self._sample_start + _keep[-1] + 1
+        self._sample_start += _keep[0]
+        self.t0 = _index[_keep[0]]
+        self.t1 = _index[_keep[-1]]
+
+    def merge(self, other):
+        # Ensure the flag is built over the unmerged window, as it would be
+        # for an eagerly loaded variable.
+        self.flag
+        super().merge(other)
+
+
+class CoreNetCDFReader(FileReader):
+    level = 2
+
+    def _time_at(self, time, freq):
+        if freq == 1:
+            return time
+
+        return pd.date_range(
+            time[0], time[-1] + datetime.timedelta(seconds=1),
+            freq=pd_freq[freq]
+        )[:-1]
+
+    def _var_freq(self, var):
+        try:
+            return var.shape[1]
+        except IndexError:
+            return 1
+
+    def _flag_class(self, var_name, nc):
+        try:
+            nc[f'{var_name}_FLAG'].flag_masks
+            return DecadesBitmaskFlag
+        except AttributeError:
+            return DecadesClassicFlag
+
+    def flag(self, var, nc):
+        flag_var = nc[f'{var.name}_FLAG']
+        var.flag = type(var.flag).from_nc_variable(flag_var, var)
+
+    def _is_regular(self, time):
+        """
+        Returns True if time is a regular 1 Hz index, in which case variables
+        can be loaded lazily, False otherwise.
+        """
+        return bool(len(time)) and np.all(
+            np.diff(time.asi8) == pd.Timedelta(1, unit='s').value
+        )
+
+    def read(self):
+        for _file in self.files:
+            print(f'Reading {_file}...')
+
+            # File handles are pooled, so that variable data can be read on
+            # first access rather than up front. Files which are not on disk
+            # are opened from memory.
+            memory = None if _file.on_disk else _file.buffer()
+            nc = handles.get(
+                _file.filepath, memory=memory, owner=_file.dataset
+            )
+
+            time = pd.DatetimeIndex(
+                netCDF4.num2date(
+                    nc['Time'][:], units=nc['Time'].units,
+                    only_use_cftime_datetimes=False,
+                    only_use_python_datetimes=True
+                )
+            )
+            lazy = self._is_regular(time)
+
+            for var in nc.variables:
+                if var.endswith('FLAG') or var == 'Time':
+                    continue
+                if not _file.dataset.requires(var):
+                    continue
+
+                ncvar = nc[var]
+
+                if lazy:
+                    variable = LazyNetCDFVariable(
+                        _file.filepath, var, time,
+                        memory=memory,
+                        write=False,
+                        flag=self._flag_class(var, nc),
+                        frequency=ncvar.frequency
+                    )
+                else:
+                    variable = DecadesVariable(
+                        {var: ncvar[:].ravel()},
+                        index=self._time_at(time, self._var_freq(ncvar)),
+                        name=var,
+                        write=False,
+                        flag=self._flag_class(var, nc),
+                        frequency=ncvar.frequency
+                    )
+
+                    self.flag(variable, nc)
+
+                for attr, value in ncvar.__dict__.items():
+                    setattr(variable, attr, value)
+
+                _file.dataset.add_input(variable)
@@ -1,32 +1,47 @@
 import numpy as np
 
-from ppodd.readers import FileReader, register
+from ppodd.readers.base import FileReader
 from ppodd.decades import DecadesVariable
 
 from .utils import to_dataframe
 from .parser import parser_f
 
-@register(patterns=['.*\.wcm'])
+
+def _variable_name(sentence, name):
+    return 'SEAPROBE_{}_{}'.format(sentence, name.replace('el', ''))
+
+
 class WcmFileReader(FileReader):
     def read(self):
         for _file in self.files:
+            _required = any(
+                _file.dataset.requires(_variable_name(k, name))
+                for k in parser_f for name in parser_f[k]['names']
+            )
+
+            if not _required:
+                print(f'Skipping {_file} (no required variables)')
+                continue
+
             print(f'Reading {_file}')
-            dfs, metadata = to_dataframe(_file.filepath)
+            with _file.open() as _wcm:
+                dfs, metadata = to_dataframe(_wcm)
 
 
             for k in dfs.keys():
                 df = dfs[k]
                 for i, name in enumerate(parser_f[k]['names']):
+                    _varname = _variable_name(k, name)
+
+                    if not _file.dataset.requires(_varname):
+                        continue
+
                     _freq = int(
                         np.timedelta64(1, 's') / dfs[k].index.freq.delta
                     )
 
                     _data = df[name].values
 
-                    _varname = 'SEAPROBE_{}_{}'.format(
-                        k, name.replace('el', '')
-                    )
-
                     _var = DecadesVariable(
                         {_varname: _data},
                         index=df.index,
@@ -38,5 +53,5 @@ class WcmFileReader(FileReader):
 
                     _file.dataset.add_input(_var)
 
-        for key, value in metadata.items():
-            _file.dataset.constants['SEA_{}'.format(key)] = value
+            for key, value in metadata.items():
+                _file.dataset.constants['SEA_{}'.format(key)] = value
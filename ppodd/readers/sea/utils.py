@@ -1,56 +1,131 @@
-from datetime import datetime, timedelta
+import io
+import warnings
 
 import numpy as np
 import pandas as pd
 
-from scipy.interpolate import interp1d
-
 from .parser import parser_f
 
+D3_DATETIME_FORMAT = '%Y/%m/%d %H:%M:%S.%f'
+
 
-def timestamp_func(d3):
+def interp_timestamps(rows, ref_rows, ref_times):
+    """
+    Calculate interpolated time stamps for data lines.
+
+    The d3 sentence provides date and time stamps for that data line. Use
+    linear interpolation (and extrapolation beyond the first and last d3
+    lines) based on the row number to calculate datetime stamps for all data
+    lines, in a single pass.
+
+    :param rows: row numbers of the lines to timestamp
+    :type rows: numpy.array of int
+    :param ref_rows: row numbers of the d3 lines
+    :type ref_rows: numpy.array of int
+    :param ref_times: timestamps of the d3 lines
+    :type ref_times: numpy.array of numpy.datetime64
+    :returns: timestamps, at microsecond resolution
+    :rtype: numpy.array of numpy.datetime64[us]
     """
-    Create function to calculate interpolated time stamps
+    ref_times = ref_times.astype('datetime64[us]')
 
-    The d3 sentence provides date and time stamps for that data
-    line. Use linear interpolation based on the row number to
-    produce a function to calculate datetime stamps for all data
-    lines.
+    # Fit in microseconds relative to the first d3 timestamp
+    delta = (ref_times - ref_times[0]).astype(np.int64).astype(float)
 
-    :params d3:
-    :type d3: dict
+    rows = np.asarray(rows, dtype=float)
+    ref_rows = np.asarray(ref_rows, dtype=float)
 
-    .. TODO::
-        Change so can input arrays into returned func
+    fit = np.interp(rows, ref_rows, delta)
+
+    # np.interp clamps outside of the reference rows; extrapolate linearly
+    # using the first and last segments
+    before = rows < ref_rows[0]
+    after = rows > ref_rows[-1]
+    fit[before] = delta[0] + (rows[before] - ref_rows[0]) * (
+        (delta[1] - delta[0]) / (ref_rows[1] - ref_rows[0])
+    )
+    fit[after] = delta[-1] + (rows[after] - ref_rows[-1]) * (
+        (delta[-1] - delta[-2]) / (ref_rows[-1] - ref_rows[-2])
+    )
 
+    return ref_times[0] + np.around(fit).astype(np.int64).astype(
+        'timedelta64[us]'
+    )
+
+
+def _split_sentences(raw_data, sentence_ids):
     """
-    dt = np.array([
-        (datetime.combine(d, t)).replace(tzinfo=None)
-        for (d, t) in list(zip(d3['data']['date'], d3['data']['time']))
-    ])
-
-    # Convert to milliseconds to do fitting
-    delta_dt = np.array([
-        timedelta.total_seconds(dt_ - dt[0]) * 1e6
-        for dt_ in dt
-    ]).astype('timedelta64[us]')
-
-    row_nums = d3['row']
-
-    try:
-        delta_fit = interp1d(
-            row_nums, delta_dt, kind='linear', fill_value='extrapolate',
-            assume_sorted=True
+    Split the lines of a wcm file by sentence id.
+
+    :param raw_data: the lines of the file
+    :type raw_data: numpy.array of bytes
+    :param sentence_ids: the sentence ids to extract
+    :returns: dictionary of (row numbers, lines) for each sentence id.
+        Lines which do not have the correct number of fields for their
+        sentence type are dropped.
+    """
+    mtype = np.char.partition(raw_data, b',')[:, 0]
+
+    sentences = {}
+    for k in sentence_ids:
+        rows = np.flatnonzero(mtype == k.encode())
+        lines = raw_data[rows]
+
+        valid = (
+            np.char.count(lines, b',') == len(parser_f[k]['names']) - 1
         )
-    except ValueError:
-        # Did not converge, probably not enough data points
-        return None
-    else:
-        def _f(r_):
-            return dt[0] + timedelta(
-                microseconds=int(np.around(delta_fit(r_)))
+
+        if not np.all(valid):
+            warnings.warn(
+                'Skipping {} malformed {} sentences'.format(
+                    np.sum(~valid), k
+                ), RuntimeWarning
             )
-        return _f
+
+        sentences[k] = (rows[valid], lines[valid])
+
+    return sentences
+
+
+def _parse_sentences(k, lines):
+    """
+    Parse all of the lines of a given sentence type into a DataFrame, using
+    the pandas C csv engine.
+
+    :param k: the sentence id
+    :param lines: the lines of sentence type k
+    :type lines: numpy.array of bytes
+    :returns: a DataFrame with a column for each field of the sentence.
+        Numeric fields are float, with NaN for values which cannot be parsed,
+        string fields are bytes and object fields are left as str.
+    """
+    names = parser_f[k]['names']
+    types = dict(zip(names, parser_f[k]['dtypes']))
+
+    if not len(lines):
+        return pd.DataFrame(columns=names)
+
+    float_cols = [n for n in names if 'float' in types[n]]
+    str_cols = [n for n in names if types[n][0] == 'S']
+
+    dtypes = {n: str for n in names if types[n][0] in ('S', 'o')}
+
+    # Numeric types are inferred, rather than given, so that a corrupt value
+    # doesn't fail the whole file
+    df = pd.read_csv(
+        io.BytesIO(b'\n'.join(lines)), header=None, names=names,
+        dtype=dtypes, engine='c', keep_default_na=False,
+        na_values={n: ['', 'nan', 'NaN'] for n in float_cols}
+    )
+
+    for name in float_cols:
+        if df[name].dtype.kind != 'f':
+            df[name] = pd.to_numeric(df[name], errors='coerce').astype(float)
+
+    for name in str_cols:
+        df[name] = np.char.encode(df[name].values.astype(str)).astype(object)
+
+    return df
 
 
 def get_frequency(timestamp):
@@ -85,7 +160,7 @@ def to_dataframe(ifile, rtn_all=False):
     """
     returns a dictionary where each item holds the data for a data sentence.
 
-    :param ifile: input file
+    :param ifile: input file, as a path or a binary file object
     :key rtn_all: set to `True` if all data sentences should be parsed
     :return: dictionary of pandas.DataFrame
 
@@ -107,93 +182,62 @@ def to_dataframe(ifile, rtn_all=False):
     """
     default_sentences = ['d0', 'd3', 'c0']
 
-    # Read the wcm txt file into raw_data as a 1D-numpy.array of strings
-    with open(ifile) as f:
-        raw_data = np.genfromtxt(f, dtype='S')
-
-        if len(raw_data) == 0:
-            # Empty file so return
-            return None
-
-    raw_data = np.array([i.decode() for i in raw_data])
+    # Read the wcm txt file into raw_data as a 1D-numpy.array of lines
+    if hasattr(ifile, 'read'):
+        raw_data = np.array(ifile.read().split())
+    else:
+        with open(ifile, 'rb') as f:
+            raw_data = np.array(f.read().split())
 
-    # Create a list of sentence ids
-    # Lines that do not conform to type are ignored
-    mtype = np.array(
-        [l.split(',')[0] for l in raw_data if l.split(',')!=[]]
-    )
+    if len(raw_data) == 0:
+        # Empty file so return
+        return None
 
     if rtn_all is True:
-        sentence_id = np.unique(mtype)
+        sentence_id = [
+            k.decode() for k in np.unique(
+                np.char.partition(raw_data, b',')[:, 0]
+            ) if k.decode() in parser_f
+        ]
     else:
         # Only return d0, d3 and c0 by default
         # Those sentences are all that is
         # required for calculation of water content
-        sentence_id = np.asarray(default_sentences)
-
-    # Dictionary of raw and parsed data sentences
-    # 'row' key is array of row numbers in file
-    wcm = {'raw': {k: raw_data[(mtype == k)] for k in sentence_id},
-           'parsed': {k: {'description': parser_f[k]['descr'],
-                          'row': np.where(mtype == k)[0]} for k in sentence_id}}
-
-    # Parse raw data sentences
-    for k in sentence_id:
-        # skip invalid lines instead of raising error
-        wcm['parsed'][k]['data'] = np.genfromtxt(
-            wcm['raw'][k], delimiter=',',
-            dtype=list(zip(parser_f[k]['names'], parser_f[k]['dtypes'])),
-            converters=parser_f[k]['converters'],
-            invalid_raise=False
-        )
+        sentence_id = default_sentences
+
+    sentences = _split_sentences(raw_data, sentence_id)
 
-    # Determine interpolated time stamp function
-    dt_func = timestamp_func(wcm['parsed']['d3'])
+    parsed = {
+        k: _parse_sentences(k, lines) for k, (rows, lines) in sentences.items()
+    }
 
-    if dt_func is None:
-        msg = 'SEA file too short for timestamp interpolation.'
-        if ppodd:
-            ppodd.logger.info(msg)
-        else:
-            sys.stdout.write(msg+'\n')
+    # Determine interpolated time stamps from the d3 sentences
+    d3_rows = sentences['d3'][0]
+    if len(d3_rows) < 2:
+        print('SEA file too short for timestamp interpolation.')
         return None
 
+    d3 = parsed['d3']
+    d3_dt = pd.to_datetime(
+        d3['date'] + ' ' + d3['time'], format=D3_DATETIME_FORMAT
+    )
+    d3['date'] = d3_dt.dt.date
+    d3['time'] = d3_dt.dt.tz_localize('UTC').dt.timetz
+    d3_dt = d3_dt.values
+
     df_dic = {}
-    for k in list(wcm['parsed'].keys()):
-        wcm['parsed'][k]['dt'] = np.array(
-            [np.datetime64(dt_func(t_).replace(tzinfo=None))
-             for t_ in wcm['parsed'][k]['row']]
-        )
+    for k, df in parsed.items():
+        rows = sentences[k][0]
+        if not len(rows):
+            continue
+
+        dt = interp_timestamps(rows, d3_rows, d3_dt)
+
+        freq = get_frequency(dt)
+        ts_start = dt[0]
+        ts_end = dt[-1]
 
-        freq = get_frequency(wcm['parsed'][k]['dt'])
-        wcm['parsed'][k]['f'] = freq
-        ts_start = wcm['parsed'][k]['dt'][0]
-        ts_end = wcm['parsed'][k]['dt'][-1]
-
-        # Extract data from parsed dict as a list of arrays for each column
-        data_list = []
-        for name in parser_f[k]['names']:
-            data_list.append(wcm['parsed'][k]['data'][name])
-
-        # Create 2D array of data for conversion to dataframe
-        # Attempt to do some error catching to cope with mis-formed data
-        try:
-            data_array = np.column_stack(data_list)
-        except:
-            import pdb
-            pdb.set_trace()
-
-        # Create dataframe with datetime index. Note that index has been
-        # (possibly) truncated to cope with partial lines at the end of
-        # the file. Normally, len(data_array) == len(wcm['parsed'][k]['dt'])
-        df = pd.DataFrame(data_array,
-                          columns=parser_f[k]['names'],
-                          index=wcm['parsed'][k]['dt'][:len(data_array)])
-
-        dd = dict(zip(parser_f[k]['names'], parser_f[k]['dtypes']))
-        for name in parser_f[k]['names']:
-            if 'float' in dd[name]:
-                df[name] = df[name].astype(float)
+        df.index = pd.DatetimeIndex(dt)
 
         if freq:
             # create a new index for resampling the irregular data
@@ -204,7 +248,7 @@ def to_dataframe(ifile, rtn_all=False):
 
             df = df.reindex(index=newIndex, method='nearest')
 
-        df_dic[k] = df.copy()
+        df_dic[k] = df
 
     _meta = {}
     # Add probe metadata as dictionary accessor
@@ -215,13 +259,13 @@ def to_dataframe(ifile, rtn_all=False):
 #
 #        # Add these parameters to the sea metadata. All rows are the same
 #        df_dic['d0'].ppodd.set_sea_meta('el'+el,
-#                                        {_k:df_dic['c0']['el{}_{}'.format(el,_k)][0] for _k in k})
+#                                        {_k:df_dic['c0']['el{}_{}'.format(el,_k)].iloc[0] for _k in k})
         _meta['el' + el] = {
-            _k:df_dic['c0']['el{}_{}'.format(el,_k)][0] for _k in k
+            _k:df_dic['c0']['el{}_{}'.format(el,_k)].iloc[0] for _k in k
         }
 #
 #    # Add serial number
 #    df_dic['d0'].ppodd.set_sea_meta('sea',{'sn': df_dic['c0']['sn'][0]})
-    _meta['sn'] = df_dic['c0']['sn'][0]
+    _meta['sn'] = df_dic['c0']['sn'].iloc[0]
 
     return df_dic, _meta
@@ -0,0 +1,317 @@
+"""
+Readers for tabular (csv and columnar) files.
+"""
+import csv
+import datetime
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from ppodd.decades import DecadesVariable
+from ppodd.readers.base import FileReader
+from ppodd.utils import pd_freq
+
+
+def _infer_frequency(index, _file):
+    """
+    Get the frequency of data from their timestamps, warning if these are not
+    regular. Data with fewer than two timestamps are assumed to be 1 Hz, and
+    data at less than 1 Hz are placed on a 1 Hz grid.
+
+    Args:
+        index: the pd.DatetimeIndex of the data.
+        _file: the file the data were read from, used in warnings.
+
+    Returns:
+        the frequency, in Hz, as an int.
+    """
+    if len(index) < 2:
+        warnings.warn(
+            '{} has fewer than two timestamps, assuming 1 Hz'.format(_file),
+            RuntimeWarning
+        )
+        return 1
+
+    _dt = np.diff(index.asi8)
+    _median = np.median(_dt)
+    _freq = int(round(1e9 / _median))
+
+    if _freq < 1:
+        warnings.warn(
+            '{} has data at less than 1 Hz, placing on a 1 Hz grid'.format(
+                _file
+            ), RuntimeWarning
+        )
+        return 1
+
+    if np.any(_dt != _median):
+        warnings.warn(
+            '{} has irregular timestamps, assuming {} Hz'.format(
+                _file, _freq
+            ), RuntimeWarning
+        )
+
+    return _freq
+
+
+def _period(frequency):
+    """
+    Get the sample period at a frequency, in integer nanoseconds.
+    """
+    try:
+        return pd.Timedelta(pd_freq[frequency]).value
+    except KeyError:
+        return int(round(1e9 / frequency))
+
+
+class CSVReader(FileReader):
+    """
+    Read a csv file, where the first column is a timestamp and all other
+    columns are data. Files are parsed with the pandas C engine, in chunks of
+    chunksize rows. Numeric columns are read as dtype, and any other columns
+    are kept as they are parsed.
+
+    Timestamps are parsed with time_format if given. Otherwise the format is
+    detected from the first timestamp, from time_formats, falling back to
+    pandas' format inference.
+    """
+    level = 2
+    chunksize = 100000
+    dtype = np.float64
+    time_format = None
+    time_formats = (
+        '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M:%S.%f', '%Y-%m-%dT%H:%M:%S',
+        '%Y-%m-%dT%H:%M:%S.%f'
+    )
+
+    def _parse_time(self, times):
+        """
+        Parse an array of timestamp strings to a DatetimeIndex.
+        """
+        time_format = self.time_format
+        if time_format is None:
+            for _format in self.time_formats:
+                try:
+                    datetime.datetime.strptime(times[0], _format)
+                except ValueError:
+                    continue
+                time_format = _format
+                break
+
+        try:
+            return pd.DatetimeIndex(pd.to_datetime(times, format=time_format))
+        except ValueError:
+            return pd.DatetimeIndex(pd.to_datetime(times))
+
+    def _column(self, chunks):
+        """
+        Join the chunks of a data column, casting numeric columns to dtype.
+        """
+        if all(i.dtype.kind in 'biuf' for i in chunks):
+            return np.concatenate(chunks).astype(self.dtype, copy=False)
+        return np.concatenate([i.astype(object) for i in chunks])
+
+    def read(self):
+        for _file in self.files:
+            with _file.open('r') as _csv:
+                columns = next(csv.reader([_csv.readline()]))
+
+                # Only the timestamp column type is fixed, so that a column
+                # which isn't numeric doesn't stop the file being read
+                chunks = pd.read_csv(
+                    _csv, header=None, names=columns, engine='c',
+                    dtype={columns[0]: str}, chunksize=self.chunksize
+                )
+
+                times = []
+                data = {column: [] for column in columns[1:]}
+                for chunk in chunks:
+                    times.append(chunk[columns[0]].values)
+                    for column in columns[1:]:
+                        data[column].append(chunk[column].values)
+
+            if not times:
+                continue
+
+            index = self._parse_time(np.concatenate(times))
+            _freq = _infer_frequency(index, _file)
+
+            for column, chunks in data.items():
+                variable_name = f'CSV_{column}'
+                variable = DecadesVariable.from_array(
+                    self._column(chunks),
+                    index,
+                    name=variable_name,
+                    long_name=variable_name,
+                    units='RAW',
+                    frequency=_freq,
+                    write=False
+                )
+
+                _file.dataset.add_input(variable)
+
+
+class ArrowFileReader(FileReader):
+    """
+    Read columnar Parquet or Arrow IPC (feather) files, for example
+    pre-decoded DLU data. Each file should contain a timestamp column, named
+    by time_column, and each other column is read as a variable. Columns may
+    either be scalar, or fixed size lists holding multiple samples per
+    timestamp.
+
+    The frequency of a variable is given by the 'frequency' key in the field
+    metadata, the schema metadata, or is inferred from the timestamps, as
+    for CSVReader. The long_name and units of a variable may also be given
+    in the field metadata.
+
+    If the dataset has a time_window, only rows within that window are read.
+    Requires pyarrow.
+    """
+    level = 2
+    time_column = 'time'
+
+    def _format(self, _file):
+        if _file.filepath.endswith('.parquet'):
+            return 'parquet'
+        return 'ipc'
+
+    def _dataset(self, _file):
+        """
+        Get a pyarrow dataset for a file. Files on disk are memory mapped.
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.dataset as ds
+            import pyarrow.fs
+            import pyarrow.ipc
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError(
+                'pyarrow is required to read {}'.format(_file.filepath)
+            )
+
+        _format = self._format(_file)
+
+        if _file.on_disk:
+            return ds.dataset(
+                _file.filepath, format=_format,
+                filesystem=pyarrow.fs.LocalFileSystem(use_mmap=True)
+            )
+
+        _buffer = pa.py_buffer(_file.buffer())
+        if _format == 'parquet':
+            table = pq.read_table(pa.BufferReader(_buffer))
+        else:
+            table = pyarrow.ipc.open_file(_buffer).read_all()
+
+        return ds.dataset(table)
+
+    @staticmethod
+    def _as_column_time(value, _type):
+        """
+        Get a timestamp with the same timezone awareness as a timestamp column
+        type. Naive timestamps are taken to be UTC.
+        """
+        value = pd.Timestamp(value)
+        _tz = getattr(_type, 'tz', None)
+
+        if _tz is None:
+            if value.tz is not None:
+                value = value.tz_convert('UTC').tz_localize(None)
+            return value
+
+        if value.tz is None:
+            value = value.tz_localize('UTC')
+        return value.tz_convert(_tz)
+
+    def _filter(self, dataset):
+        """
+        Get a filter expression restricting data to the dataset time window,
+        which can be pushed down into the file scan.
+        """
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        window = getattr(self.dataset, 'time_window', None)
+        if window is None:
+            return None
+
+        _type = dataset.schema.field(self.time_column).type
+        start, end = (
+            pa.scalar(self._as_column_time(i, _type), type=_type)
+            for i in window
+        )
+
+        return (
+            (ds.field(self.time_column) >= start)
+            & (ds.field(self.time_column) <= end)
+        )
+
+    @staticmethod
+    def _metadata(metadata, key):
+        try:
+            return metadata[key.encode()].decode()
+        except (KeyError, TypeError):
+            return None
+
+    def read(self):
+        for _file in self.files:
+            print(f'Reading {_file}...')
+            self.dataset = _file.dataset
+
+            dataset = self._dataset(_file)
+            table = dataset.to_table(filter=self._filter(dataset))
+
+            if not table.num_rows:
+                continue
+
+            index = pd.DatetimeIndex(
+                table.column(self.time_column).to_numpy()
+            ).tz_localize(None)
+
+            _freq = self._metadata(table.schema.metadata, 'frequency')
+            if _freq is None:
+                _freq = _infer_frequency(index, _file)
+
+            for field in table.schema:
+                if field.name == self.time_column:
+                    continue
+
+                column = table.column(field.name).combine_chunks()
+
+                samples = 1
+                if hasattr(field.type, 'list_size'):
+                    samples = field.type.list_size
+                    column = column.flatten()
+
+                frequency = self._metadata(field.metadata, 'frequency')
+                if frequency is None:
+                    frequency = int(_freq) * samples
+                frequency = int(frequency)
+
+                # Samples within each row are spread over the row, on an
+                # exact grid at the variable frequency
+                _index = index
+                if samples > 1:
+                    _index = pd.DatetimeIndex(
+                        np.repeat(index.asi8, samples) + np.tile(
+                            np.arange(samples) * _period(frequency),
+                            len(index)
+                        )
+                    )
+
+                variable = DecadesVariable.from_array(
+                    column.to_numpy(zero_copy_only=False),
+                    _index,
+                    name=field.name,
+                    long_name=(
+                        self._metadata(field.metadata, 'long_name')
+                        or field.name
+                    ),
+                    units=self._metadata(field.metadata, 'units') or 'RAW',
+                    frequency=frequency,
+                    write=False
+                )
+
+                _file.dataset.add_input(variable)
@@ -0,0 +1,534 @@
+"""
+Readers for DLU binary (tcp) data and the crio definition files which
+describe them.
+"""
+import csv
+import os
+import re
+import sys
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from ppodd.decades import DecadesVariable
+from ppodd.readers import gin
+from ppodd.readers.base import FileReader
+from ppodd.utils import pd_freq
+from ppodd.utils.cache import cache_key, load_cached, dump_cached
+
+C_BAD_TIME_DEV = 43200
+
+# Bump whenever CrioTcpDefintion, or the parsing of definitions, changes
+CRIO_CACHE_FORMAT = 1
+
+
+class TcpFileReader(FileReader):
+    level = 2
+    time_variable = 'utc_time'
+
+    def scan(self, dfile, definition, buffer=None):
+        print('Scanning {}...'.format(dfile))
+
+        # Work on a view of the file, rather than a copy
+        if buffer is None:
+            buffer = dfile.buffer()
+        rawdata = memoryview(buffer)
+
+        offsets = self._get_packet_offsets(definition, rawdata)
+        packet_lens = np.diff(offsets)
+        np.append(packet_lens, 1)
+
+        good_indicies = packet_lens == definition.packet_length
+
+        megaslice = [
+            slice(i, i+definition.packet_length)
+            for i, j in zip(offsets, good_indicies) if j
+        ]
+
+        index = np.zeros(len(rawdata), dtype=bool)
+
+        for i, _slice in enumerate(megaslice):
+            index[_slice] = True
+
+        rawbytes = np.frombuffer(rawdata, 'b')
+        _output = np.frombuffer(rawbytes[index], dtype=definition.dtypes)
+
+        return _output
+
+    def _get_packet_offsets(self, definition, rawdata):
+        rex = re.compile(b'\$' + definition.identifier.encode())
+        offsets = [i.start() for i in rex.finditer(rawdata)]
+        return offsets
+
+    def _scan_read_packet_len(self, definition, offset, rawdata):
+        packet_dlen = definition.dtypes['packet_length'].itemsize
+        id_length = definition.dtypes[0].itemsize
+
+        packet_length = np.frombuffer(
+            rawdata[offset+id_length:offset+id_length+packet_dlen],
+            dtype=definition.dtypes['packet_length']
+        )[0]
+
+        return packet_length
+
+    def _get_definition(self, _file):
+        for _definition in _file.dataset.definitions:
+            _crio_type = os.path.basename(_file.filepath).split('_')[0]
+            if _definition.identifier == _crio_type:
+                return _definition
+
+    def _get_index_fast(self, time, frequency):
+        """
+        Returns an interpolated (subsecond) index using a fast,
+        but potentially error-prone method.
+
+        args:
+            _data: a named np.ndarray, assumed to contain
+                'utc_time'
+            frequency: the frequency to interpolate to (s).
+
+        returns:
+            a pandas.DatetimeIndex
+        """
+        _time = np.append(
+            time, [time[-1] + 1]
+        )
+        index = pd.to_datetime(_time, unit='s')
+        return pd.date_range(_time[0], time[-1], freq=pd_freq[frequency])[:-1]
+
+    def _get_index_slow(self, time, frequency):
+        """
+        Returns an interpolated (subsecond) index using a slightly,
+        slower, but more robust method.
+
+        args:
+            _data: a named np.ndarray, assumed to contain
+                'utc_time'
+            frequency: the frequency to interpolate to (s).
+
+        returns:
+            a pandas.DatetimeIndex
+        """
+        _time = np.append(
+            time, [time[-1] + 1]
+        )
+        _index = pd.to_datetime(_time, unit='s')
+        _index = _index.unique()
+
+        df = pd.DataFrame(index=_index)
+        df['temp'] = 0
+
+        i = df.asfreq(
+            pd_freq[frequency]
+        ).interpolate(
+            method='time', limit=frequency-1
+        ).dropna().index
+
+        return i[:-1]
+
+    def _get_index(self, var, name, time, definition):
+        try:
+            frequency = definition.dtypes[name].shape[0]
+        except IndexError:
+            frequency = 1
+
+        if frequency != 1:
+            if frequency not in self._index_dict:
+                try:
+                    self._index_dict[frequency] = self._get_index_fast(time, frequency)
+                except ValueError:
+                    # Hacky - why do we need this (TODO)
+                    self._index_dict[frequency] = np.array([])
+                if self._index_dict[frequency].shape != var.ravel().shape:
+                    self._index_dict[frequency] = self._get_index_slow(time, frequency)
+        else:
+            if 1 not in self._index_dict:
+                self._index_dict[1] = pd.to_datetime(time, unit='s')
+
+        return frequency, self._index_dict[frequency]
+
+    def _get_group_name(self, definition):
+        return definition.identifier[:-2]
+
+    def _unwrap_time(self, time):
+        """
+        Hook to preprocess the raw time variable, before bad times are
+        removed. By default, time is returned unchanged.
+        """
+        return time
+
+    def _align(self, var, frequency):
+        """
+        Hook to align a variable to the index returned by _get_index. By
+        default, var is returned unchanged.
+        """
+        return var
+
+    def read(self):
+        for _file in sorted(self.files, key=lambda x: os.path.basename(x.filepath)):
+            self.dataset = _file.dataset
+            self._index_dict = {}
+
+            definition = self._get_definition(_file)
+
+            if definition is None:
+                warnings.warn(
+                    'No CRIO definition found for {}'.format(_file.filepath),
+                    RuntimeWarning
+                )
+                continue
+
+            dtypes = definition.dtypes
+
+            # Only decode fields which are required downstream
+            dtd = self._get_group_name(definition)
+            _fields = [
+                i for i in dtypes.names
+                if i[0] != '$' and i != self.time_variable
+                and _file.dataset.requires('{}_{}'.format(dtd, i))
+            ]
+
+            if not _fields:
+                print('Skipping {} (no required variables)'.format(_file))
+                continue
+
+            print('Reading {}...'.format(_file))
+            _buffer = _file.buffer()
+            _data = np.frombuffer(
+                _buffer, dtype=dtypes, count=len(_buffer) // dtypes.itemsize
+            )
+
+            # Every packet should start with the crio identifier. If not, the
+            # file is corrupt and needs to be scanned packet by packet.
+            _ids = np.char.replace(_data[_data.dtype.names[0]], b'$', b'')
+            _read_fail = not np.all(_ids == definition.identifier.encode())
+
+            if _read_fail:
+                del _data
+                _data = self.scan(_file, definition, buffer=_buffer)
+
+            _time = _data[self.time_variable]
+
+            # If there isn't any time info, then get out of here before we
+            # raise an exception.
+            if not len(_time):
+                continue
+
+            _time = self._unwrap_time(_time)
+
+            # Small amount of error tolerence. If there's a single dodgy
+            # timestamp in between two otherwise OK timestamps, assume that
+            # it's OK to interpolate across it
+            _time = pd.Series(_time)
+            _time.loc[(_time - _time.median()).abs() > C_BAD_TIME_DEV] = np.nan
+            _time = _time.interpolate(limit=1).values
+
+            _good_times = np.where(~np.isnan(_time))
+            _time = _time[_good_times]
+
+            for _name in _fields:
+
+                # Pandas doesn't enjoy non-native endianess, so convert data
+                # to system byteorder if required
+                if _name in definition.byteswap_fields:
+                    _var = _data[_name].byteswap().newbyteorder()
+                else:
+                    _var = _data[_name]
+
+                if len(_var.shape) == 1:
+                    _var = _var[_good_times]
+                else:
+                    _var = _var[_good_times, :]
+
+                frequency, index = self._get_index(
+                    _var, _name, _time, definition
+                )
+
+                _var = self._align(_var, frequency)
+
+                # Define the decades variable
+                variable_name = '{}_{}'.format(dtd,  _name)
+
+                max_var_len = len(self._index_dict[frequency])
+                if max_var_len != len(_var.ravel()):
+                    print('WARN: index & variable len differ')
+                    print('      ({})'.format(variable_name))
+
+                _var = _var.ravel()[:max_var_len]
+
+                variable = DecadesVariable(
+                    {variable_name: _var.ravel()},
+                    index=self._index_dict[frequency],
+                    name=variable_name,
+                    long_name=definition.get_field(_name).long_name,
+                    units='RAW',
+                    frequency=frequency,
+                    write=False
+                )
+
+                _file.dataset.add_input(variable)
+
+
+class CrioFileReader(TcpFileReader):
+    pass
+
+
+class GinFileReader(TcpFileReader):
+    time_variable = 'time1'
+    frequency = 50
+
+    def _get_definition(self, _file):
+        for _definition in _file.dataset.definitions:
+            if _definition.identifier == 'GRP':
+                return _definition
+
+    def _get_group_name(self, *args):
+        return 'GINDAT'
+
+    def _scan_read_packet_len(self, definition, offset, rawdata):
+        packet_dlen = definition.dtypes['packet_length'].itemsize
+        id_length = definition.dtypes[0].itemsize
+
+        packet_length = np.frombuffer(
+            rawdata[offset+id_length+2:offset+id_length+2+packet_dlen],
+            dtype=definition.dtypes['packet_length']
+        )[0]
+
+        return packet_length
+
+    def _time_last_saturday(self):
+        return gin.week_start(self.dataset.date)
+
+    def _unwrap_time(self, time):
+        # Unwrap across week rollovers before bad times are identified by
+        # their deviation from the median.
+        return gin.unwrap_week(time)
+
+    def _get_index(self, var, name, time, definition):
+        """
+        Get the index for GIN data. Seconds of the GPS week are converted to
+        absolute times and placed on a regular grid, which is cached along
+        with the position of each sample on it. The time standard of the GIN
+        timestamps is given by the GIN_TIME_STANDARD constant, either 'UTC'
+        (default) or 'GPS'.
+        """
+        try:
+            return self._frequency, self._index_dict[self._frequency]
+        except (AttributeError, KeyError):
+            pass
+
+        times = gin.to_datetime64(
+            time, self.dataset.date,
+            standard=self.dataset.constants.get('GIN_TIME_STANDARD', gin.UTC)
+        )
+
+        self._frequency, index, self._positions = gin.regularise(
+            times, frequency=self.frequency, name=self._get_group_name()
+        )
+
+        self._index_dict[self._frequency] = index
+        return self._frequency, index
+
+    def _align(self, var, frequency):
+        """
+        Place a variable onto the regular grid returned by _get_index,
+        filling any gaps with NaN. If there are no gaps or duplicate
+        timestamps, var is returned unchanged.
+        """
+        index = self._index_dict[frequency]
+        positions = self._positions
+
+        if len(index) == len(var) and positions[-1] == len(var) - 1 and (
+            np.all(positions == np.arange(len(var)))
+        ):
+            return var
+
+        _keep = positions >= 0
+        aligned = np.full(
+            (len(index),) + var.shape[1:], np.nan,
+            dtype=np.result_type(var.dtype, np.float32)
+        )
+        aligned[positions[_keep]] = var[_keep]
+        return aligned
+
+
+class DefinitionReader(FileReader):
+    level = 1
+
+    def _get_datatype(self, size, num_points, typestr):
+        type_dict = {
+            'unsigned_int': 'u', 'int': 'i', 'signed_int': 'i', 'double': 'f',
+            'single_float': 'f', 'float': 'f', 'single': 'f',
+            'double_float': 'f', 'boolean': 'u', 'f': 'f', 'i': 'i', 'u': 'u',
+            'text': 'S'
+        }
+
+        endian = '>'
+        if '<' in typestr:
+            endian = '<'
+        typestr = typestr.replace('>', '').replace('<', '')
+
+        typestr = '{endian}{num_points}{kind}{size}'.format(
+            endian=endian,
+            kind=type_dict[typestr],
+            size=size,
+            num_points=num_points
+        )
+
+        return typestr
+
+class CrioDefinitionReader(DefinitionReader):
+
+    def _parse(self, text):
+        """
+        Parse the text of a crio .csv definition file into a
+        CrioTcpDefintion.
+
+        Args:
+            text: the contents of the definition file, as a str.
+
+        Returns:
+            a CrioTcpDefintion.
+        """
+        identifier = None
+        header_length = 0
+        body_length = 0
+        fields = []
+        is_header = True
+
+        for row in csv.reader(text.splitlines()):
+
+            # Ignore empty lines
+            if not row:
+                continue
+
+            # Ignore tyhe header
+            if row[0] == 'field':
+                continue
+
+            # Exctract the crio identifier
+            if row[0][0] == '$':
+                identifier = row[0].replace('$', '')
+
+            if is_header:
+                header_length += int(row[1])
+            else:
+                body_length += int(row[1])
+
+            if row[0] == 'packet_length':
+                is_header = False
+
+            _num_bytes = int(row[1])
+            _bytes_per_point = int(row[2])
+            _num_points = int(_num_bytes / _bytes_per_point)
+            _type = row[3]
+
+            fields.append(
+                DataField(
+                    datatype=self._get_datatype(
+                        _bytes_per_point, _num_points, _type
+                    ),
+                    short_name=row[0],
+                    long_name=row[4]
+                )
+            )
+
+        return CrioTcpDefintion(
+            identifier, fields, header_length=header_length,
+            body_length=body_length
+        )
+
+    def read(self):
+        for _file in self.files:
+            print('Reading {}'.format(_file))
+
+            with _file.open() as _csv:
+                raw = _csv.read()
+
+            # Definitions are compiled once and cached on disk, keyed on the
+            # content of the definition file.
+            key = cache_key(str(CRIO_CACHE_FORMAT), raw)
+            tcp_def = load_cached('crio', key)
+
+            if not isinstance(tcp_def, CrioTcpDefintion):
+                tcp_def = self._parse(raw.decode())
+                dump_cached('crio', key, tcp_def)
+
+            _file.dataset.add_definition(tcp_def)
+
+
+class CrioTcpDefintion(object):
+    """
+    A CrioTcpDefinition contains the variable names and associated datatypes
+    and metadata required to read a crio data file. This is essentially a
+    compiled version of the crio .csv definition file.
+
+    Definitions are immutable; the numpy dtype, the lookup of fields by name
+    and the set of fields requiring a byteswap are all computed once, at
+    creation.
+    """
+
+    def __init__(self, identifier, fields, header_length=0, body_length=0):
+        """
+        Initialize a class instance.
+
+        Args:
+            identifier: the crio identifier, without the leading '$'.
+            fields: an iterable of DataFields, in packet order.
+
+        Kwargs:
+            header_length: the length of the packet header, in bytes.
+            body_length: the length of the packet body, in bytes.
+        """
+        fields = tuple(fields)
+
+        _set = super().__setattr__
+        _set('identifier', identifier)
+        _set('fields', fields)
+        _set('header_length', header_length)
+        _set('body_length', body_length)
+        _set('dtypes', np.dtype([(i.short_name, i.datatype) for i in fields]))
+        _set('_fields_by_name', {i.short_name: i for i in fields})
+        _set('byteswap_fields', frozenset(
+            i.short_name for i in fields
+            if i.byte_order is not None and i.byte_order != sys.byteorder
+        ))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(
+            '{} is immutable'.format(self.__class__.__name__)
+        )
+
+    def __delattr__(self, name):
+        raise AttributeError(
+            '{} is immutable'.format(self.__class__.__name__)
+        )
+
+    def __reduce__(self):
+        return (
+            self.__class__,
+            (self.identifier, self.fields, self.header_length,
+             self.body_length)
+        )
+
+    @property
+    def packet_length(self):
+        return self.header_length + self.body_length
+
+    def get_field(self, name):
+        return self._fields_by_name.get(name)
+
+
+class DataField(object):
+    def __init__(self, datatype=None, short_name=None, long_name=None):
+        self.datatype = datatype
+        self.short_name = short_name
+        self.long_name = long_name
+
+        if '>' in datatype:
+            self.byte_order = 'big'
+        elif '<' in datatype:
+            self.byte_order = 'little'
+        else:
+            self.byte_order = None
@@ -0,0 +1,266 @@
+"""
+Alignment of timeseries onto common time grids.
+
+outerjoin() aligns multiple timeseries onto a regular grid, which is computed
+once from the earliest and latest valid times of the inputs and the required
+frequency. Each input is placed onto it by integer arithmetic on nanosecond
+offsets, rather than by successive joins and reindexing.
+
+onto() interpolates a timeseries onto a given index, equivalent to reindexing
+onto the union of both indexes, interpolating, and selecting the target index,
+but without constructing the union. Where both indexes are regular, positions
+within the union are found in closed form.
+"""
+import numpy as np
+import pandas as pd
+
+from .utils import pd_freq
+
+__all__ = ('grid_positions', 'outerjoin', 'onto')
+
+
+def _period(frequency):
+    """Get the sample period, in integer nanoseconds, of a frequency."""
+    return pd.Timedelta(pd_freq[frequency]).value
+
+
+def grid_positions(index, t0, period):
+    """
+    Get the positions of the times in an index on a regular grid.
+
+    Args:
+        index: a pd.DatetimeIndex.
+        t0: the start of the grid, in integer nanoseconds since the epoch.
+        period: the grid period, in integer nanoseconds.
+
+    Returns:
+        a 2-tuple (positions, on_grid), where positions is an integer array
+        of grid positions, and on_grid is a boolean array, which is False
+        where a time does not fall exactly on the grid. If on_grid is None,
+        all times are on the grid.
+    """
+    _freq = index.freq
+    if _freq is not None and len(index):
+        # Regular input, positions are given in closed form
+        _step, _step_rem = divmod(pd.Timedelta(_freq).value, period)
+        _start, _start_rem = divmod(index[0].value - t0, period)
+        if not (_step_rem or _start_rem):
+            return _start + _step * np.arange(len(index)), None
+
+    positions, remainder = np.divmod(index.asi8 - t0, period)
+    return positions, remainder == 0
+
+
+def outerjoin(series, frequency):
+    """
+    Align a list of timeseries onto a regular grid at a given frequency,
+    covering all of their valid (non-NaN) data.
+
+    This is equivalent to outer joining the series, with NaNs dropped, and
+    reindexing the result onto a pd.date_range from the first to the last
+    valid time, at the given frequency. Values whose times do not fall
+    exactly on the grid are dropped.
+
+    Args:
+        series: a list of named pd.Series, each with a pd.DatetimeIndex.
+        frequency: the frequency of the output grid, in Hz.
+
+    Returns:
+        a pd.DataFrame, with a column for each input series.
+    """
+    _valid = []
+    t0 = None
+    t1 = None
+
+    for _series in series:
+        _values = _series.values
+        _mask = pd.notna(_values)
+
+        if _mask.all():
+            _mask = None
+            _index = _series.index
+        else:
+            _index = _series.index[_mask]
+
+        if len(_index):
+            t0 = _index[0].value if t0 is None else min(t0, _index[0].value)
+            t1 = _index[-1].value if t1 is None else max(t1, _index[-1].value)
+
+        _valid.append((_series.name, _values, _mask, _index))
+
+    if t0 is None:
+        raise ValueError('No valid data to align')
+
+    period = _period(frequency)
+    index = pd.date_range(
+        start=pd.Timestamp(t0), periods=(t1 - t0) // period + 1,
+        freq=pd_freq[frequency]
+    )
+
+    columns = {}
+    for name, values, mask, _index in _valid:
+        if mask is not None:
+            values = values[mask]
+
+        positions, on_grid = grid_positions(_index, t0, period)
+
+        if on_grid is not None:
+            positions = positions[on_grid]
+            values = values[on_grid]
+
+        if len(positions) == len(index):
+            # Input covers the whole grid, so its dtype is retained
+            column = np.empty(len(index), dtype=values.dtype)
+        elif values.dtype.kind in 'fc':
+            column = np.full(len(index), np.nan, dtype=values.dtype)
+        else:
+            # Let pandas choose a dtype which can represent missing data
+            columns[name] = pd.Series(
+                values, index=index[positions]
+            ).reindex(index).values
+            continue
+
+        column[positions] = values
+        columns[name] = column
+
+    return pd.DataFrame(columns, index=index)
+
+
+def _regular(index):
+    """
+    Get the start and period of an index, in integer nanoseconds, if it is
+    regular, otherwise None.
+    """
+    if index.freq is None or not len(index):
+        return None
+    return index[0].value, pd.Timedelta(index.freq).value
+
+
+def _count_before(times, grid, grid_times):
+    """
+    Count the number of times in a sorted grid which are strictly before each
+    of a sorted array of times.
+
+    Args:
+        times: an int64 array of times.
+        grid: the (start, period) of the grid if it is regular, or None.
+        grid_times: an int64 array of grid times.
+
+    Returns:
+        an integer array, the same length as times.
+    """
+    if grid is None:
+        return np.searchsorted(grid_times, times, side='left')
+
+    start, period = grid
+    return np.clip(
+        -np.floor_divide(start - times, period), 0, len(grid_times)
+    )
+
+
+def _members(times, grid, grid_times):
+    """
+    Find which of a sorted array of times are also in a sorted grid.
+
+    Returns:
+        a 2-tuple (member, position) of a boolean array, True where a time is
+        in the grid, and an integer array of positions in the grid, which is
+        only meaningful where member is True.
+    """
+    if grid is None:
+        position = np.searchsorted(grid_times, times, side='left')
+        member = position < len(grid_times)
+        member[member] = grid_times[position[member]] == times[member]
+        return member, position
+
+    start, period = grid
+    position, remainder = np.divmod(times - start, period)
+    member = (remainder == 0) & (position >= 0) & (position < len(grid_times))
+    return member, position
+
+
+def onto(series, index, limit=1, method='linear'):
+    """
+    Interpolate a timeseries onto an index. This is equivalent to
+
+        series.reindex(index.union(series.index).sort_values()).interpolate(
+            method, limit=limit
+        ).loc[index]
+
+    i.e. interpolation is over the union of both indexes, and NaNs are filled
+    forward only, up to limit consecutive points of the union, including
+    after the last valid value.
+
+    Args:
+        series: a pd.Series with a sorted, unique pd.DatetimeIndex.
+        index: the sorted, unique pd.DatetimeIndex to interpolate onto.
+
+    Kwargs:
+        limit: the maximum number of consecutive NaNs, in the union of both
+               indexes, to fill. None to fill all NaNs.
+        method: 'linear' (default), to interpolate as if the union of both
+                indexes were equally spaced, or 'time', to interpolate in
+                time.
+
+    Returns:
+        a np.array of values at each time in index.
+    """
+    values = series.values
+    source = series.index.asi8
+    target = index.asi8
+    source_grid = _regular(series.index)
+    target_grid = _regular(index)
+
+    if values.dtype.kind != 'f':
+        # If every target time is in the source, no NaNs are introduced, so
+        # the values are selected with their dtype unchanged. Otherwise
+        # numeric values are interpolated as floats, and anything else is
+        # left to pandas.
+        member, position = _members(target, source_grid, source)
+        if member.all():
+            return values[position]
+
+        if values.dtype.kind not in 'iub':
+            return series.reindex(
+                index.union(series.index).sort_values()
+            ).interpolate(method, limit=limit).loc[index].values
+
+        values = values.astype(float)
+
+    # Source points which coincide with target points appear only once in the
+    # union of the two indexes
+    shared, shared_position = _members(source, target_grid, target)
+    source_only = np.concatenate([[0], np.cumsum(~shared)])
+
+    # Positions of target points in the union
+    target_pos = np.arange(len(target)) + source_only[
+        _count_before(target, source_grid, source)
+    ]
+
+    # Positions of source points in the union
+    source_pos = _count_before(source, target_grid, target) + source_only[:-1]
+    source_pos[shared] = target_pos[shared_position[shared]]
+
+    valid = ~np.isnan(values)
+    xp = source_pos[valid]
+    fp = values[valid]
+
+    out = np.full(len(target), np.nan, dtype=values.dtype)
+    if not len(xp):
+        return out
+
+    if method == 'time':
+        interp = np.interp(target, source[valid], fp)
+    elif method == 'linear':
+        interp = np.interp(target_pos, xp, fp)
+    else:
+        raise ValueError('Unknown interpolation method: {}'.format(method))
+
+    # The last valid source point at or before each target point
+    last = np.searchsorted(xp, target_pos, side='right') - 1
+    fill = last >= 0
+    if limit is not None:
+        fill[fill] = target_pos[fill] - xp[last[fill]] <= limit
+
+    out[fill] = interp[fill]
+    return out
@@ -0,0 +1,120 @@
+"""
+This module provides a simple on-disk cache, used to persist parsed or
+compiled objects (for example CRIO definitions) across processing runs.
+
+The cache is opt-in: it is only used when the environment variable
+PPODD_CACHE_DIR gives the cache directory, for example ~/.cache/ppodd.
+Objects are unpickled from the cache, so it should only point to a directory
+which is not writable by untrusted users.
+
+Cache keys include the ppodd version and CACHE_FORMAT, which should be bumped
+whenever the layout of any cached object changes, as development installs do
+not change version. Users of the cache should also include their own format
+version in their keys.
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+
+import ppodd
+
+# Disabled unless PPODD_CACHE_DIR is set
+CACHE_DIR = os.environ.get('PPODD_CACHE_DIR', '')
+
+# Bump whenever the layout of any cached object changes
+CACHE_FORMAT = 1
+
+
+def cache_key(*parts):
+    """
+    Build a cache key from an arbitrary number of parts. The ppodd version and
+    CACHE_FORMAT are always included, so that cached objects are invalidated
+    across releases and changes to the cached structures.
+
+    Args:
+        parts: str or bytes objects from which the key is derived.
+
+    Returns:
+        a hex digest which may be used as a cache key.
+    """
+    _hash = hashlib.sha1(
+        '{}:{}'.format(ppodd.__version__, CACHE_FORMAT).encode()
+    )
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode()
+        _hash.update(part)
+    return _hash.hexdigest()
+
+
+def _cache_file(namespace, key):
+    return os.path.join(CACHE_DIR, namespace, '{}.pkl'.format(key))
+
+
+def load_cached(namespace, key):
+    """
+    Load an object from the cache.
+
+    Args:
+        namespace: the cache namespace (a subdirectory of the cache dir).
+        key: the cache key, typically from cache_key().
+
+    Returns:
+        the cached object, or None if the cache is disabled, the object is not
+        cached or the cache cannot be read. A cache file which cannot be unpickled, for example
+        as it refers to code which has since changed, is removed.
+    """
+    if not CACHE_DIR:
+        return None
+
+    _file = _cache_file(namespace, key)
+
+    try:
+        f = open(_file, 'rb')
+    except OSError:
+        return None
+
+    try:
+        with f:
+            return pickle.load(f)
+    except Exception:
+        try:
+            os.remove(_file)
+        except OSError:
+            pass
+        return None
+
+
+def dump_cached(namespace, key, obj):
+    """
+    Write an object to the cache, if it is enabled. This is best-effort:
+    failure to write to the cache is silently ignored.
+
+    Args:
+        namespace: the cache namespace (a subdirectory of the cache dir).
+        key: the cache key, typically from cache_key().
+        obj: the (picklable) object to cache.
+    """
+    if not CACHE_DIR:
+        return
+
+    _file = _cache_file(namespace, key)
+
+    try:
+        os.makedirs(os.path.dirname(_file), exist_ok=True)
+        # Write to a temporary file and move into place, so that concurrent
+        # processes never see a partially written cache file.
+        fd, _tmp = tempfile.mkstemp(dir=os.path.dirname(_file))
+    except OSError:
+        return
+
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(_tmp, _file)
+    except Exception:
+        try:
+            os.remove(_tmp)
+        except OSError:
+            pass
@@ -0,0 +1,124 @@
+"""
+Vectorised handling of circular (angular) data, such as headings, tracks and
+wind directions, in degrees.
+
+All functions accept np.arrays or pd.Series, and are NaN-aware: NaNs are
+preserved, and a discontinuity is only identified between adjacent valid
+values, so jumps across gaps are not unwrapped.
+"""
+import numpy as np
+import pandas as pd
+
+from .align import onto
+
+__all__ = ('unwrap', 'wrap', 'resample_mean', 'interp')
+
+PERIOD = 360.
+
+
+def _like(values, template):
+    """Return values as the same type (array or Series) as template."""
+    if isinstance(template, pd.Series):
+        return pd.Series(values, index=template.index, name=template.name)
+    return values
+
+
+def unwrap(ang, period=PERIOD):
+    """
+    Remove discontinuities from circular data, by adding or subtracting a
+    period to all values following any step of more than half a period.
+
+    Args:
+        ang: an array or pd.Series of angles.
+
+    Kwargs:
+        period: the period of the data, default 360.
+
+    Returns:
+        the unwrapped angles, as the same type as ang.
+    """
+    values = np.asarray(ang, dtype=float)
+
+    if len(values) < 2:
+        return _like(values.copy(), ang)
+
+    diff = np.diff(values)
+
+    # NaN comparisons are False, so steps into or out of NaNs are ignored
+    with np.errstate(invalid='ignore'):
+        step = np.where(
+            diff > period / 2, -period, np.where(diff < -period / 2, period, 0)
+        )
+
+    offset = np.concatenate([[0.], np.cumsum(step)])
+    return _like(values + offset, ang)
+
+
+def wrap(ang, period=PERIOD):
+    """
+    Wrap angles into the range [0, period).
+
+    Args:
+        ang: an array or pd.Series of angles.
+
+    Kwargs:
+        period: the period of the data, default 360.
+
+    Returns:
+        the wrapped angles, as the same type as ang.
+    """
+    _wrapped = np.mod(ang, period)
+
+    # Tiny negative angles wrap to period, after rounding
+    with np.errstate(invalid='ignore'):
+        return _wrapped - period * (_wrapped >= period)
+
+
+def resample_mean(series, rule, period=PERIOD):
+    """
+    Resample circular data to a lower frequency, taking the circular mean of
+    the angles in each period: the direction of the mean of the unit vectors
+    given by each angle. This is independent of where the angles wrap, and
+    is correct for periods which span gaps in the data.
+
+    Args:
+        series: a pd.Series of angles, with a pd.DatetimeIndex.
+        rule: the resampling frequency, as accepted by pd.Series.resample.
+
+    Kwargs:
+        period: the period of the data, default 360.
+
+    Returns:
+        a pd.Series of the resampled angles, in [0, period).
+    """
+    _rad = np.asarray(series, dtype=float) * (2 * np.pi / period)
+
+    _means = pd.DataFrame(
+        {'sin': np.sin(_rad), 'cos': np.cos(_rad)}, index=series.index
+    ).resample(rule).mean()
+
+    _ang = np.arctan2(_means['sin'], _means['cos']) * (period / (2 * np.pi))
+
+    return wrap(
+        pd.Series(_ang.values, index=_means.index, name=series.name), period
+    )
+
+
+def interp(series, index, limit=1, period=PERIOD):
+    """
+    Interpolate circular data onto an index, by interpolating the unwrapped
+    angles with ppodd.utils.align.onto and wrapping the result.
+
+    Args:
+        series: a pd.Series of angles, with a pd.DatetimeIndex.
+        index: the pd.DatetimeIndex to interpolate onto.
+
+    Kwargs:
+        limit: the maximum number of consecutive NaNs to fill. See
+               ppodd.utils.align.onto.
+        period: the period of the data, default 360.
+
+    Returns:
+        a np.array of angles at each time in index, in [0, period).
+    """
+    return wrap(onto(unwrap(series, period), index, limit=limit), period)
@@ -0,0 +1,358 @@
+"""
+Plugin discovery for processing, QA and flagging modules.
+
+Plugin packages (ppodd.pod, ppodd.qa and ppodd.flags) are described by a
+manifest, which is built by statically parsing the source of each module in
+the package, rather than importing it. The manifest lists, for each plugin
+class, its name, the module in which it is defined, and its declared inputs
+and outputs, where these can be determined statically. Manifests are cached
+in memory and, if enabled, on disk (see ppodd.utils.cache), keyed on
+MANIFEST_VERSION and on the modification time and size of each module and of
+this module, so the source is only parsed again when it, or the way it is
+parsed, changes.
+
+Plugin modules are only imported when a plugin is loaded.
+"""
+import ast
+import importlib
+import importlib.util
+import os
+
+from ppodd.utils.cache import cache_key, load_cached, dump_cached
+
+__all__ = ('Plugin', 'manifest', 'scan_package')
+
+# Bump whenever Plugin, or the extraction of manifests from source, changes
+MANIFEST_VERSION = 2
+
+# Manifests built or loaded in this process, keyed on (package, base)
+_manifests = {}
+
+
+class Plugin(object):
+    """
+    A plugin class, as described in a package manifest, which may not yet
+    have been imported.
+
+    Attributes:
+        name: the name of the plugin class.
+        module: the full name of the module in which it is defined.
+        inputs: a list of the inputs required by the plugin, or None if these
+                cannot be determined without importing and initialising it.
+        outputs: a list of the outputs declared by the plugin, or None if
+                 these cannot be determined without importing and
+                 initialising it, for example if any are declared
+                 conditionally.
+    """
+    __slots__ = ('name', 'module', 'inputs', 'outputs', '_cls')
+
+    def __init__(self, name, module, inputs=None, outputs=None):
+        self.name = name
+        self.module = module
+        self.inputs = inputs
+        self.outputs = outputs
+        self._cls = None
+
+    def __getstate__(self):
+        return (self.name, self.module, self.inputs, self.outputs)
+
+    def __setstate__(self, state):
+        self.name, self.module, self.inputs, self.outputs = state
+        self._cls = None
+
+    def __str__(self):
+        return self.name
+
+    def __repr__(self):
+        return 'Plugin({!r})'.format(self.path)
+
+    @classmethod
+    def from_class(cls, plugin_class):
+        """
+        Create a Plugin from an already imported class. Inputs and outputs
+        are not assumed to be known.
+        """
+        plugin = cls(plugin_class.__name__, plugin_class.__module__)
+        plugin._cls = plugin_class
+        return plugin
+
+    @property
+    def path(self):
+        """The 'module:Class' path of the plugin."""
+        return '{}:{}'.format(self.module, self.name)
+
+    @property
+    def static(self):
+        """True if both inputs and outputs are known without importing."""
+        return self.inputs is not None and self.outputs is not None
+
+    def load(self):
+        """
+        Import the plugin module, if required, and return the plugin class.
+        """
+        if self._cls is None:
+            self._cls = getattr(
+                importlib.import_module(self.module), self.name
+            )
+        return self._cls
+
+
+def _base_names(node):
+    """Get the (unqualified) names of the bases of a class definition."""
+    names = []
+    for base in node.bases:
+        if isinstance(base, ast.Name):
+            names.append(base.id)
+        elif isinstance(base, ast.Attribute):
+            names.append(base.attr)
+        else:
+            names.append(None)
+    return names
+
+
+def _class_inputs(node, default):
+    """
+    Get the literal value of the inputs class attribute of a class
+    definition, or None if it can not be determined statically. If the class
+    does not set its inputs, default is returned.
+    """
+    inputs = default
+
+    for stmt in node.body:
+        if not isinstance(stmt, ast.Assign):
+            continue
+        if any(isinstance(t, ast.Name) and t.id == 'inputs'
+               for t in stmt.targets):
+            try:
+                inputs = list(ast.literal_eval(stmt.value))
+            except (ValueError, TypeError, SyntaxError):
+                return None
+
+    # Inputs may also be set on the instance, which we can't resolve
+    for child in ast.walk(node):
+        if isinstance(child, ast.Attribute) and child.attr == 'inputs' and \
+                isinstance(child.ctx, ast.Store):
+            return None
+
+    return inputs
+
+
+class _DynamicOutputs(Exception):
+    """Raised when the outputs of a class can't be determined statically."""
+
+
+def _declares(node):
+    """Get all of the self.declare() calls within an AST node."""
+    calls = []
+    for child in ast.walk(node):
+        if not isinstance(child, ast.Call):
+            continue
+
+        func = child.func
+        if (isinstance(func, ast.Attribute) and func.attr == 'declare'
+                and isinstance(func.value, ast.Name)
+                and func.value.id == 'self'):
+            calls.append(child)
+
+    return calls
+
+
+def _returns(node):
+    """Check whether an AST node contains a return statement."""
+    return any(isinstance(i, ast.Return) for i in ast.walk(node))
+
+
+def _block_outputs(body, outputs):
+    """
+    Add the names declared through self.declare() in a block of statements
+    to outputs.
+
+    Args:
+        body: a list of AST statements.
+        outputs: the list of output names to add to.
+
+    Returns:
+        True if a statement in the block may return, so that anything
+        following the block is only conditionally executed.
+
+    Raises:
+        _DynamicOutputs: if a name is not a string literal, or is declared
+                         conditionally or after a return.
+    """
+    for i, stmt in enumerate(body):
+        if isinstance(stmt, (ast.With, ast.AsyncWith)):
+            if any(_declares(item) for item in stmt.items):
+                raise _DynamicOutputs
+            returns = _block_outputs(stmt.body, outputs)
+
+        elif isinstance(stmt, (ast.Expr, ast.Return, ast.Raise)):
+            calls = _declares(stmt)
+            if calls and not (isinstance(stmt, ast.Expr)
+                              and calls == [stmt.value]):
+                raise _DynamicOutputs
+
+            for call in calls:
+                try:
+                    name = call.args[0]
+                except IndexError:
+                    raise _DynamicOutputs
+
+                if not (isinstance(name, ast.Constant) and
+                        isinstance(name.value, str)):
+                    raise _DynamicOutputs
+
+                if name.value not in outputs:
+                    outputs.append(name.value)
+
+            returns = isinstance(stmt, (ast.Return, ast.Raise))
+
+        else:
+            # Declarations in any other statement, for example in a branch or
+            # a loop, may or may not be made
+            if _declares(stmt):
+                raise _DynamicOutputs
+            returns = _returns(stmt)
+
+        if returns:
+            if any(_declares(j) for j in body[i + 1:]):
+                raise _DynamicOutputs
+            return True
+
+    return False
+
+
+def _class_outputs(node):
+    """
+    Get the names of the outputs declared through self.declare() in the
+    declare_outputs method of a class definition, or None if any are not
+    string literals, are declared conditionally or after a return, or are
+    declared in any other method.
+    """
+    outputs = []
+
+    try:
+        for stmt in node.body:
+            if (isinstance(stmt, ast.FunctionDef)
+                    and stmt.name == 'declare_outputs'):
+                _block_outputs(stmt.body, outputs)
+            elif _declares(stmt):
+                raise _DynamicOutputs
+    except _DynamicOutputs:
+        return None
+
+    return outputs
+
+
+def _scan_module(path, module, base):
+    """
+    Find all of the direct subclasses of base defined in a module.
+
+    Args:
+        path: the path to the module source.
+        module: the full name of the module.
+        base: the name of the plugin base class.
+
+    Returns:
+        a list of Plugins.
+    """
+    with open(path, 'rb') as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    plugins = []
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+
+        bases = _base_names(node)
+        if base not in bases:
+            continue
+
+        # Anything not defined in the plugin class itself may come from a
+        # mixin, which we don't attempt to follow.
+        if len(bases) > 1:
+            inputs = _class_inputs(node, None)
+            outputs = None
+        else:
+            inputs = _class_inputs(node, [])
+            outputs = _class_outputs(node)
+
+        plugins.append(Plugin(node.name, module, inputs, outputs))
+
+    return plugins
+
+
+def _module_files(package):
+    """
+    Get the plugin module files in a package, i.e. all .py files not
+    starting with an underscore, as a sorted list of (module, path) tuples.
+    """
+    # Use the module spec, rather than importing the package, so that this
+    # may be called while the package itself is being initialised.
+    _dir, = importlib.util.find_spec(package).submodule_search_locations
+
+    files = []
+    for _file in sorted(os.listdir(_dir)):
+        _name, _ext = os.path.splitext(_file)
+        if _ext.lower() != '.py' or _name.startswith('_'):
+            continue
+        files.append(('{}.{}'.format(package, _name),
+                      os.path.join(_dir, _file)))
+
+    return files
+
+
+def scan_package(package, base):
+    """
+    Build a manifest for a plugin package by parsing its modules.
+
+    Args:
+        package: the full name of the plugin package.
+        base: the name of the base class of plugins in the package.
+
+    Returns:
+        a list of Plugins.
+    """
+    plugins = []
+    for module, path in _module_files(package):
+        plugins += _scan_module(path, module, base)
+    return plugins
+
+
+def manifest(package, base):
+    """
+    Get the manifest of a plugin package, from memory or the on-disk cache,
+    if enabled, otherwise by parsing the modules in the package.
+
+    Args:
+        package: the full name of the plugin package.
+        base: the name of the base class of plugins in the package.
+
+    Returns:
+        a list of Plugins.
+    """
+    try:
+        return _manifests[(package, base)]
+    except KeyError:
+        pass
+
+    files = _module_files(package)
+
+    # The extractor itself is included, so that changes to it invalidate
+    # cached manifests even without a version bump
+    _parts = [str(MANIFEST_VERSION), package, base]
+    for module, path in files + [(__name__, __file__)]:
+        _stat = os.stat(path)
+        _parts.append('{}:{}:{}'.format(
+            module, _stat.st_mtime_ns, _stat.st_size
+        ))
+    key = cache_key(*_parts)
+
+    plugins = load_cached('plugins', key)
+    if plugins is None:
+        plugins = []
+        for module, path in files:
+            plugins += _scan_module(path, module, base)
+        dump_cached('plugins', key, plugins)
+
+    _manifests[(package, base)] = plugins
+    return plugins
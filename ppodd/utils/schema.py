@@ -0,0 +1,97 @@
+"""
+A minimal schema language for validating nested structures loaded from yaml
+or json, such as flight constants files.
+
+A schema is one of:
+    - a type, or tuple of types, of which a value must be an instance.
+    - a dict, mapping keys to schemas. Values must be dicts, containing all
+      of the keys in the schema, except those ending in '?', which are
+      optional and may also be None. The special key '*' gives a schema for
+      the values of all keys not otherwise listed. Keys not listed are
+      allowed.
+
+Schemas are compiled once into a validator function, which raises a
+ValueError describing the first violation found.
+"""
+
+__all__ = ('compile_schema',)
+
+
+def _compile_type(schema, path):
+    def _validate(value, path=path):
+        if not isinstance(value, schema):
+            raise ValueError('{}: expected {}, got {}'.format(
+                path, _type_name(schema), type(value).__name__
+            ))
+    return _validate
+
+
+def _type_name(schema):
+    if isinstance(schema, tuple):
+        return ' or '.join(i.__name__ for i in schema)
+    return schema.__name__
+
+
+def _compile_dict(schema, path):
+    required = []
+    optional = []
+
+    for key, value in schema.items():
+        if key == '*':
+            continue
+        if key.endswith('?'):
+            key = key[:-1]
+            optional.append((key, compile_schema(value, f'{path}.{key}')))
+        else:
+            required.append((key, compile_schema(value, f'{path}.{key}')))
+
+    named = set(i[0] for i in required + optional)
+
+    try:
+        _any = compile_schema(schema['*'], f'{path}.*')
+    except KeyError:
+        _any = None
+
+    def _validate(value):
+        if not isinstance(value, dict):
+            raise ValueError('{}: expected dict, got {}'.format(
+                path, type(value).__name__
+            ))
+
+        for key, validator in required:
+            try:
+                _value = value[key]
+            except KeyError:
+                raise ValueError(f'{path}: missing required key {key!r}')
+            validator(_value)
+
+        for key, validator in optional:
+            _value = value.get(key)
+            if _value is not None:
+                validator(_value)
+
+        if _any is not None:
+            for key, _value in value.items():
+                if key not in named:
+                    _any(_value)
+
+    return _validate
+
+
+def compile_schema(schema, path='root'):
+    """
+    Compile a schema into a validator.
+
+    Args:
+        schema: the schema to compile.
+
+    Kwargs:
+        path: the name of the root of the structure, used in error messages.
+
+    Returns:
+        a function taking a single argument, which raises ValueError if its
+        argument does not conform to the schema.
+    """
+    if isinstance(schema, dict):
+        return _compile_dict(schema, path)
+    return _compile_type(schema, path)
@@ -0,0 +1,312 @@
+"""
+Run-length encoding of 1D arrays, for finding, filtering and reducing over
+contiguous runs (segments) without splitting arrays into Python lists of
+groups or using pandas groupby.
+
+Segments are described by arrays of (inclusive) start and (exclusive) stop
+positions, and may be converted back to a boolean mask with to_mask().
+
+Time intervals are described by arrays of (inclusive) start and end times,
+in integer nanoseconds since the epoch, and may be converted to a boolean
+mask over any pd.DatetimeIndex with time_mask().
+"""
+import numpy as np
+import pandas as pd
+
+__all__ = (
+    'runs', 'fill_short_runs', 'segments', 'drop_short', 'dilate', 'to_mask',
+    'segment_sums', 'segment_means', 'time_mask', 'interval_union',
+    'interval_intersection'
+)
+
+
+def runs(x):
+    """
+    Run-length encode an array. Consecutive NaNs are treated as a single run.
+
+    Args:
+        x: a 1D array.
+
+    Returns:
+        a 2-tuple (starts, stops) of integer arrays, giving the start and
+        (exclusive) stop positions of each run of equal values in x.
+    """
+    x = np.asarray(x)
+
+    if not x.size:
+        return np.empty(0, dtype=int), np.empty(0, dtype=int)
+
+    change = x[1:] != x[:-1]
+    if x.dtype.kind in 'fc':
+        _nan = np.isnan(x)
+        change &= ~(_nan[1:] & _nan[:-1])
+
+    stops = np.append(np.flatnonzero(change) + 1, x.size)
+    starts = np.concatenate([[0], stops[:-1]])
+
+    return starts, stops
+
+
+def fill_short_runs(x, min_length, fill=0):
+    """
+    Replace every run of equal values shorter than min_length. Runs are
+    identified once, in the input, so runs which become adjacent after
+    filling are not merged.
+
+    Args:
+        x: a 1D array.
+        min_length: the minimum length of a run to keep, in samples.
+
+    Kwargs:
+        fill: the value to replace short runs with, default 0.
+
+    Returns:
+        a copy of x, with short runs replaced.
+    """
+    x = np.array(x)
+    starts, stops = runs(x)
+
+    short = (stops - starts) < min_length
+    x[np.repeat(short, stops - starts)] = fill
+
+    return x
+
+
+def segments(mask):
+    """
+    Find the contiguous runs of True in a boolean mask.
+
+    Args:
+        mask: a 1D boolean array.
+
+    Returns:
+        a 2-tuple (starts, stops) of integer arrays, giving the start and
+        (exclusive) stop positions of each run of True.
+    """
+    mask = np.asarray(mask, dtype=bool)
+    edges = np.diff(np.concatenate([[0], mask.view(np.int8), [0]]))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def drop_short(starts, stops, min_length):
+    """
+    Remove segments shorter than min_length samples.
+
+    Returns:
+        a 2-tuple (starts, stops) of the remaining segments.
+    """
+    keep = (stops - starts) >= min_length
+    return starts[keep], stops[keep]
+
+
+def _timedelta(value):
+    """Get a timedelta, or a number of seconds, in integer nanoseconds."""
+    if isinstance(value, (int, float, np.number)):
+        return int(value * 1e9)
+    return pd.Timedelta(value).value
+
+
+def dilate(starts, stops, index, before=0, after=0, onto=None):
+    """
+    Extend segments by a time margin, equivalent to selecting each segment as
+    the label slice [start time - before : end time + after] of a sorted
+    index, where the end time is the time of the last sample in the segment.
+
+    Args:
+        starts: an integer array of segment starts.
+        stops: an integer array of (exclusive) segment stops.
+        index: the sorted pd.DatetimeIndex in which the segments are given.
+
+    Kwargs:
+        before: the margin to add before each segment, either a number of
+                seconds or anything accepted by pd.Timedelta. Default 0.
+        after: the margin to add after each segment. Default 0.
+        onto: a sorted pd.DatetimeIndex onto which to map the extended
+              segments. Defaults to index.
+
+    Returns:
+        a 2-tuple (starts, stops) of positions in onto. Extended segments
+        may overlap.
+    """
+    if onto is None:
+        onto = index
+
+    times = index.asi8
+    onto_times = onto.asi8
+
+    t_start = times[starts] - _timedelta(before)
+    t_end = times[stops - 1] + _timedelta(after)
+
+    return (
+        np.searchsorted(onto_times, t_start, side='left'),
+        np.searchsorted(onto_times, t_end, side='right')
+    )
+
+
+def to_mask(starts, stops, size):
+    """
+    Create a boolean mask which is True within any of a set of (possibly
+    overlapping) segments.
+
+    Args:
+        starts: an integer array of segment starts.
+        stops: an integer array of (exclusive) segment stops.
+        size: the length of the mask.
+
+    Returns:
+        a boolean array of length size.
+    """
+    starts = np.clip(starts, 0, size)
+    stops = np.clip(stops, 0, size)
+
+    keep = stops > starts
+    count = (
+        np.bincount(starts[keep], minlength=size + 1)
+        - np.bincount(stops[keep], minlength=size + 1)
+    )
+    return np.cumsum(count[:size]) > 0
+
+
+def segment_sums(values, starts, stops):
+    """
+    Sum an array over each of a set of segments, with np.add.reduceat.
+
+    Args:
+        values: a 1D array.
+        starts: an integer array of segment starts.
+        stops: an integer array of (exclusive) segment stops. Segments with
+               stop <= start are empty, and sum to 0.
+
+    Returns:
+        an array of the sum over each segment.
+    """
+    values = np.asarray(values)
+    starts = np.clip(starts, 0, values.size)
+    stops = np.clip(stops, 0, values.size)
+
+    if not starts.size:
+        return np.zeros(0, dtype=values.dtype)
+
+    # reduceat sums between consecutive indices, so interleaving the starts
+    # and stops gives the sum over each segment at every other position. A
+    # trailing zero allows segments to stop at the end of the array.
+    _values = np.append(values, values.dtype.type(0))
+    _indices = np.column_stack([starts, stops]).ravel()
+    sums = np.add.reduceat(_values, _indices)[::2]
+
+    sums[stops <= starts] = 0
+    return sums
+
+
+def segment_means(values, starts, stops, skip_start=0, skip_end=0):
+    """
+    Average an array over each of a set of segments, ignoring NaNs and,
+    optionally, points at the start and end of each segment.
+
+    Args:
+        values: a 1D array.
+        starts: an integer array of segment starts.
+        stops: an integer array of (exclusive) segment stops.
+
+    Kwargs:
+        skip_start: the number of points to skip at the start of each
+                    segment. Default 0.
+        skip_end: the number of points to skip at the end of each segment.
+                  Default 0.
+
+    Returns:
+        a float array of the mean over each segment, NaN where no valid
+        points remain.
+    """
+    values = np.asarray(values, dtype=float)
+    valid = ~np.isnan(values)
+
+    starts = np.asarray(starts) + skip_start
+    stops = np.asarray(stops) - skip_end
+
+    sums = segment_sums(np.where(valid, values, 0.), starts, stops)
+    counts = segment_sums(valid.astype(int), starts, stops)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def time_mask(starts, ends, index):
+    """
+    Create a boolean mask over an index which is True at times within any
+    of a set of time intervals.
+
+    Args:
+        starts: an int64 array of interval start times, in nanoseconds.
+        ends: an int64 array of (inclusive) interval end times.
+        index: a sorted pd.DatetimeIndex, at any frequency.
+
+    Returns:
+        a boolean array, the length of index.
+    """
+    times = index.asi8
+    return to_mask(
+        np.searchsorted(times, starts, side='left'),
+        np.searchsorted(times, ends, side='right'),
+        len(times)
+    )
+
+
+def interval_union(starts, ends):
+    """
+    Get the union of a set of time intervals, as sorted, non-overlapping
+    intervals.
+
+    Args:
+        starts: an int64 array of interval start times.
+        ends: an int64 array of (inclusive) interval end times.
+
+    Returns:
+        a 2-tuple (starts, ends).
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+
+    _order = np.argsort(starts, kind='stable')
+    starts = starts[_order]
+    ends = ends[_order]
+
+    if not starts.size:
+        return starts, ends
+
+    # An interval starts a new group unless it overlaps any before it
+    _max_end = np.maximum.accumulate(ends)
+    _new = np.concatenate([[True], starts[1:] > _max_end[:-1]])
+    _group = np.flatnonzero(_new)
+
+    return starts[_group], np.maximum.reduceat(ends, _group)
+
+
+def interval_intersection(starts_a, ends_a, starts_b, ends_b):
+    """
+    Get the intersection of two sets of time intervals.
+
+    Args:
+        starts_a, ends_a: the first set of intervals.
+        starts_b, ends_b: the second set of intervals.
+
+    Returns:
+        a 2-tuple (starts, ends) of sorted, non-overlapping intervals.
+    """
+    starts_a, ends_a = interval_union(starts_a, ends_a)
+    starts_b, ends_b = interval_union(starts_b, ends_b)
+
+    # The range of intervals in b which overlap each interval in a
+    first = np.searchsorted(ends_b, starts_a, side='left')
+    last = np.searchsorted(starts_b, ends_a, side='right')
+    count = np.maximum(last - first, 0)
+
+    _a = np.repeat(np.arange(starts_a.size), count)
+    _b = np.repeat(first - np.cumsum(count) + count, count) + np.arange(
+        _a.size
+    )
+
+    return (
+        np.maximum(starts_a[_a], starts_b[_b]),
+        np.minimum(ends_a[_a], ends_b[_b])
+    )
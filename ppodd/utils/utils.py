@@ -59,24 +59,14 @@ def get_range_flag(var, limits, flag_val=2):
 
 def unwrap_array(ang):
     """
-    Removes dicontinuities in directional (angular) data, similar to np.unwrap,
-    but less good.
+    Removes dicontinuities in directional (angular) data. Retained for
+    compatibility, see ppodd.utils.circular.unwrap.
 
     Args:
         ang: the angular array to unwrap, expects a pd.Series.
     """
-    temp = ang.diff().abs() > 180
-    temp = ang[temp].dropna()
-    indicies = temp.index
-
-    diffed = ang.diff()
-    for i in indicies:
-        if diffed.loc[i] > 0:
-            ang.loc[ang.index >= i] -= 360
-        else:
-            ang.loc[ang.index >= i] += 360
-
-    return ang
+    from .circular import unwrap
+    return unwrap(ang)
 
 
 def flagged_avg(df, flag_col, data_col, fill_nan=None, flag_value=1,
@@ -87,7 +77,9 @@ def flagged_avg(df, flag_col, data_col, fill_nan=None, flag_value=1,
     Args:
         df: the DataFrame to operate on
         flag_col: the name of the column of df which contains the flag variable
-        data_col: the name of the column of df which contains the data variable
+        data_col: the name of the column of df which contains the data
+                  variable, or a list of names to average several variables
+                  over the same flag periods.
 
     Kwargs:
         fill_nan: the value with which to fill any NaNs in the flag (default 0)
@@ -98,7 +90,8 @@ def flagged_avg(df, flag_col, data_col, fill_nan=None, flag_value=1,
         skip_end: the number of data points to skip in the averaging before the
                   flag changes from flag_value to something else (default 0)
         out_name: the name of the resultant averaged data (a column in df). If
-                  not given, the default is <data_col>_<flag_col>
+                  not given, the default is <data_col>_<flag_col>. A list of
+                  names if data_col is a list.
         interp:   interpolate the averaged data across the full time span
                   (default False). If False, the output will be NaN everywhere
                   except the index closest to the middle of each averaging
@@ -107,8 +100,18 @@ def flagged_avg(df, flag_col, data_col, fill_nan=None, flag_value=1,
     Returns:
         None, df is modified in-place.
     """
-    if out_name is None:
-        out_name = '{}_{}'.format(data_col, flag_col)
+    from .segments import segments, segment_means
+
+    if isinstance(data_col, str):
+        data_col = [data_col]
+        out_name = [out_name]
+    elif out_name is None:
+        out_name = [None] * len(data_col)
+
+    out_name = [
+        '{}_{}'.format(_data, flag_col) if _name is None else _name
+        for _data, _name in zip(data_col, out_name)
+    ]
 
     # Replace nans in the flag, either by backfilling or setting to a given
     # value 
@@ -117,34 +120,35 @@ def flagged_avg(df, flag_col, data_col, fill_nan=None, flag_value=1,
     else:
         df[flag_col].fillna(method='bfill', inplace=True)
 
-    # Identify coherent groups of a single flag value, and drop those not
-    # corresponding to the falg value that we're interested in
-    groups = (df[flag_col] != df[flag_col].shift()).cumsum()
-    groups[df[flag_col] != flag_value] = np.nan
-    groups.dropna(inplace=True)
+    # Identify coherent periods of the flag value that we're interested in,
+    # and the index closest to the middle of each
+    starts, stops = segments((df[flag_col] == flag_value).values)
+    mids = starts + (stops - starts) // 2
 
-    _groups = df.groupby(groups)
+    positions = np.arange(len(df))
 
-    # Create a series containing mean data values over each flag group,
-    # potentially skipping data at the start and end of each group
-    # TODO: this is double-plus ugly.
-    means = pd.Series(
-       _groups.apply(lambda x: x[data_col].iloc[skip_start:len(x)-skip_end].mean()).values,
-        index=_groups.apply(lambda x: x.index[int(len(x) / 2)])
-    )
-
-    # Either interpolate back across the full index, or create a series which
-    # is NaN everywhere that the means are not defined.
-    if interp:
-        df[out_name] = (
-            means.reindex(
-                df.index.union(means.index).sort_values()
-            ).interpolate().loc[df.index]
+    for _data, _name in zip(data_col, out_name):
+        # Mean data values over each flag period, potentially skipping data
+        # at the start and end of each period
+        means = segment_means(
+            df[_data].values, starts, stops, skip_start=skip_start,
+            skip_end=skip_end
         )
 
-    else:
-        df[out_name] = np.nan
-        df.loc[means.index, out_name] = means.values
+        out = np.full(len(df), np.nan)
+
+        # Either interpolate back across the full index, or leave NaN
+        # everywhere that the means are not defined. Interpolation fills
+        # forward from the last mean, but not back from the first.
+        if interp:
+            valid = ~np.isnan(means)
+            if valid.any():
+                xp = mids[valid]
+                out[xp[0]:] = np.interp(positions[xp[0]:], xp, means[valid])
+        else:
+            out[mids] = means
+
+        df[_name] = out
 
 
 def try_to_call(call, compliance=False):
@@ -158,66 +162,95 @@ def try_to_call(call, compliance=False):
 
 
 def slrs(wow, ps, roll, min_length=120, max_length=None, roll_lim=3,
-         ps_lim=2, roll_mean=5, freq=1):
-
-    def _add_slrs(slrs, group):
-        _gdf = group[1]
-        if max_length is None:
-            slrs.append(_gdf)
-            return
-        num_groups = len(_gdf) // max_length
-        last_index = -(len(_gdf) % max_length)
-        _gdfs = np.split(_gdf.iloc[:last_index], num_groups)
-        slrs += _gdfs
-
-        rem = _gdf.iloc[last_index:]
-        if len(rem) >= min_length:
-            slrs.append(rem)
+         ps_lim=2, roll_mean=5):
+    """
+    Identify straight and level runs, where the aircraft is in the air, the
+    standard deviation of static pressure is below ps_lim, and the range of
+    the (smoothed) roll angle is below roll_lim, over centred windows of
+    min_length seconds. The selection is made on 1 Hz data.
+
+    Args:
+        wow: a pd.Series of the weight on wheels flag.
+        ps: a pd.Series of static pressure.
+        roll: a pd.Series of aircraft roll.
+
+    Kwargs:
+        min_length: the minimum length of a run, in seconds. Default 120.
+        max_length: if given, runs longer than this are split into runs of
+                    max_length seconds, with any remainder kept if it is at
+                    least min_length. Default None.
+        roll_lim: the maximum range of roll in a run. Default 3.
+        ps_lim: the maximum standard deviation of static pressure in a run.
+                Default 2.
+        roll_mean: the length, in seconds, of a trailing mean applied to
+                   roll. Default 5.
+
+    Returns:
+        a 2-tuple (starts, ends) of int64 arrays, giving the times, in
+        nanoseconds since the epoch, of the first and last 1 Hz samples in
+        each run. See ppodd.utils.segments.time_mask to create a mask from
+        these at any frequency.
+    """
+    from .segments import segments, drop_short
+    from .windows import sliding_ptp
 
     window_size = min_length
-    slrs = []
 
     if max_length is not None and max_length < min_length:
         raise ValueError('max_length must be >= min_length')
 
-    _df = pd.DataFrame()
-    _df['WOW_IND'] = wow
-    _df['PS_RVSM'] = ps
-    _df['ROLL_GIN'] = roll
-    _df = _df.asfreq('1S')
+    _df = pd.DataFrame(
+        {'WOW_IND': wow, 'PS_RVSM': ps, 'ROLL_GIN': roll}, index=wow.index
+    ).asfreq('1S')
 
     # Drop an data on the ground
     _df.loc[_df.WOW_IND == 1] = np.nan
     _df.dropna(inplace=True)
 
+    times = _df.index.asi8
+    n = len(times)
+
     # Check the variance of the static pressure is sufficiently small
-    _df['PS_C'] = _df.PS_RVSM.rolling(
-        window_size, center=True
-    ).std() < ps_lim
+    ps_c = (_df.PS_RVSM.rolling(window_size, center=True).std() < ps_lim)
 
-    # Check that the range of the GIN roll is inside acceptable limits
-    _df['ROLL_C'] = _df.ROLL_GIN.rolling(roll_mean).mean().rolling(
-        window_size, center=True
-    ).apply(np.ptp, raw=True) < roll_lim
+    # Check that the range of the GIN roll is inside acceptable limits, over
+    # the same centred windows
+    roll_range = np.full(n, np.nan)
+    _ptp = sliding_ptp(
+        _df.ROLL_GIN.rolling(roll_mean).mean().values, window_size
+    )
+    _offset = window_size // 2
+    roll_range[_offset:_offset + _ptp.size] = _ptp
+
+    with np.errstate(invalid='ignore'):
+        roll_c = roll_range < roll_lim
 
     # Identify discontiguous regions which pass the selection criteria
-    # and group them
-    _df['_SLR'] = (_df['PS_C'] & _df['ROLL_C']).astype(int)
-    _df['_SLRCNT'] = (_df._SLR.diff(1) != 0).astype('int').cumsum()
-    groups = _df.groupby(_df._SLRCNT)
-
-    slrs = []
-    for group in groups:
-        _df = group[1]
-        if _df._SLR.mean() == 0:
-            continue
-        if len(_df) < window_size:
-            continue
-
-        # Add slrs to list, splitting if required
-        _add_slrs(slrs, group)
-
-    return [i.asfreq('{0:0.0f}N'.format(1e9/freq)).index for i in slrs]
+    starts, stops = drop_short(
+        *segments(ps_c.values & roll_c), window_size
+    )
+
+    # Split runs if required
+    if max_length is not None:
+        _length = stops - starts
+        _chunks = _length // max_length
+
+        _run = np.repeat(np.arange(starts.size), _chunks)
+        _chunk = np.arange(_run.size) - np.repeat(
+            np.cumsum(_chunks) - _chunks, _chunks
+        )
+        chunk_starts = starts[_run] + _chunk * max_length
+
+        _rem = _length % max_length
+        _keep = (_rem > 0) & (_rem >= min_length)
+
+        starts = np.concatenate([chunk_starts, stops[_keep] - _rem[_keep]])
+        stops = np.concatenate([chunk_starts + max_length, stops[_keep]])
+
+        _order = np.argsort(starts, kind='stable')
+        starts, stops = starts[_order], stops[_order]
+
+    return times[starts], times[stops - 1]
 
 
 class Either(object):
@@ -0,0 +1,113 @@
+"""
+Sliding window reductions over 1D arrays.
+
+Sliding maxima and minima are computed in O(n), independent of the window
+size, with the van Herk/Gil-Werman algorithm: the data are split into blocks
+of the window length, and the extremum over any window is the combination of
+a suffix extremum of one block and a prefix extremum of the next, each of
+which are found with a cumulative reduction.
+
+A window containing a NaN reduces to NaN, consistent with np.max and with
+pd.Series.rolling(window) (i.e. with min_periods=window).
+"""
+import numpy as np
+
+__all__ = ('sliding_max', 'sliding_min', 'sliding_ptp')
+
+
+def _sliding_reduce(x, window, ufunc, fill, partial):
+    """
+    Reduce x over sliding windows, with an associative, idempotent ufunc.
+
+    Args:
+        x: a 1D array.
+        window: the window length, in samples.
+        ufunc: np.maximum or np.minimum.
+        fill: the identity of ufunc, used for padding.
+        partial: if True, include windows truncated by the end of x.
+
+    Returns:
+        a float array, where element i is the reduction of x[i:i+window].
+    """
+    window = int(window)
+    if window < 1:
+        raise ValueError('window must be at least 1')
+
+    x = np.asarray(x, dtype=float)
+    n = x.size
+
+    count = n if partial else n - window + 1
+    if count <= 0:
+        return np.empty(0)
+
+    # Pad to a whole number of blocks, with space for the last (partial)
+    # window to extend beyond the data.
+    length = count + window - 1
+    length += -length % window
+    padded = np.full(length, fill)
+    padded[:n] = x
+
+    blocks = padded.reshape(-1, window)
+    prefix = ufunc.accumulate(blocks, axis=1).ravel()
+    suffix = ufunc.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+
+    return ufunc(suffix[:count], prefix[window - 1:window - 1 + count])
+
+
+def sliding_max(x, window, partial=False):
+    """
+    Get the maximum of an array over sliding windows.
+
+    Args:
+        x: a 1D array.
+        window: the window length, in samples.
+
+    Kwargs:
+        partial: if False (default), only complete windows are included, and
+                 the result has length len(x) - window + 1. If True, windows
+                 are truncated at the end of x, and the result has the length
+                 of x.
+
+    Returns:
+        a float array, where element i is the maximum of x[i:i+window].
+    """
+    return _sliding_reduce(x, window, np.maximum, -np.inf, partial)
+
+
+def sliding_min(x, window, partial=False):
+    """
+    Get the minimum of an array over sliding windows.
+
+    Args:
+        x: a 1D array.
+        window: the window length, in samples.
+
+    Kwargs:
+        partial: if True, include windows truncated at the end of x. See
+                 sliding_max.
+
+    Returns:
+        a float array, where element i is the minimum of x[i:i+window].
+    """
+    return _sliding_reduce(x, window, np.minimum, np.inf, partial)
+
+
+def sliding_ptp(x, window, partial=False):
+    """
+    Get the range (peak to peak) of an array over sliding windows.
+
+    Args:
+        x: a 1D array.
+        window: the window length, in samples.
+
+    Kwargs:
+        partial: if True, include windows truncated at the end of x. See
+                 sliding_max.
+
+    Returns:
+        a float array, where element i is np.ptp(x[i:i+window]).
+    """
+    return (
+        sliding_max(x, window, partial=partial)
+        - sliding_min(x, window, partial=partial)
+    )
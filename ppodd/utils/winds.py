@@ -0,0 +1,222 @@
+"""
+Calculation of the wind vector from aircraft (GIN) attitude and velocity and
+the air velocity measured by a gust probe.
+
+The rotation from aircraft to geographic coordinates is (A3.A2).A1, where
+
+    A1 = | 1     0       0       |
+         | 0     cos(r)  -sin(r) |
+         | 0     sin(r)  cos(r)  |
+
+    A2 = | cos(th)  0   -sin(th) |
+         | 0        1   0        |
+         | sin(th)  0   cos(th)  |
+
+    A3 = | cos(ph)  sin(ph) 0 |
+         | -sin(ph) cos(ph) 0 |
+         | 0        0       1 |
+
+for roll r, pitch th and heading ph. Rather than building these as (3, 3, n)
+arrays and composing them with np.einsum, the elements of the composed
+rotation are written out, and the wind vector is evaluated element-wise, in
+chunks, so that temporaries are small. The arithmetic is ordered as in the
+matrix products, including multiplications by the zero elements of A1, A2
+and A3, and at the same precision, so that results, including the
+propagation of NaNs, are identical.
+"""
+import numpy as np
+
+__all__ = ('rotation', 'lever_arm', 'tas_vector', 'wind_vector')
+
+# Number of samples evaluated at once by wind_vector
+CHUNK_SIZE = 2**15
+
+
+def _m(r, th, ph):
+    """
+    Get the rows of the rotation (A3.A2).A1 (see module docstring), and of
+    A3.A2, as lists of arrays.
+    """
+    # Trigonometric functions are evaluated at the precision of the inputs,
+    # everything else in double precision
+    cr, sr, ct, st, cp, sp = [
+        np.asarray(_f(_x), dtype=float)
+        for _x in (r, th, ph) for _f in (np.cos, np.sin)
+    ]
+
+    # A3.A2
+    m = [
+        [
+            cp * ct + sp * 0 + 0 * st,
+            cp * 0 + sp * 1 + 0 * 0,
+            cp * -st + sp * 0 + 0 * ct
+        ],
+        [
+            -sp * ct + cp * 0 + 0 * st,
+            -sp * 0 + cp * 1 + 0 * 0,
+            -sp * -st + cp * 0 + 0 * ct
+        ],
+        [
+            0 * ct + 0 * 0 + 1 * st,
+            0 * 0 + 0 * 1 + 1 * 0,
+            0 * -st + 0 * 0 + 1 * ct
+        ]
+    ]
+
+    # (A3.A2).A1
+    R = [
+        [
+            _m_i[0] + _m_i[1] * 0 + _m_i[2] * 0,
+            _m_i[0] * 0 + _m_i[1] * cr + _m_i[2] * sr,
+            _m_i[0] * 0 + _m_i[1] * -sr + _m_i[2] * cr
+        ] for _m_i in m
+    ]
+
+    return R, m, sp, cp
+
+
+def rotation(r, th, ph):
+    """
+    Get the rotation from aircraft to geographic coordinates.
+
+    Args:
+        r: the aircraft roll, in radians.
+        th: the aircraft pitch, in radians.
+        ph: the aircraft heading, in radians.
+
+    Returns:
+        a (3, 3, n) array.
+    """
+    R, _, _, _ = _m(r, th, ph)
+    return np.array(R)
+
+
+def _lever_arm(R, m, sp, cp, rdot, thdot, phdot, insposn):
+    """
+    Get the lever arm correction from the rows of the rotations returned by
+    _m.
+    """
+    # Angular velocity, geo relative
+    L = [
+        (0 + (cp * 0 + sp * -thdot + 0 * 0))
+        + (m[0][0] * rdot + m[0][1] * 0 + m[0][2] * 0),
+        (0 + (-sp * 0 + cp * -thdot + 0 * 0))
+        + (m[1][0] * rdot + m[1][1] * 0 + m[1][2] * 0),
+        (-phdot + (0 * 0 + 0 * -thdot + 1 * 0))
+        + (m[2][0] * rdot + m[2][1] * 0 + m[2][2] * 0)
+    ]
+
+    # Offset of the gust probe from the GIN, geo relative
+    l0, l1, l2 = insposn
+    LR = [_R_i[0] * l0 + _R_i[1] * l1 + _R_i[2] * l2 for _R_i in R]
+
+    return [
+        L[1] * LR[2] - L[2] * LR[1],
+        L[2] * LR[0] - L[0] * LR[2],
+        L[0] * LR[1] - L[1] * LR[0]
+    ]
+
+
+def lever_arm(r, th, ph, rdot, thdot, phdot, insposn):
+    """
+    Get the correction to the wind vector for the offset between the gust
+    probe and the GIN.
+
+    Args:
+        r, th, ph: the aircraft roll, pitch and heading, in radians.
+        rdot, thdot, phdot: the rates of change of roll, pitch and heading,
+                            in radians per second.
+        insposn: the position of the gust probe relative to the GIN, in m.
+
+    Returns:
+        a (3, n) array.
+    """
+    R, m, sp, cp = _m(r, th, ph)
+    return np.array(_lever_arm(R, m, sp, cp, rdot, thdot, phdot, insposn))
+
+
+def _tas_vector(R, tas, alpha, beta):
+    """
+    Get the TAS vector in geographic coordinates, from the rows of the
+    rotation.
+    """
+    tan_alpha = np.tan(alpha)
+    tan_beta = np.tan(beta)
+
+    tas_p = tas / (1 + tan_beta**2 + tan_alpha**2)**.5
+    T0 = -tas_p
+    T1 = -tas_p * tan_beta
+    T2 = tas_p * tan_alpha
+
+    return [_R_i[0] * T0 + _R_i[1] * T1 + _R_i[2] * T2 for _R_i in R]
+
+
+def tas_vector(R, tas, alpha, beta):
+    """
+    Get the true airspeed vector, in geographic coordinates.
+
+    Args:
+        R: the (3, 3, n) rotation from aircraft to geographic coordinates,
+           see rotation().
+        tas: the true airspeed.
+        alpha: the angle of attack, in radians.
+        beta: the angle of sideslip, in radians.
+
+    Returns:
+        a (3, n) array.
+    """
+    return np.array(_tas_vector(R, tas, alpha, beta))
+
+
+def wind_vector(vn, ve, vz, r, th, ph, rdot, thdot, phdot, tas, alpha, beta,
+                insposn, chunk_size=CHUNK_SIZE, out=None):
+    """
+    Calculate the wind vector, as the sum of the aircraft ground velocity,
+    the geo relative TAS vector and the correction for the offset between the
+    gust probe and the GIN.
+
+    Args:
+        vn, ve, vz: the components of the aircraft ground velocity.
+        r, th, ph: the aircraft roll, pitch and heading, in radians.
+        rdot, thdot, phdot: the rates of change of roll, pitch and heading,
+                            in radians per second.
+        tas: the true airspeed.
+        alpha: the angle of attack, in radians.
+        beta: the angle of sideslip, in radians.
+        insposn: the position of the gust probe relative to the GIN, in m.
+
+    Kwargs:
+        chunk_size: the number of samples to evaluate at once, or None to
+                    evaluate all at once.
+        out: an optional (3, n) float array, into which the result is
+             written.
+
+    Returns:
+        a (3, n) array of the wind components.
+    """
+    inputs = [
+        np.asarray(i)
+        for i in (vn, ve, vz, r, th, ph, rdot, thdot, phdot, tas, alpha, beta)
+    ]
+
+    n = inputs[0].size
+    if out is None:
+        out = np.empty((3, n))
+
+    if not chunk_size:
+        chunk_size = max(n, 1)
+
+    for start in range(0, n, chunk_size):
+        _s = slice(start, start + chunk_size)
+        (_vn, _ve, _vz, _r, _th, _ph, _rdot, _thdot, _phdot, _tas, _alpha,
+         _beta) = [i[_s] for i in inputs]
+
+        R, m, sp, cp = _m(_r, _th, _ph)
+        TASR = _tas_vector(R, _tas, _alpha, _beta)
+        LEV = _lever_arm(R, m, sp, cp, _rdot, _thdot, _phdot, insposn)
+
+        for i, _v in enumerate((_vn, _ve, _vz)):
+            np.add(_v, TASR[i], out=out[i, _s])
+            out[i, _s] += LEV[i]
+
+    return out
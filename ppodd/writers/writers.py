@@ -9,7 +9,7 @@ import pandas as pd
 from netCDF4 import Dataset
 import sqlite3
 
-from ..utils import pd_freq, try_to_call, unwrap_array
+from ..utils import circular, pd_freq, try_to_call
 
 __all__ = ['SQLiteWriter', 'NetCDFWriter']
 
@@ -215,16 +215,11 @@ class NetCDFWriter(DecadesWriter):
             # frequency and then reindexed. Apply a mean to the data and a pad
             # to the flag.
             if getattr(var, 'circular', False):
-                _data = unwrap_array(var())
+                _data = circular.resample_mean(var(), pd_freq[_freq])
             else:
-                _data = var()
+                _data = var().resample(pd_freq[_freq]).apply('mean')
 
-            _data = _data.resample(
-                pd_freq[_freq]
-            ).apply('mean').reindex(_index).fillna(var.attrs['_FillValue'])
-
-            if getattr(var, 'circular', False):
-                _data[_data != var.attrs['_FillValue']] %= 360
+            _data = _data.reindex(_index).fillna(var.attrs['_FillValue'])
 
             _flag = var.flag().resample(
                 pd_freq[_freq]
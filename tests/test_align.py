@@ -0,0 +1,190 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from ppodd.utils.align import grid_positions, onto, outerjoin
+
+
+def pandas_onto(series, index, limit=1, method='linear'):
+    """The pandas implementation which onto() should reproduce."""
+    return series.reindex(index.union(series.index).sort_values()).interpolate(
+        method, limit=limit
+    ).loc[index].values
+
+
+def pandas_outerjoin(series, frequency):
+    """The pandas implementation which outerjoin() should reproduce."""
+    df = pd.concat([i.dropna() for i in series], axis=1, join='outer')
+    return df.reindex(pd.date_range(
+        start=df.index[0], end=df.index[-1],
+        freq=pd.Timedelta(1 / frequency, unit='s')
+    ))
+
+
+class TestOnto(unittest.TestCase):
+    """
+    Tests that align.onto is equivalent to interpolating over the union of
+    indexes with pandas.
+    """
+
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+
+    def _series(self, start, periods, freq, nans=0.1):
+        values = self.rng.random(periods)
+        values[self.rng.random(periods) < nans] = np.nan
+        return pd.Series(
+            values, index=pd.date_range(start, periods=periods, freq=freq)
+        )
+
+    def assertEquivalent(self, series, index, **kwargs):
+        np.testing.assert_allclose(
+            onto(series, index, **kwargs),
+            pandas_onto(series, index, **kwargs),
+            rtol=1e-12, equal_nan=True
+        )
+
+    def test_regular(self):
+        series = self._series('2020-01-01', 200, '40ms')
+        for freq in ('1S', '100ms', '40ms', '25ms', '7ms'):
+            for start in ('2020-01-01', '2019-12-31 23:59:59.5',
+                          '2020-01-01 00:00:03.003'):
+                index = pd.date_range(start, periods=100, freq=freq)
+                for limit in (None, 1, 5):
+                    self.assertEquivalent(series, index, limit=limit)
+
+    def test_irregular(self):
+        series = self._series('2020-01-01', 200, '40ms')
+        series = series.iloc[np.sort(self.rng.choice(200, 120, False))]
+
+        index = pd.DatetimeIndex(np.sort(self.rng.choice(
+            pd.date_range('2020-01-01', periods=400, freq='20ms'), 150, False
+        )))
+
+        for limit in (None, 1, 3):
+            self.assertEquivalent(series, index, limit=limit)
+            self.assertEquivalent(series, index, limit=limit, method='time')
+
+    def test_gaps_at_ends(self):
+        series = self._series('2020-01-01', 50, '1S', nans=0)
+        series.iloc[:5] = np.nan
+        series.iloc[-5:] = np.nan
+        index = pd.date_range('2020-01-01', periods=500, freq='100ms')
+
+        for limit in (None, 1, 20):
+            self.assertEquivalent(series, index, limit=limit)
+
+    def test_no_valid_data(self):
+        series = pd.Series(
+            np.full(10, np.nan),
+            index=pd.date_range('2020-01-01', periods=10, freq='1S')
+        )
+        index = pd.date_range('2020-01-01', periods=5, freq='2S')
+        self.assertTrue(np.isnan(onto(series, index)).all())
+
+    def test_integer_subset(self):
+        series = pd.Series(
+            np.arange(10), index=pd.date_range(
+                '2020-01-01', periods=10, freq='1S'
+            )
+        )
+        index = series.index[::2]
+
+        result = onto(series, index)
+        self.assertEqual(result.dtype, series.dtype)
+        np.testing.assert_array_equal(result, np.arange(0, 10, 2))
+
+    def test_integer_interpolated(self):
+        series = pd.Series(
+            np.arange(10), index=pd.date_range(
+                '2020-01-01', periods=10, freq='1S'
+            )
+        )
+        index = pd.date_range('2020-01-01', periods=20, freq='500ms')
+        self.assertEquivalent(series, index)
+
+    def test_unknown_method(self):
+        series = self._series('2020-01-01', 10, '1S')
+        with self.assertRaises(ValueError):
+            onto(series, series.index[:5] + pd.Timedelta('10ms'),
+                 method='cubic')
+
+
+class TestOuterjoin(unittest.TestCase):
+    """
+    Tests that align.outerjoin is equivalent to outer joining and
+    reindexing with pandas.
+    """
+
+    def test_outerjoin(self):
+        rng = np.random.default_rng(0)
+
+        a = pd.Series(
+            rng.random(100), name='a',
+            index=pd.date_range('2020-01-01', periods=100, freq='100ms')
+        )
+        a.iloc[:10] = np.nan
+        b = pd.Series(
+            rng.random(20), name='b',
+            index=pd.date_range('2020-01-01 00:00:05', periods=20, freq='1S')
+        )
+        c = pd.Series(
+            np.arange(50), name='c',
+            index=pd.date_range('2020-01-01 00:00:02', periods=50,
+                                freq='200ms')
+        )
+
+        pd.testing.assert_frame_equal(
+            outerjoin([a, b, c], 10), pandas_outerjoin([a, b, c], 10),
+            check_freq=False
+        )
+
+    def test_off_grid_dropped(self):
+        a = pd.Series(
+            [1., 2., 3.], name='a',
+            index=pd.DatetimeIndex([
+                '2020-01-01 00:00:00', '2020-01-01 00:00:00.5',
+                '2020-01-01 00:00:01'
+            ])
+        )
+        result = outerjoin([a], 1)
+        np.testing.assert_array_equal(result['a'].values, [1., 3.])
+
+    def test_dtype_retained(self):
+        a = pd.Series(
+            np.arange(10, dtype=np.int16), name='a',
+            index=pd.date_range('2020-01-01', periods=10, freq='1S')
+        )
+        self.assertEqual(outerjoin([a], 1)['a'].dtype, np.int16)
+
+    def test_no_valid_data(self):
+        a = pd.Series(
+            [np.nan], name='a', index=pd.DatetimeIndex(['2020-01-01'])
+        )
+        with self.assertRaises(ValueError):
+            outerjoin([a], 1)
+
+
+class TestGridPositions(unittest.TestCase):
+    """
+    Tests for finding positions on a regular grid.
+    """
+
+    def test_regular(self):
+        index = pd.date_range('2020-01-01 00:00:01', periods=5, freq='2S')
+        positions, on_grid = grid_positions(
+            index, pd.Timestamp('2020-01-01').value, int(1e9)
+        )
+        np.testing.assert_array_equal(positions, [1, 3, 5, 7, 9])
+        self.assertIsNone(on_grid)
+
+    def test_off_grid(self):
+        index = pd.DatetimeIndex(
+            ['2020-01-01 00:00:01', '2020-01-01 00:00:02.5']
+        )
+        positions, on_grid = grid_positions(
+            index, pd.Timestamp('2020-01-01').value, int(1e9)
+        )
+        np.testing.assert_array_equal(positions, [1, 2])
+        np.testing.assert_array_equal(on_grid, [True, False])
@@ -0,0 +1,77 @@
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+
+import numpy as np
+
+from ppodd.decades import ZipMemberFile
+
+
+class TestZipMemberFile(unittest.TestCase):
+    """
+    Tests for reading members of zip archives in place.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.archive = os.path.join(self.tmpdir, 'flight.zip')
+        self.content = {
+            'stored.bin': bytes(range(256)) * 10,
+            'deflated.csv': b'a,b\n1,2\n' * 100,
+            'empty.txt': b''
+        }
+
+        with zipfile.ZipFile(self.archive, 'w') as zf:
+            zf.writestr(zipfile.ZipInfo('dir/'), b'')
+
+            # An extra field moves the member data within the archive
+            info = zipfile.ZipInfo('stored.bin')
+            info.extra = b'\xfe\xca\x04\x00abcd'
+            zf.writestr(info, self.content['stored.bin'])
+
+            zf.writestr('deflated.csv', self.content['deflated.csv'],
+                        compress_type=zipfile.ZIP_DEFLATED)
+            zf.writestr('empty.txt', b'')
+
+        with zipfile.ZipFile(self.archive) as zf:
+            self.members = {
+                i.filename: ZipMemberFile(self.archive, i)
+                for i in zf.infolist()
+            }
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_stored(self):
+        member = self.members['stored.bin']
+        self.assertTrue(member.stored)
+
+        _buffer = member.buffer()
+        self.assertIsInstance(_buffer, np.memmap)
+        self.assertEqual(bytes(_buffer), self.content['stored.bin'])
+
+    def test_deflated(self):
+        member = self.members['deflated.csv']
+        self.assertFalse(member.stored)
+
+        # Inflated once, and held until the file is closed
+        self.assertEqual(bytes(member.buffer()), self.content['deflated.csv'])
+        self.assertIs(member.buffer(), member.buffer())
+
+        member.close()
+        self.assertIsNone(member._data)
+
+        with member.open('r') as f:
+            self.assertEqual(f.readline(), 'a,b\n')
+
+    def test_empty(self):
+        self.assertEqual(self.members['empty.txt'].buffer(), b'')
+
+    def test_bad_header(self):
+        member = self.members['stored.bin']
+        member.info.header_offset += 1
+
+        with self.assertRaises(zipfile.BadZipFile):
+            member.buffer()
@@ -0,0 +1,92 @@
+import importlib
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import ppodd
+from ppodd.utils import cache
+
+
+class TestCache(unittest.TestCase):
+    """
+    Tests for the on-disk cache.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        patcher = mock.patch.object(cache, 'CACHE_DIR', self.tmpdir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_key_deterministic(self):
+        self.assertEqual(cache.cache_key('a', b'b'), cache.cache_key('a', 'b'))
+        self.assertNotEqual(cache.cache_key('a'), cache.cache_key('b'))
+
+    def test_key_versioned(self):
+        key = cache.cache_key('a')
+
+        with mock.patch.object(ppodd, '__version__', 'other'):
+            self.assertNotEqual(cache.cache_key('a'), key)
+
+        with mock.patch.object(cache, 'CACHE_FORMAT', cache.CACHE_FORMAT + 1):
+            self.assertNotEqual(cache.cache_key('a'), key)
+
+    def test_round_trip(self):
+        key = cache.cache_key('round trip')
+        cache.dump_cached('test', key, {'a': [1, 2]})
+        self.assertEqual(cache.load_cached('test', key), {'a': [1, 2]})
+
+    def test_miss(self):
+        self.assertIsNone(cache.load_cached('test', cache.cache_key('miss')))
+
+    def test_corrupt_entry_removed(self):
+        key = cache.cache_key('corrupt')
+        cache.dump_cached('test', key, 1)
+
+        _file = cache._cache_file('test', key)
+        with open(_file, 'wb') as f:
+            f.write(b'not a pickle')
+
+        self.assertIsNone(cache.load_cached('test', key))
+        self.assertFalse(os.path.exists(_file))
+
+    def test_stale_entry_removed(self):
+        # A pickle of a class whose module no longer exists
+        key = cache.cache_key('stale')
+        _file = cache._cache_file('test', key)
+        os.makedirs(os.path.dirname(_file))
+        with open(_file, 'wb') as f:
+            f.write(b'cnot_a_module\nStale\n.')
+
+        self.assertIsNone(cache.load_cached('test', key))
+        self.assertFalse(os.path.exists(_file))
+
+    def test_unpicklable_not_written(self):
+        key = cache.cache_key('unpicklable')
+        cache.dump_cached('test', key, lambda: None)
+        self.assertIsNone(cache.load_cached('test', key))
+        self.assertEqual(os.listdir(os.path.join(self.tmpdir, 'test')), [])
+
+    def test_disabled(self):
+        with mock.patch.object(cache, 'CACHE_DIR', ''):
+            key = cache.cache_key('disabled')
+            cache.dump_cached('test', key, 1)
+            self.assertIsNone(cache.load_cached('test', key))
+
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir, 'test')))
+
+    def test_disabled_by_default(self):
+        with mock.patch.dict(os.environ):
+            os.environ.pop('PPODD_CACHE_DIR', None)
+            importlib.reload(cache)
+            self.addCleanup(importlib.reload, cache)
+            self.assertEqual(cache.CACHE_DIR, '')
+
+        with mock.patch.dict(os.environ, {'PPODD_CACHE_DIR': self.tmpdir}):
+            importlib.reload(cache)
+            self.assertEqual(cache.CACHE_DIR, self.tmpdir)
@@ -0,0 +1,83 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from ppodd.utils.circular import interp, resample_mean, unwrap, wrap
+
+
+class TestCircular(unittest.TestCase):
+    """
+    Tests for handling circular data.
+    """
+
+    def test_unwrap(self):
+        ang = np.array([350., 355., 5., 10., 5., 355., 350.])
+        np.testing.assert_array_equal(
+            unwrap(ang), [350., 355., 365., 370., 365., 355., 350.]
+        )
+
+    def test_unwrap_matches_numpy(self):
+        rng = np.random.default_rng(0)
+        ang = np.cumsum(rng.normal(0, 40, 1000)) % 360
+        np.testing.assert_allclose(
+            unwrap(ang), np.rad2deg(np.unwrap(np.deg2rad(ang))), atol=1e-9
+        )
+
+    def test_unwrap_nans(self):
+        ang = np.array([350., np.nan, 10., 20., np.nan, np.nan, 200.])
+        np.testing.assert_array_equal(
+            unwrap(ang), [350., np.nan, 10., 20., np.nan, np.nan, 200.]
+        )
+
+    def test_unwrap_short(self):
+        np.testing.assert_array_equal(unwrap(np.array([10.])), [10.])
+        self.assertEqual(len(unwrap(np.array([]))), 0)
+
+    def test_unwrap_series(self):
+        ang = pd.Series(
+            [359., 1.], index=pd.date_range('2020-01-01', periods=2),
+            name='HDG'
+        )
+        result = unwrap(ang)
+        self.assertIsInstance(result, pd.Series)
+        self.assertEqual(result.name, 'HDG')
+        pd.testing.assert_index_equal(result.index, ang.index)
+        np.testing.assert_array_equal(result.values, [359., 361.])
+
+    def test_wrap(self):
+        ang = np.array([-1e-14, -10., 0., 360., 370., 720., np.nan])
+        result = wrap(ang)
+        np.testing.assert_allclose(
+            result, [0., 350., 0., 0., 10., 0., np.nan], atol=1e-12
+        )
+        self.assertTrue((result[:-1] >= 0).all())
+        self.assertTrue((result[:-1] < 360).all())
+
+    def test_resample_mean(self):
+        index = pd.date_range('2020-01-01', periods=8, freq='250ms')
+        ang = pd.Series(
+            [350., 10., 355., 5., 170., 190., np.nan, 180.], index=index
+        )
+        result = resample_mean(ang, '1S')
+
+        self.assertEqual(len(result), 2)
+        np.testing.assert_allclose(result.values, [0., 180.], atol=1e-9)
+
+    def test_resample_mean_gaps(self):
+        index = pd.date_range('2020-01-01', periods=3, freq='1S')
+        ang = pd.Series([90., np.nan, 270.], index=index)
+        result = resample_mean(ang, '1S')
+
+        np.testing.assert_allclose(result.values[[0, 2]], [90., 270.])
+        self.assertTrue(np.isnan(result.values[1]))
+
+    def test_interp(self):
+        series = pd.Series(
+            [350., 10., 30.],
+            index=pd.date_range('2020-01-01', periods=3, freq='1S')
+        )
+        index = pd.date_range('2020-01-01', periods=5, freq='500ms')
+        np.testing.assert_allclose(
+            interp(series, index), [350., 0., 10., 20., 30.]
+        )
@@ -0,0 +1,89 @@
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+import yaml
+
+from ppodd.decades import DecadesDataset
+from ppodd.readers.constants import validate_flight_constants
+
+
+CONSTANTS = {
+    'Globals': {'title': 'test'},
+    'Constants': {
+        'ModA': {'A': 1, 'B': [1, 2]},
+        'ModB': {'C': {'D': 2}}
+    },
+    'Modifications': {
+        'Exclude': ['Foo'],
+        'Variables': {'X': {'write': False}}
+    }
+}
+
+
+class TestFlightConstants(unittest.TestCase):
+    """
+    Tests for the flight constants readers.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filepath = os.path.join(
+            self.tmpdir, 'flight-cst_faam_20200101_r0_c001.yaml'
+        )
+        with open(self.filepath, 'w') as f:
+            yaml.dump(CONSTANTS, f)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _dataset(self):
+        d = DecadesDataset(datetime.datetime(2020, 1, 1))
+        d.add_file(self.filepath)
+        d.readers[0].read()
+        return d
+
+    def test_constants_read(self):
+        d = self._dataset()
+        self.assertEqual(d['A'], 1)
+        self.assertEqual(d['C'], {'D': 2})
+        self.assertEqual(d._mod_exclusions, ['Foo'])
+        self.assertEqual(d._variable_mods, {'X': {'write': False}})
+
+    def test_constants_read_only(self):
+        d = self._dataset()
+        with self.assertRaises(TypeError):
+            d.constants.maps[1]['A'] = 2
+
+    def test_cached_constants_frozen(self):
+        d1 = self._dataset()
+        self.assertEqual(d1['B'], (1, 2))
+
+        with self.assertRaises(AttributeError):
+            d1['B'].append(3)
+        with self.assertRaises(TypeError):
+            d1['C']['D'] = 3
+        with self.assertRaises(TypeError):
+            d1._variable_mods['X']['write'] = True
+
+        # The frozen constants are shared, rather than copied
+        d2 = self._dataset()
+        self.assertIs(d2['C'], d1['C'])
+        self.assertEqual(d2['C'], {'D': 2})
+        self.assertEqual(d2._variable_mods, {'X': {'write': False}})
+
+    def test_changed_file_reread(self):
+        self._dataset()
+
+        _consts = dict(CONSTANTS, Constants={'ModA': {'A': 5}})
+        with open(self.filepath, 'w') as f:
+            yaml.dump(_consts, f)
+        os.utime(self.filepath, ns=(0, 0))
+
+        self.assertEqual(self._dataset()['A'], 5)
+
+    def test_invalid_constants(self):
+        with self.assertRaises(ValueError):
+            validate_flight_constants({'Globals': {}, 'Constants': {'M': [1]}})
@@ -0,0 +1,180 @@
+import datetime
+import os
+import shutil
+import sys
+import tempfile
+import textwrap
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from ppodd.decades import DecadesDataset, DecadesVariable
+from ppodd.readers.base import FileReader
+
+
+class VariableReader(FileReader):
+    """
+    A FileReader which adds a given list of variables to a dataset.
+    """
+
+    def __init__(self, dataset, variables):
+        super().__init__()
+        self.dataset = dataset
+        self.variables = variables
+
+    def read(self):
+        for var in self.variables:
+            self.dataset.add_input(var)
+
+
+PLUGINS = textwrap.dedent('''
+    from ppodd.decades import DecadesVariable
+    from ppodd.pod.base import PPBase
+
+
+    class FromA(PPBase):
+        inputs = ['DUP_A']
+
+        @staticmethod
+        def test():
+            return {'DUP_A': ('data', [1.] * 100)}
+
+        def declare_outputs(self):
+            self.declare('DUP_OUT', units='1', frequency=1, long_name='Dup')
+
+        def process(self):
+            self.get_dataframe()
+            self.add_output(DecadesVariable(self.d.DUP_A, name='DUP_OUT'))
+
+
+    class FromB(PPBase):
+        inputs = ['DUP_B']
+
+        @staticmethod
+        def test():
+            return {'DUP_B': ('data', [2.] * 100)}
+
+        def declare_outputs(self):
+            self.declare('DUP_OUT', units='1', frequency=1, long_name='Dup')
+
+        def process(self):
+            self.get_dataframe()
+            self.add_output(DecadesVariable(self.d.DUP_B, name='DUP_OUT'))
+''')
+
+
+def variable(name, values):
+    return DecadesVariable(
+        pd.Series(
+            values,
+            index=pd.date_range('2020-01-01', periods=len(values), freq='S')
+        ),
+        name=name, frequency=1
+    )
+
+
+class TestTargets(unittest.TestCase):
+    """
+    Tests for loading and processing a dataset restricted to output targets.
+    """
+
+    def setUp(self):
+        n = 100
+        wow = np.ones(n)
+        wow[20:80] = 0
+
+        self.d = DecadesDataset(datetime.date(2020, 1, 1))
+        self.d.add_constant('CALCABT', [-263, 1.5e-4])
+        self.d.readers.append(VariableReader(self.d, [
+            variable('PRTAFT_wow_flag', wow),
+            variable('CORCON_cabin_t', np.linspace(180e4, 185e4, n)),
+            variable('CORCON_unused', np.zeros(n))
+        ]))
+
+    def test_required_inputs(self):
+        self.d.load(targets=['CAB_TEMP'])
+        self.assertIn('CORCON_cabin_t', self.d._required_inputs)
+        self.assertNotIn('CORCON_unused', self.d._required_inputs)
+        self.assertNotIn('CORCON_unused', self.d.variables)
+
+    def test_wow_kept_with_garbage_collection(self):
+        self.d.garbage_collect(True)
+        self.d.load(targets=['CAB_TEMP'])
+
+        self.assertIn('PRTAFT_wow_flag', self.d.variables)
+        self.assertEqual(
+            self.d.takeoff_time, pd.Timestamp('2020-01-01 00:00:20')
+        )
+        self.assertEqual(
+            self.d.landing_time, pd.Timestamp('2020-01-01 00:01:20')
+        )
+
+    def test_dynamic_module_inputs_read(self):
+        # The outputs of the WVSS2 modules depend on the data, so can't be
+        # resolved before the data are read, and their inputs must be kept.
+        self.d.load(targets=['CAB_TEMP'])
+        self.assertIn('WVSS2A_serial_data', self.d._required_inputs)
+
+    def test_process_targets(self):
+        self.d.trim = False
+        self.d.load(targets=['CAB_TEMP'])
+        self.d.process()
+
+        self.assertEqual(
+            [str(i) for i in self.d.completed_modules], ['CabinTemp']
+        )
+        self.assertIn('CAB_TEMP', self.d.variables)
+
+
+class TestTargetProducers(unittest.TestCase):
+    """
+    Tests for resolving targets which may be produced by more than one
+    module.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.tmpdir, 'pp_dup'))
+        with open(os.path.join(self.tmpdir, 'pp_dup', '__init__.py'), 'w') \
+                as f:
+            f.write(textwrap.dedent('''
+                from ppodd.utils.plugins import manifest
+
+                def get_manifest():
+                    return manifest(__name__, 'PPBase')
+            '''))
+        with open(os.path.join(self.tmpdir, 'pp_dup', 'p_dup.py'), 'w') as f:
+            f.write(PLUGINS)
+        sys.path.insert(0, self.tmpdir)
+
+        self.d = DecadesDataset(datetime.date(2020, 1, 1), pp_plugins='pp_dup')
+        self.d.trim = False
+
+    def tearDown(self):
+        sys.path.remove(self.tmpdir)
+        for module in ('pp_dup', 'pp_dup.p_dup'):
+            sys.modules.pop(module, None)
+        shutil.rmtree(self.tmpdir)
+
+    def test_all_producers_required(self):
+        modules, variables, raw = self.d._resolve_targets(
+            ['DUP_OUT'], static=True
+        )
+        self.assertEqual([str(i) for i in modules], ['FromA', 'FromB'])
+        self.assertEqual(raw, {'DUP_A', 'DUP_B'})
+        self.assertEqual(variables, {'DUP_OUT', 'DUP_A', 'DUP_B'})
+
+    def test_alternative_producer_run(self):
+        # Only the inputs of the second producer are available
+        self.d.readers.append(VariableReader(self.d, [
+            variable('PRTAFT_wow_flag', np.zeros(100)),
+            variable('DUP_B', np.full(100, 2.))
+        ]))
+        self.d.load(targets=['DUP_OUT'])
+        self.d.process()
+
+        self.assertEqual(
+            [str(i) for i in self.d.completed_modules], ['FromB']
+        )
+        np.testing.assert_array_equal(self.d['DUP_OUT'].array, 2)
@@ -0,0 +1,170 @@
+import datetime
+import unittest
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from ppodd.readers.gin import (
+    SECONDS_PER_WEEK, gps_utc_offset, regularise, to_datetime64, unwrap_week,
+    week_start
+)
+
+
+def ns(timestamp):
+    """Get a time as integer nanoseconds since the epoch."""
+    return pd.Timestamp(timestamp).value
+
+
+class TestGinTime(unittest.TestCase):
+    """
+    Tests for converting GIN seconds of the GPS week to absolute times.
+    """
+
+    def test_week_start(self):
+        # 2020-01-01 was a Wednesday
+        self.assertEqual(
+            week_start(datetime.datetime(2020, 1, 1, 12)),
+            datetime.datetime(2019, 12, 29)
+        )
+        self.assertEqual(
+            week_start(datetime.datetime(2019, 12, 29)),
+            datetime.datetime(2019, 12, 29)
+        )
+
+    def test_unwrap_week(self):
+        seconds = np.array([SECONDS_PER_WEEK - 1, SECONDS_PER_WEEK - .5, 0,
+                            .5, 1])
+        np.testing.assert_array_equal(
+            unwrap_week(seconds),
+            SECONDS_PER_WEEK + np.array([-1, -.5, 0, .5, 1])
+        )
+
+    def test_unwrap_week_jitter(self):
+        # Small backwards steps are not rollovers
+        seconds = np.array([100., 99.9, 101.])
+        np.testing.assert_array_equal(unwrap_week(seconds), seconds)
+
+    def test_unwrap_week_short(self):
+        np.testing.assert_array_equal(unwrap_week([5.]), [5.])
+        self.assertEqual(len(unwrap_week([])), 0)
+
+    def test_to_datetime64(self):
+        date = datetime.datetime(2020, 1, 1)
+        seconds = np.array([3 * 86400 + 3600, 3 * 86400 + 3600.5])
+
+        np.testing.assert_array_equal(
+            to_datetime64(seconds, date),
+            [ns('2020-01-01 01:00:00'), ns('2020-01-01 01:00:00.5')]
+        )
+
+    def test_to_datetime64_previous_week(self):
+        # Data starting before midnight at the end of a week
+        date = datetime.datetime(2019, 12, 29)
+        seconds = unwrap_week([SECONDS_PER_WEEK - 1, 0, 1])
+
+        np.testing.assert_array_equal(
+            to_datetime64(seconds, date),
+            [ns('2019-12-28 23:59:59'), ns('2019-12-29 00:00:00'),
+             ns('2019-12-29 00:00:01')]
+        )
+
+    def test_leap_seconds(self):
+        date = datetime.datetime(2020, 1, 1)
+        seconds = np.array([3 * 86400 + 3600.])
+
+        np.testing.assert_array_equal(
+            to_datetime64(seconds, date, standard='GPS'),
+            [ns('2020-01-01 00:59:42')]
+        )
+
+        # The offset changes at the leap second
+        np.testing.assert_array_equal(
+            gps_utc_offset(np.array([
+                ns('2016-12-31 23:59:59'), ns('2017-01-01 00:00:00'),
+                ns('1980-01-06')
+            ])),
+            [17, 18, 0]
+        )
+
+    def test_unknown_standard(self):
+        with self.assertRaises(ValueError):
+            to_datetime64([0.], datetime.datetime(2020, 1, 1), standard='TAI')
+
+
+class TestRegularise(unittest.TestCase):
+    """
+    Tests for placing GIN times onto a regular grid.
+    """
+
+    def setUp(self):
+        self.t0 = ns('2020-01-01 12:00:00')
+        self.period = int(1e9 / 50)
+        self.times = self.t0 + np.arange(100) * self.period
+
+    def regularise(self, times, **kwargs):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            result = regularise(times, **kwargs)
+        return result, [str(i.message) for i in caught]
+
+    def test_regular(self):
+        (freq, index, positions), caught = self.regularise(
+            self.times, frequency=50
+        )
+        self.assertEqual(freq, 50)
+        self.assertEqual(caught, [])
+        np.testing.assert_array_equal(index.asi8, self.times)
+        np.testing.assert_array_equal(positions, np.arange(100))
+
+    def test_inferred_frequency(self):
+        (freq, _, _), caught = self.regularise(self.times)
+        self.assertEqual(freq, 50)
+        self.assertEqual(caught, [])
+
+        (freq, _, _), caught = self.regularise(self.times, frequency=32)
+        self.assertEqual(freq, 50)
+        self.assertIn('inferred frequency 50 Hz', caught[0])
+
+    def test_jitter(self):
+        times = self.times.copy()
+        times[10] += int(.1 * self.period)
+        times[20] -= int(.4 * self.period)
+
+        (_, index, positions), caught = self.regularise(times, frequency=50)
+        np.testing.assert_array_equal(index.asi8, self.times)
+        np.testing.assert_array_equal(positions, np.arange(100))
+        self.assertEqual(len(caught), 1)
+        self.assertIn('1 timestamps jitter', caught[0])
+
+    def test_gaps(self):
+        times = np.delete(self.times, [10, 11, 50])
+
+        (_, index, positions), caught = self.regularise(times, frequency=50)
+        np.testing.assert_array_equal(index.asi8, self.times)
+        np.testing.assert_array_equal(
+            positions, np.delete(np.arange(100), [10, 11, 50])
+        )
+        self.assertIn('2 gaps, 3 missing samples', caught[0])
+
+    def test_duplicates(self):
+        times = np.insert(self.times, 30, self.times[30])
+
+        (_, index, positions), caught = self.regularise(times, frequency=50)
+        self.assertEqual(len(index), 100)
+
+        # Only the last sample in each slot is kept
+        self.assertEqual(positions[30], -1)
+        np.testing.assert_array_equal(positions[31:], np.arange(30, 100))
+        self.assertEqual(np.sum(positions >= 0), 100)
+        self.assertEqual(caught, [])
+
+    def test_backwards(self):
+        times = self.times.copy()
+        times[[40, 41]] = times[[41, 40]]
+
+        (_, index, positions), caught = self.regularise(times, frequency=50)
+        np.testing.assert_array_equal(index.asi8, self.times)
+        self.assertEqual(positions[40], 41)
+        self.assertEqual(positions[41], 40)
+        self.assertIn('time goes backwards 1 times', caught[-1])
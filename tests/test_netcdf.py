@@ -0,0 +1,198 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import netCDF4
+import numpy as np
+import pandas as pd
+
+from ppodd.decades import DecadesFile
+from ppodd.readers.netcdf import (
+    CoreNetCDFReader, LazyNetCDFVariable, NetCDFHandlePool, handles
+)
+
+
+class Dataset(object):
+    """
+    A minimal stand in for a DecadesDataset, which collects inputs.
+    """
+
+    def __init__(self):
+        self.inputs = {}
+
+    def add_input(self, variable):
+        self.inputs[variable.name] = variable
+
+    def requires(self, name):
+        return True
+
+
+class TestNetCDF(unittest.TestCase):
+    """
+    Tests for lazily loaded netCDF variables, which should behave exactly as
+    eagerly loaded DecadesVariables.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filepath = os.path.join(
+            self.tmpdir, 'core_faam_20200101_v005_r0_c001.nc'
+        )
+
+        rng = np.random.default_rng(0)
+        with netCDF4.Dataset(self.filepath, 'w') as nc:
+            nc.createDimension('Time', 100)
+            nc.createDimension('sps32', 32)
+
+            time = nc.createVariable('Time', 'i4', ('Time',))
+            time.units = 'seconds since 2020-01-01 00:00:00'
+            time[:] = np.arange(100) + 3600
+
+            a = nc.createVariable('A', 'f4', ('Time',), fill_value=-9999.)
+            a.frequency = 1
+            a.units = 'K'
+            a[:] = np.arange(100)
+            a[5] = np.ma.masked
+
+            a_flag = nc.createVariable('A_FLAG', 'i1', ('Time',))
+            a_flag.flag_values = [0, 1, 2, 3]
+            a_flag.flag_meanings = 'data_good b c d'
+            a_flag[:] = np.arange(100) % 4
+
+            b = nc.createVariable('B', 'f4', ('Time', 'sps32'))
+            b.frequency = 32
+            b.units = 'm'
+            b[:] = rng.random((100, 32))
+
+            b_flag = nc.createVariable('B_FLAG', 'i1', ('Time', 'sps32'))
+            b_flag.flag_masks = [1, 2]
+            b_flag.flag_meanings = 'm1 m2'
+            b_flag[:] = rng.integers(0, 4, (100, 32))
+
+    def tearDown(self):
+        handles.close()
+        shutil.rmtree(self.tmpdir)
+
+    def _read(self, lazy=True):
+        reader = CoreNetCDFReader()
+        _file = DecadesFile(self.filepath)
+        _file.dataset = Dataset()
+        reader.files = [_file]
+
+        if not lazy:
+            reader._is_regular = lambda time: False
+
+        reader.read()
+        return _file.dataset.inputs
+
+    def test_lazy(self):
+        lazy = self._read()
+        for name in ('A', 'B'):
+            self.assertIsInstance(lazy[name], LazyNetCDFVariable)
+            self.assertFalse(lazy[name].loaded)
+
+        self.assertEqual(len(lazy['B']), 3200)
+        self.assertEqual(lazy['A'].units, 'K')
+        self.assertFalse(lazy['A'].loaded)
+
+    def test_matches_eager(self):
+        lazy, eager = self._read(), self._read(lazy=False)
+
+        for name in ('A', 'B'):
+            self.assertEqual(lazy[name].t0, eager[name].t0)
+            self.assertEqual(lazy[name].t1, eager[name].t1)
+            pd.testing.assert_series_equal(lazy[name](), eager[name]())
+            pd.testing.assert_frame_equal(
+                lazy[name].flag.df, eager[name].flag.df
+            )
+
+        self.assertTrue(np.isnan(lazy['A'].array[5]))
+
+    def test_trim_before_load(self):
+        lazy, eager = self._read(), self._read(lazy=False)
+        start = pd.Timestamp('2020-01-01 01:00:10.5')
+        end = pd.Timestamp('2020-01-01 01:00:50.2')
+
+        for name in ('A', 'B'):
+            lazy[name].trim(start, end)
+            eager[name].trim(start, end)
+
+            self.assertFalse(lazy[name].loaded)
+            self.assertEqual(len(lazy[name]), len(eager[name]))
+            pd.testing.assert_series_equal(
+                lazy[name](), eager[name](), check_dtype=False
+            )
+            np.testing.assert_array_equal(
+                lazy[name].flag().values, eager[name].flag().values
+            )
+
+    def test_trim_outside(self):
+        lazy, eager = self._read(), self._read(lazy=False)
+        start = pd.Timestamp('2020-01-02 00:00:00')
+        end = pd.Timestamp('2020-01-02 01:00:00')
+
+        for name in ('A', 'B'):
+            lazy[name].trim(start, end)
+            eager[name].trim(start, end)
+
+            self.assertFalse(lazy[name].loaded)
+            self.assertEqual(len(lazy[name]), 0)
+            self.assertEqual(len(eager[name]), 0)
+            self.assertEqual(len(lazy[name]()), 0)
+            self.assertEqual(len(lazy[name].flag()), 0)
+            self.assertEqual(len(eager[name]()), 0)
+
+    def test_reopens_closed_handle(self):
+        lazy = self._read()
+        handles.close()
+        np.testing.assert_array_equal(lazy['A'].array[:3], [0, 1, 2])
+
+
+class TestHandlePool(unittest.TestCase):
+    """
+    Tests for the netCDF handle pool.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.paths = []
+        for i in range(3):
+            path = os.path.join(self.tmpdir, '{}.nc'.format(i))
+            netCDF4.Dataset(path, 'w').close()
+            self.paths.append(path)
+
+        self.pool = NetCDFHandlePool(maxsize=2)
+
+    def tearDown(self):
+        self.pool.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_reuse(self):
+        self.assertIs(self.pool.get(self.paths[0]),
+                      self.pool.get(self.paths[0]))
+
+    def test_bounded(self):
+        first = self.pool.get(self.paths[0])
+        self.pool.get(self.paths[1])
+        self.pool.get(self.paths[0])
+        self.pool.get(self.paths[2])
+
+        # The least recently used handle is closed
+        self.assertTrue(first.isopen())
+        self.assertEqual(len(self.pool._handles), 2)
+        self.assertNotIn(self.paths[1], self.pool._handles)
+
+    def test_release(self):
+        owner, other = Dataset(), Dataset()
+        first = self.pool.get(self.paths[0], owner=owner)
+        second = self.pool.get(self.paths[1], owner=other)
+
+        self.pool.release(owner)
+        self.assertFalse(first.isopen())
+        self.assertTrue(second.isopen())
+
+        # Reopened handles are closed by the next release
+        reopened = self.pool.get(self.paths[0])
+        self.pool.release(owner)
+        self.assertFalse(reopened.isopen())
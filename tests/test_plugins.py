@@ -0,0 +1,179 @@
+import os
+import pickle
+import shutil
+import tempfile
+import textwrap
+import unittest
+
+from ppodd.utils.plugins import Plugin, _scan_module, manifest
+
+MODULE = textwrap.dedent('''
+    from ppodd.pod.base import PPBase
+    from ppodd.pod.base import PPBase as Base
+
+
+    class Static(PPBase):
+        inputs = ['A', 'B']
+
+        def declare_outputs(self):
+            self.declare('C', units='m')
+            self.declare('D', units='m')
+            self.declare('C', units='m')
+
+
+    class NoInputs(PPBase):
+        def declare_outputs(self):
+            pass
+
+
+    class DynamicInputs(PPBase):
+        inputs = ['A']
+
+        def __init__(self, *args, **kwargs):
+            self.inputs = ['B']
+
+
+    class DynamicOutputs(PPBase):
+        inputs = ['A']
+
+        def declare_outputs(self):
+            for name in ('C', 'D'):
+                self.declare(name)
+
+
+    class Conditional(PPBase):
+        def declare_outputs(self):
+            self.declare('C')
+            if self.dataset['X']:
+                self.declare('D')
+
+
+    class EarlyReturn(PPBase):
+        def declare_outputs(self):
+            self.declare('C')
+            if not self.dataset['X']:
+                return
+            self.declare('D')
+
+
+    class DeadCode(PPBase):
+        def declare_outputs(self):
+            return
+            self.declare('C')
+
+
+    class Helper(PPBase):
+        def _declare_common(self):
+            self.declare('C')
+
+        def declare_outputs(self):
+            self._declare_common()
+
+
+    class WithBlock(PPBase):
+        def declare_outputs(self):
+            with open('x') as f:
+                self.declare('C')
+            self.declare('D')
+
+        def process(self):
+            if self.dataset['X']:
+                return
+            self.add_output(None)
+
+
+    class Mixin(object):
+        pass
+
+
+    class Mixed(Mixin, PPBase):
+        inputs = ['A']
+
+
+    class NotAPlugin(object):
+        inputs = ['A']
+''')
+
+
+class TestPlugins(unittest.TestCase):
+    """
+    Tests for the static extraction of plugin manifests.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'p_test.py')
+        with open(self.path, 'w') as f:
+            f.write(MODULE)
+
+        self.plugins = {
+            i.name: i for i in _scan_module(self.path, 'p_test', 'PPBase')
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_plugins_found(self):
+        self.assertEqual(sorted(self.plugins), [
+            'Conditional', 'DeadCode', 'DynamicInputs', 'DynamicOutputs',
+            'EarlyReturn', 'Helper', 'Mixed', 'NoInputs', 'Static',
+            'WithBlock'
+        ])
+        self.assertEqual(self.plugins['Static'].module, 'p_test')
+
+    def test_static(self):
+        plugin = self.plugins['Static']
+        self.assertTrue(plugin.static)
+        self.assertEqual(plugin.inputs, ['A', 'B'])
+        self.assertEqual(plugin.outputs, ['C', 'D'])
+
+    def test_default_inputs(self):
+        self.assertEqual(self.plugins['NoInputs'].inputs, [])
+        self.assertEqual(self.plugins['NoInputs'].outputs, [])
+
+    def test_dynamic(self):
+        self.assertIsNone(self.plugins['DynamicInputs'].inputs)
+        self.assertIsNone(self.plugins['DynamicOutputs'].outputs)
+        self.assertEqual(self.plugins['DynamicOutputs'].inputs, ['A'])
+        self.assertFalse(self.plugins['DynamicOutputs'].static)
+
+    def test_conditional(self):
+        self.assertIsNone(self.plugins['Conditional'].outputs)
+        self.assertIsNone(self.plugins['EarlyReturn'].outputs)
+        self.assertIsNone(self.plugins['DeadCode'].outputs)
+        self.assertIsNone(self.plugins['Helper'].outputs)
+        self.assertEqual(self.plugins['WithBlock'].outputs, ['C', 'D'])
+
+    def test_mixin(self):
+        self.assertEqual(self.plugins['Mixed'].inputs, ['A'])
+        self.assertIsNone(self.plugins['Mixed'].outputs)
+
+    def test_pickle(self):
+        plugin = pickle.loads(pickle.dumps(self.plugins['Static']))
+        self.assertEqual(plugin.path, 'p_test:Static')
+        self.assertEqual(plugin.inputs, ['A', 'B'])
+        self.assertEqual(plugin.outputs, ['C', 'D'])
+
+    def test_load(self):
+        plugin = Plugin('Plugin', 'ppodd.utils.plugins')
+        self.assertIs(plugin.load(), Plugin)
+
+
+class TestManifest(unittest.TestCase):
+    """
+    Check that the statically extracted manifest of ppodd.pod agrees with the
+    modules themselves.
+    """
+
+    def test_pod_manifest(self):
+        for plugin in manifest('ppodd.pod', 'PPBase'):
+            _cls = plugin.load()
+            _mod = _cls.test_instance()
+
+            if plugin.inputs is not None:
+                self.assertEqual(plugin.inputs, _mod.inputs, plugin.name)
+
+            if plugin.outputs is not None:
+                self.assertEqual(
+                    list(_mod.declarations), plugin.outputs, plugin.name
+                )
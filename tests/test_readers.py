@@ -0,0 +1,90 @@
+import unittest
+import warnings
+from unittest import mock
+
+import ppodd.readers
+from ppodd.readers import match_reader, register
+from ppodd.readers.base import FileReader
+
+
+class TestReaderDispatch(unittest.TestCase):
+    """
+    Tests for matching files to readers through the reader registry.
+    """
+
+    def setUp(self):
+        # Restore the registry after each test
+        for name in ('reader_patterns', '_pattern_priorities'):
+            patcher = mock.patch.object(
+                ppodd.readers, name, dict(getattr(ppodd.readers, name))
+            )
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        patcher = mock.patch.object(ppodd.readers, '_dispatch', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _reader(self, filename):
+        reader = match_reader(filename)
+        if reader is None:
+            return None
+        return reader.__name__
+
+    def test_builtin_readers(self):
+        expected = {
+            'core_faam_20200101_v004_r0_c001.nc': 'CoreNetCDFReader',
+            'other.nc': 'CoreNetCDFReader',
+            'flight.zip': 'ZipFileReader',
+            'flight-cst_faam_20200101_r0_c001.yaml': 'YamlConstantsReader',
+            'constants.json': 'JsonConstantsReader',
+            'x_faam_20200101.csv': 'CSVReader',
+            'dlu.parquet': 'ArrowFileReader',
+            'AERACK01_TCP_v1.csv': 'CrioDefinitionReader',
+            'AERACK01_20200101_120000_C001': 'TcpFileReader',
+            'SEAPROBE_20200101_120000_C001': 'TcpFileReader',
+            'GINDAT01_20200101.bin': 'GinFileReader',
+            'seaprobe_20200101_C001.wcm': 'WcmFileReader',
+            'nothing.txt': None
+        }
+
+        for filename, reader in expected.items():
+            self.assertEqual(self._reader(filename), reader, filename)
+
+    def test_full_match(self):
+        self.assertIsNone(self._reader('flight.zip.bak'))
+
+    def test_priority(self):
+        @register(patterns=[r'.*\.nc'], priority=10)
+        class Reader(FileReader):
+            def read(self):
+                pass
+
+        self.assertEqual(self._reader('core_faam_x.nc'), 'Reader')
+
+    def test_lazy_import(self):
+        register(patterns=[r'.*\.lazy'])('ppodd.readers.base:FileReader')
+        self.assertIs(match_reader('x.lazy'), FileReader)
+
+    def test_backreferences_and_flags(self):
+        @register(patterns=[r'(ab)\1\.x', r'(?i)upper\.x'], priority=5)
+        class Reader(FileReader):
+            def read(self):
+                pass
+
+        self.assertEqual(self._reader('abab.x'), 'Reader')
+        self.assertIsNone(self._reader('abcd.x'))
+        self.assertEqual(self._reader('UPPER.X'), 'Reader')
+
+    def test_invalid_pattern_ignored(self):
+        @register(patterns=[r'bad(', r'foo(?i)bar'], priority=5)
+        class Reader(FileReader):
+            def read(self):
+                pass
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.assertEqual(self._reader('flight.zip'), 'ZipFileReader')
+
+        self.assertEqual(len(caught), 2)
+        self.assertIsNone(self._reader('foobar'))
@@ -0,0 +1,60 @@
+import unittest
+
+from ppodd.utils.schema import compile_schema
+
+
+class TestSchema(unittest.TestCase):
+    """
+    Tests for the schema validator.
+    """
+
+    def setUp(self):
+        self.validate = compile_schema({
+            'Globals': {'*': object},
+            'Constants': {'*': dict},
+            'Modifications?': {
+                'Exclude?': list,
+                'Number?': (int, float)
+            }
+        }, path='consts')
+
+    def assertInvalid(self, value, message):
+        with self.assertRaises(ValueError) as err:
+            self.validate(value)
+        self.assertEqual(str(err.exception), message)
+
+    def test_valid(self):
+        self.validate({'Globals': {}, 'Constants': {'A': {'B': 1}}})
+        self.validate({
+            'Globals': {'a': [1]}, 'Constants': {},
+            'Modifications': {'Exclude': ['X'], 'Number': 1.5},
+            'Other': 1
+        })
+
+    def test_optional_none(self):
+        self.validate({'Globals': {}, 'Constants': {}, 'Modifications': None})
+        self.validate({
+            'Globals': {}, 'Constants': {},
+            'Modifications': {'Exclude': None}
+        })
+
+    def test_missing_key(self):
+        self.assertInvalid(
+            {'Globals': {}}, "consts: missing required key 'Constants'"
+        )
+
+    def test_wrong_type(self):
+        self.assertInvalid(
+            [], 'consts: expected dict, got list'
+        )
+        self.assertInvalid(
+            {'Globals': {}, 'Constants': {'A': [1]}},
+            'consts.Constants.*: expected dict, got list'
+        )
+        self.assertInvalid(
+            {
+                'Globals': {}, 'Constants': {},
+                'Modifications': {'Number': 'a'}
+            },
+            'consts.Modifications.Number: expected int or float, got str'
+        )
@@ -0,0 +1,168 @@
+import datetime
+import io
+import os
+import shutil
+import tempfile
+import unittest
+import warnings
+from unittest import mock
+
+import numpy as np
+
+from ppodd.decades import DecadesFile
+from ppodd.readers.sea.reader import WcmFileReader
+from ppodd.readers.sea.utils import interp_timestamps, to_dataframe
+
+ELEMENTS = ('TWC', '083', '021', 'CMP', 'DCE')
+C0 = (
+    'c0,1234,TWC,2.1,0.5,1.2,1.0,0.0,083,2.1,0.5,1.2,1.0,0.0,'
+    '021,2.1,0.5,1.2,1.0,0.0,CMP,2.1,0.5,1.2'
+)
+
+
+def wcm(seconds=10, freq=20, corrupt=None, malformed=False):
+    """
+    Build the content of a wcm file, with a d0 sentence at freq Hz and a d3
+    sentence each second.
+    """
+    t0 = datetime.datetime(2020, 1, 1, 12, 0, 0, 130000)
+    lines = []
+    n = 0
+    for s in range(seconds):
+        t = t0 + datetime.timedelta(seconds=s)
+        lines.append(C0)
+        for i in range(freq):
+            values = [
+                '{},{:.1f},{:.1f},{:.1f}'.format(e, n, n + .1, n + .2)
+                for e in ELEMENTS
+            ]
+            if n == corrupt:
+                values[0] = 'TWC,1.x,2.0,3.0'
+            lines.append('d0,' + ','.join(values))
+            n += 1
+
+            if i == 0:
+                lines.append('d3,{},{},150.0,-5.0,800.0,0,30.0'.format(
+                    t.strftime('%Y/%m/%d'), t.strftime('%H:%M:%S.%f')[:-3]
+                ))
+
+        if malformed and s == seconds // 2:
+            lines.append('d0,TWC,1.0,2.0')
+
+    return io.BytesIO(('\n'.join(lines) + '\n').encode())
+
+
+class Dataset(object):
+    """
+    A minimal stand in for a DecadesDataset, which collects inputs and only
+    requires those given.
+    """
+
+    def __init__(self, required):
+        self.required = required
+        self.inputs = {}
+        self.constants = {}
+
+    def add_input(self, variable):
+        self.inputs[variable.name] = variable
+
+    def requires(self, name):
+        return name in self.required
+
+
+class TestSea(unittest.TestCase):
+    """
+    Tests for parsing SEA WCM files.
+    """
+
+    def test_to_dataframe(self):
+        dfs, meta = to_dataframe(wcm())
+
+        self.assertEqual(sorted(dfs), ['c0', 'd0', 'd3'])
+        self.assertEqual(meta['sn'], b'1234')
+        self.assertEqual(meta['elTWC']['l'], 2.1)
+
+        d0 = dfs['d0']
+        self.assertEqual(d0.index.freq, '50ms')
+        self.assertEqual(d0.index[0], np.datetime64('2020-01-01T12:00:00'))
+        self.assertEqual(d0['elTWC'].values[0], b'TWC')
+        self.assertEqual(d0['elTWC_V'].dtype, float)
+
+        # Samples are matched to the nearest time on the regular index
+        self.assertEqual(len(d0), 180)
+        self.assertTrue((np.diff(d0['elTWC_V'].values) >= 0).all())
+
+    def test_malformed_line(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            dfs, _ = to_dataframe(wcm(malformed=True))
+
+        self.assertTrue(any('malformed d0' in str(i.message) for i in caught))
+        self.assertEqual(len(dfs['d0']), 180)
+        self.assertFalse(np.isnan(dfs['d0']['elTWC_T'].values).any())
+
+    def test_corrupt_value(self):
+        dfs, _ = to_dataframe(wcm(corrupt=50))
+        d0 = dfs['d0']
+
+        _row = np.flatnonzero(to_dataframe(wcm())[0]['d0']['elTWC_V'] == 50)
+        self.assertTrue(np.isnan(d0['elTWC_V'].values[_row]).all())
+        self.assertEqual(d0['elTWC_V'].dtype, float)
+        self.assertEqual(np.isnan(d0['elTWC_V'].values).sum(), len(_row))
+        self.assertFalse(np.isnan(d0['el083_V'].values).any())
+
+    def test_interp_timestamps(self):
+        ref_times = np.array(
+            ['2020-01-01T00:00:00', '2020-01-01T00:00:01',
+             '2020-01-01T00:00:03'], dtype='datetime64[us]'
+        )
+        times = interp_timestamps(
+            np.array([0, 5, 10, 15, 30, 35]), np.array([5, 15, 30]),
+            ref_times
+        )
+        np.testing.assert_array_equal(
+            times - ref_times[0],
+            np.array([-500000, 0, 500000, 1000000, 3000000, 3666667],
+                     dtype='timedelta64[us]')
+        )
+
+
+class TestWcmFileReader(unittest.TestCase):
+    """
+    Tests for reading SEA WCM files into a dataset.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'seaprobe_20200101.wcm')
+        with open(self.path, 'wb') as f:
+            f.write(wcm().read())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _read(self, required):
+        _file = DecadesFile(self.path)
+        _file.dataset = Dataset(required)
+
+        reader = WcmFileReader()
+        reader.files = [_file]
+        reader.read()
+
+        return _file.dataset
+
+    def test_only_required_read(self):
+        dataset = self._read({'SEAPROBE_d0_TWC_V', 'SEAPROBE_d3_date'})
+
+        self.assertEqual(
+            sorted(dataset.inputs), ['SEAPROBE_d0_TWC_V', 'SEAPROBE_d3_date']
+        )
+        self.assertEqual(dataset.inputs['SEAPROBE_d0_TWC_V'].frequency, 20)
+        self.assertEqual(dataset.constants['SEA_sn'], b'1234')
+
+    def test_nothing_required(self):
+        with mock.patch.object(DecadesFile, 'open') as _open:
+            dataset = self._read(set())
+
+        _open.assert_not_called()
+        self.assertEqual(dataset.inputs, {})
@@ -0,0 +1,202 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from ppodd.utils.segments import (
+    runs, fill_short_runs, segments, drop_short, dilate, to_mask,
+    segment_sums, segment_means, time_mask, interval_union,
+    interval_intersection
+)
+
+
+class TestRuns(unittest.TestCase):
+    """
+    Tests for run-length encoding.
+    """
+
+    def test_runs(self):
+        starts, stops = runs([1, 1, 2, 2, 2, 1, 3])
+        np.testing.assert_array_equal(starts, [0, 2, 5, 6])
+        np.testing.assert_array_equal(stops, [2, 5, 6, 7])
+
+    def test_runs_nans(self):
+        starts, stops = runs([np.nan, np.nan, 1., 1., np.nan])
+        np.testing.assert_array_equal(starts, [0, 2, 4])
+        np.testing.assert_array_equal(stops, [2, 4, 5])
+
+    def test_runs_empty(self):
+        starts, stops = runs([])
+        self.assertEqual(starts.size, 0)
+        self.assertEqual(stops.size, 0)
+
+    def test_fill_short_runs(self):
+        x = np.array([1, 1, 1, 2, 1, 1, 3, 3, 3])
+        np.testing.assert_array_equal(
+            fill_short_runs(x, 3), [1, 1, 1, 0, 0, 0, 3, 3, 3]
+        )
+        # The input is not modified
+        self.assertEqual(x[3], 2)
+
+
+class TestSegments(unittest.TestCase):
+    """
+    Tests for finding and manipulating segments of a mask.
+    """
+
+    def test_segments(self):
+        starts, stops = segments([0, 1, 1, 0, 0, 1, 0])
+        np.testing.assert_array_equal(starts, [1, 5])
+        np.testing.assert_array_equal(stops, [3, 6])
+
+    def test_segments_at_ends(self):
+        starts, stops = segments([1, 1, 0, 0, 1, 1])
+        np.testing.assert_array_equal(starts, [0, 4])
+        np.testing.assert_array_equal(stops, [2, 6])
+
+        starts, stops = segments(np.ones(5, dtype=bool))
+        np.testing.assert_array_equal(starts, [0])
+        np.testing.assert_array_equal(stops, [5])
+
+        starts, stops = segments(np.zeros(5, dtype=bool))
+        self.assertEqual(starts.size, 0)
+
+    def test_drop_short(self):
+        starts, stops = drop_short(
+            np.array([0, 5, 10]), np.array([2, 9, 11]), 2
+        )
+        np.testing.assert_array_equal(starts, [0, 5])
+        np.testing.assert_array_equal(stops, [2, 9])
+
+    def test_to_mask(self):
+        np.testing.assert_array_equal(
+            to_mask(np.array([1, 2, 6]), np.array([4, 3, 8]), 7),
+            [0, 1, 1, 1, 0, 0, 1]
+        )
+
+    def test_to_mask_clipped(self):
+        np.testing.assert_array_equal(
+            to_mask(np.array([-2, 3]), np.array([1, 3]), 4),
+            [1, 0, 0, 0]
+        )
+
+    def test_mask_roundtrip(self):
+        rng = np.random.default_rng(0)
+        mask = rng.random(1000) > 0.5
+        np.testing.assert_array_equal(to_mask(*segments(mask), 1000), mask)
+
+    def test_dilate(self):
+        index = pd.date_range('2020-01-01', periods=20, freq='1S')
+        mask = np.zeros(20, dtype=bool)
+        mask[[0, 10, 11, 19]] = True
+
+        starts, stops = dilate(*segments(mask), index, before=2, after='3s')
+        np.testing.assert_array_equal(starts, [0, 8, 17])
+        np.testing.assert_array_equal(stops, [4, 15, 20])
+
+        # Equivalent to label slicing the index
+        for start, stop, seg in zip(starts, stops, zip(*segments(mask))):
+            _sel = index.to_series().loc[
+                index[seg[0]] - pd.Timedelta('2s'):
+                index[seg[1] - 1] + pd.Timedelta('3s')
+            ]
+            self.assertEqual(len(_sel), stop - start)
+
+    def test_dilate_onto(self):
+        index = pd.date_range('2020-01-01', periods=10, freq='1S')
+        onto = pd.date_range('2020-01-01', periods=100, freq='100ms')
+
+        starts, stops = dilate(
+            np.array([2]), np.array([4]), index, before=0.5, onto=onto
+        )
+        np.testing.assert_array_equal(starts, [15])
+        np.testing.assert_array_equal(stops, [31])
+
+
+class TestSegmentReductions(unittest.TestCase):
+    """
+    Tests for reducing arrays over segments.
+    """
+
+    def test_segment_sums(self):
+        values = np.arange(10)
+        starts = np.array([0, 3, 5, 8, 4])
+        stops = np.array([3, 3, 10, 12, 2])
+
+        np.testing.assert_array_equal(
+            segment_sums(values, starts, stops), [3, 0, 35, 17, 0]
+        )
+
+    def test_segment_sums_empty(self):
+        self.assertEqual(
+            segment_sums(np.arange(3), np.array([]), np.array([])).size, 0
+        )
+
+    def test_segment_means(self):
+        values = np.array([1., 2., np.nan, 4., 5., 6., np.nan, np.nan])
+        starts = np.array([0, 3, 6])
+        stops = np.array([3, 6, 8])
+
+        np.testing.assert_array_equal(
+            segment_means(values, starts, stops), [1.5, 5., np.nan]
+        )
+
+    def test_segment_means_skips(self):
+        values = np.arange(10, dtype=float)
+        starts = np.array([0, 5])
+        stops = np.array([5, 7])
+
+        np.testing.assert_array_equal(
+            segment_means(values, starts, stops, skip_start=1, skip_end=1),
+            [2., np.nan]
+        )
+
+
+class TestIntervals(unittest.TestCase):
+    """
+    Tests for time intervals.
+    """
+
+    def test_time_mask(self):
+        index = pd.date_range('2020-01-01', periods=10, freq='1S')
+        t0 = index[0].value
+        starts = np.array([t0 + int(1.5e9), t0 + int(8e9)])
+        ends = np.array([t0 + int(3e9), t0 + int(20e9)])
+
+        np.testing.assert_array_equal(
+            time_mask(starts, ends, index),
+            [0, 0, 1, 1, 0, 0, 0, 0, 1, 1]
+        )
+
+    def test_union(self):
+        starts, ends = interval_union([5, 0, 2, 20], [6, 3, 4, 30])
+        np.testing.assert_array_equal(starts, [0, 5, 20])
+        np.testing.assert_array_equal(ends, [4, 6, 30])
+
+    def test_union_contained(self):
+        starts, ends = interval_union([0, 1, 5], [10, 2, 6])
+        np.testing.assert_array_equal(starts, [0])
+        np.testing.assert_array_equal(ends, [10])
+
+    def test_union_empty(self):
+        starts, ends = interval_union([], [])
+        self.assertEqual(starts.size, 0)
+        self.assertEqual(ends.size, 0)
+
+    def test_intersection(self):
+        starts, ends = interval_intersection(
+            [0, 10, 20], [5, 15, 30], [3, 12, 40], [12, 25, 50]
+        )
+        # Intervals in b which share an end point are merged
+        np.testing.assert_array_equal(starts, [3, 10, 20])
+        np.testing.assert_array_equal(ends, [5, 15, 25])
+
+    def test_intersection_many(self):
+        starts, ends = interval_intersection([0], [100], [3, 10], [5, 200])
+        np.testing.assert_array_equal(starts, [3, 10])
+        np.testing.assert_array_equal(ends, [5, 100])
+
+    def test_intersection_disjoint(self):
+        starts, ends = interval_intersection([0], [5], [6], [10])
+        self.assertEqual(starts.size, 0)
+        self.assertEqual(ends.size, 0)
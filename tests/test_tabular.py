@@ -0,0 +1,277 @@
+import os
+import shutil
+import tempfile
+import unittest
+import warnings
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from ppodd.decades import DecadesFile, ZipMemberFile
+from ppodd.readers.tabular import ArrowFileReader, CSVReader
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+
+class Dataset(object):
+    """
+    A minimal stand in for a DecadesDataset, which collects inputs.
+    """
+
+    def __init__(self, time_window=None):
+        self.inputs = {}
+        self.time_window = time_window
+
+    def add_input(self, variable):
+        self.inputs[variable.name] = variable
+
+    def requires(self, name):
+        return True
+
+
+@unittest.skipIf(pa is None, 'pyarrow is not available')
+class TestArrowFileReader(unittest.TestCase):
+    """
+    Tests for reading Parquet and Arrow IPC files.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.time = pd.date_range('2020-01-01 12:00', periods=10, freq='1S')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _table(self, time=None, rows=10, metadata=None):
+        if time is None:
+            time = self.time[:rows]
+        rows = len(time)
+
+        fields = [
+            pa.field('time', pa.timestamp('ns')),
+            pa.field('A', pa.float64()),
+            pa.field(
+                'B', pa.list_(pa.float32(), 4),
+                metadata={'units': 'K', 'long_name': 'Four per row'}
+            )
+        ]
+
+        return pa.table(
+            [
+                pa.array(time.values),
+                pa.array(np.arange(rows, dtype=float)),
+                pa.FixedSizeListArray.from_arrays(
+                    pa.array(np.arange(4 * rows, dtype=np.float32)), 4
+                )
+            ],
+            schema=pa.schema(fields, metadata=metadata)
+        )
+
+    def _read(self, table, filename='dlu.parquet', time_window=None,
+              member=False):
+        path = os.path.join(self.tmpdir, filename)
+        if filename.endswith('.parquet'):
+            pq.write_table(table, path)
+        else:
+            pyarrow.feather.write_feather(table, path)
+
+        if member:
+            archive = os.path.join(self.tmpdir, 'flight.zip')
+            with zipfile.ZipFile(archive, 'w') as zf:
+                zf.write(path, filename)
+            with zipfile.ZipFile(archive) as zf:
+                _file = ZipMemberFile(archive, zf.getinfo(filename))
+        else:
+            _file = DecadesFile(path)
+
+        _file.dataset = Dataset(time_window=time_window)
+
+        reader = ArrowFileReader()
+        reader.files = [_file]
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            reader.read()
+
+        return _file.dataset.inputs, [str(i.message) for i in caught]
+
+    def test_scalar(self):
+        inputs, caught = self._read(self._table())
+
+        a = inputs['A']
+        self.assertEqual(caught, [])
+        self.assertEqual(a.frequency, 1)
+        self.assertEqual(a.units, 'RAW')
+        self.assertEqual(a.t0, self.time[0])
+        self.assertEqual(a.t1, self.time[-1])
+        np.testing.assert_array_equal(a.array, np.arange(10))
+
+    def test_list(self):
+        inputs, _ = self._read(self._table())
+
+        b = inputs['B']
+        self.assertEqual(b.frequency, 4)
+        self.assertEqual(b.units, 'K')
+        self.assertEqual(b.long_name, 'Four per row')
+        np.testing.assert_array_equal(b.array, np.arange(40))
+        pd.testing.assert_index_equal(
+            b().index,
+            pd.date_range(self.time[0], periods=40, freq='250ms'),
+            check_names=False
+        )
+
+    def test_ipc_member(self):
+        inputs, _ = self._read(
+            self._table(), filename='dlu.arrow', member=True
+        )
+        np.testing.assert_array_equal(inputs['A'].array, np.arange(10))
+        np.testing.assert_array_equal(inputs['B'].array, np.arange(40))
+
+    def test_frequency_metadata(self):
+        inputs, _ = self._read(self._table(metadata={'frequency': '2'}))
+        self.assertEqual(inputs['A'].frequency, 2)
+        self.assertEqual(inputs['B'].frequency, 8)
+
+    def test_single_row(self):
+        inputs, caught = self._read(self._table(rows=1))
+
+        self.assertIn('fewer than two timestamps', caught[0])
+        self.assertEqual(inputs['A'].frequency, 1)
+        self.assertEqual(inputs['B'].frequency, 4)
+        np.testing.assert_array_equal(inputs['B'].array, np.arange(4))
+
+    def test_sub_hz(self):
+        time = pd.date_range('2020-01-01 12:00', periods=5, freq='10S')
+        inputs, caught = self._read(self._table(time=time))
+
+        self.assertIn('less than 1 Hz', caught[0])
+
+        a = inputs['A']
+        self.assertEqual(a.frequency, 1)
+        self.assertEqual(len(a), 41)
+        np.testing.assert_array_equal(a.array[::10], np.arange(5))
+        self.assertTrue(np.isnan(a.array[5::10]).all())
+
+    def test_time_window(self):
+        time = self.time.tz_localize('UTC').tz_convert('Europe/Paris')
+        table = self._table().set_column(
+            0, pa.field('time', pa.timestamp('ns', tz='Europe/Paris')),
+            pa.array(time)
+        )
+
+        inputs, _ = self._read(table, time_window=(
+            pd.Timestamp('2020-01-01 12:00:02'),
+            pd.Timestamp('2020-01-01 12:00:05')
+        ))
+
+        a = inputs['A']
+        self.assertEqual(a.t0, self.time[2])
+        self.assertEqual(a.t1, self.time[5])
+        np.testing.assert_array_equal(a.array, [2, 3, 4, 5])
+
+
+class TestCSVReader(unittest.TestCase):
+    """
+    Tests for reading csv files.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.time = pd.date_range('2020-01-01 12:00', periods=20, freq='1S')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _read(self, lines, **kwargs):
+        path = os.path.join(self.tmpdir, 'data.csv')
+        with open(path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+
+        _file = DecadesFile(path)
+        _file.dataset = Dataset()
+
+        reader = CSVReader()
+        reader.files = [_file]
+        for key, value in kwargs.items():
+            setattr(reader, key, value)
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            reader.read()
+
+        return _file.dataset.inputs, [str(i.message) for i in caught]
+
+    def _lines(self, time, time_format='%Y-%m-%d %H:%M:%S'):
+        return ['time,A,B'] + [
+            '{},{},{}'.format(t.strftime(time_format), i, i / 2)
+            for i, t in enumerate(time)
+        ]
+
+    def test_chunked(self):
+        inputs, caught = self._read(self._lines(self.time), chunksize=7)
+
+        self.assertEqual(caught, [])
+        self.assertEqual(sorted(inputs), ['CSV_A', 'CSV_B'])
+
+        a = inputs['CSV_A']
+        self.assertEqual(a.frequency, 1)
+        self.assertEqual(a.array.dtype.kind, 'i')
+        self.assertEqual(a.t0, self.time[0])
+        self.assertEqual(a.t1, self.time[-1])
+        np.testing.assert_array_equal(a.array, np.arange(20))
+        np.testing.assert_array_equal(inputs['CSV_B'].array, np.arange(20) / 2)
+
+    def test_time_formats(self):
+        time = pd.date_range('2020-01-01 12:00', periods=20, freq='250ms')
+        inputs, caught = self._read(
+            self._lines(time, time_format='%Y-%m-%dT%H:%M:%S.%f')
+        )
+
+        a = inputs['CSV_A']
+        self.assertEqual(caught, [])
+        self.assertEqual(a.frequency, 4)
+        pd.testing.assert_index_equal(a().index, time, check_names=False)
+
+    def test_time_format(self):
+        inputs, _ = self._read(
+            self._lines(self.time, time_format='%d/%m/%Y %H:%M:%S'),
+            time_format='%d/%m/%Y %H:%M:%S'
+        )
+
+        a = inputs['CSV_A']
+        self.assertEqual(a.t0, self.time[0])
+        self.assertEqual(a.t1, self.time[-1])
+
+    def test_irregular(self):
+        # The gap is only in the last chunk, so all chunks must be checked
+        time = self.time.delete(15)
+        inputs, caught = self._read(self._lines(time), chunksize=7)
+
+        self.assertEqual(len(caught), 1)
+        self.assertIn('irregular timestamps, assuming 1 Hz', caught[0])
+
+        a = inputs['CSV_A']
+        self.assertEqual(a.frequency, 1)
+        self.assertEqual(len(a), 20)
+        np.testing.assert_array_equal(a()[time].values, np.arange(19))
+
+    def test_non_numeric(self):
+        lines = ['time,A,S'] + [
+            '{},{},{}'.format(t.strftime('%Y-%m-%d %H:%M:%S'), i, 'on')
+            for i, t in enumerate(self.time)
+        ]
+        lines[10] = lines[10].replace(',on', ',off')
+
+        inputs, _ = self._read(lines, chunksize=7)
+
+        self.assertEqual(inputs['CSV_A'].array.dtype.kind, 'i')
+
+        s = inputs['CSV_S'].array
+        self.assertEqual(s.dtype, object)
+        self.assertEqual(s[9], 'off')
+        self.assertEqual(list(s[:9]), ['on'] * 9)
@@ -0,0 +1,96 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from ppodd.decades import DecadesFile
+from ppodd.readers.tcp import CrioDefinitionReader, TcpFileReader
+
+DEFINITION = '''field,length,bytes_per_point,type,description
+$PRTAFT01,9,9,text,Identifier
+packet_length,2,2,>unsigned_int,Packet length
+utc_time,4,4,>unsigned_int,UTC time
+deiced_temp_sensor,2,2,>unsigned_int,Deiced temperature
+nondeiced_temp_sensor,2,2,>unsigned_int,Non-deiced temperature
+fast,8,2,>unsigned_int,Fast data
+'''
+
+
+class Dataset(object):
+    """
+    A minimal stand in for a DecadesDataset, which collects inputs and only
+    requires those given.
+    """
+
+    def __init__(self, definitions, required):
+        self.definitions = definitions
+        self.required = required
+        self.inputs = {}
+
+    def add_input(self, variable):
+        self.inputs[variable.name] = variable
+
+    def requires(self, name):
+        return name in self.required
+
+
+class TestTcpFileReader(unittest.TestCase):
+    """
+    Tests for reading DLU binary files.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.definition = CrioDefinitionReader()._parse(DEFINITION)
+
+        n = 10
+        data = np.zeros(n, dtype=self.definition.dtypes)
+        data['$PRTAFT01'] = b'$PRTAFT01'
+        data['packet_length'] = self.definition.packet_length
+        data['utc_time'] = 1577880000 + np.arange(n)
+        data['deiced_temp_sensor'] = np.arange(n)
+        data['nondeiced_temp_sensor'] = np.arange(n) + 100
+        data['fast'] = np.arange(4 * n).reshape(n, 4)
+
+        self.path = os.path.join(
+            self.tmpdir, 'PRTAFT01_20200101_120000_c001'
+        )
+        data.tofile(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _read(self, required):
+        _file = DecadesFile(self.path)
+        _file.dataset = Dataset([self.definition], required)
+
+        reader = TcpFileReader()
+        reader.files = [_file]
+        reader.read()
+
+        return _file
+
+    def test_only_required_read(self):
+        _file = self._read({'PRTAFT_deiced_temp_sensor', 'PRTAFT_fast'})
+
+        inputs = _file.dataset.inputs
+        self.assertEqual(
+            sorted(inputs), ['PRTAFT_deiced_temp_sensor', 'PRTAFT_fast']
+        )
+        np.testing.assert_array_equal(
+            inputs['PRTAFT_deiced_temp_sensor'].array, np.arange(10)
+        )
+        self.assertEqual(inputs['PRTAFT_fast'].frequency, 4)
+        np.testing.assert_array_equal(
+            inputs['PRTAFT_fast'].array, np.arange(40)
+        )
+
+    def test_nothing_required(self):
+        with mock.patch.object(DecadesFile, 'buffer') as _buffer:
+            _file = self._read(set())
+
+        _buffer.assert_not_called()
+        self.assertEqual(_file.dataset.inputs, {})
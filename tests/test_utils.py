@@ -0,0 +1,176 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from ppodd.utils import flagged_avg, slrs
+from ppodd.utils.segments import time_mask
+
+
+def groupby_flagged_avg(df, flag_col, data_col, flag_value=1, skip_start=0,
+                        skip_end=0, interp=False):
+    """
+    The original groupby implementation of flagged_avg, for comparison.
+    Returns the averaged series, rather than modifying df.
+    """
+    groups = (df[flag_col] != df[flag_col].shift()).cumsum()
+    groups[df[flag_col] != flag_value] = np.nan
+    groups.dropna(inplace=True)
+
+    _groups = df.groupby(groups)
+
+    means = pd.Series(
+        _groups.apply(
+            lambda x: x[data_col].iloc[skip_start:len(x) - skip_end].mean()
+        ).values,
+        index=_groups.apply(lambda x: x.index[int(len(x) / 2)])
+    )
+
+    if interp:
+        return means.reindex(
+            df.index.union(means.index).sort_values()
+        ).interpolate().loc[df.index]
+
+    out = pd.Series(np.nan, index=df.index)
+    out.loc[means.index] = means.values
+    return out
+
+
+class TestFlaggedAvg(unittest.TestCase):
+    """
+    Tests for averaging data over periods where a flag is set.
+    """
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n = 200
+
+        # Flag periods of varying length, including some shorter than
+        # skip_start + skip_end
+        flag = np.zeros(n)
+        for start, length in ((5, 30), (50, 3), (60, 1), (80, 5), (120, 50),
+                              (190, 10)):
+            flag[start:start + length] = 1
+
+        a = rng.normal(0, 1, n)
+        a[130] = np.nan
+
+        self.df = pd.DataFrame({
+            'FLAG': flag,
+            'A': a,
+            'B': rng.normal(10, 1, n)
+        }, index=pd.date_range('2020-01-01', periods=n, freq='1S'))
+
+    def _compare(self, **kwargs):
+        df = self.df.copy()
+        flagged_avg(df, 'FLAG', ['A', 'B'], out_name=['A_AVG', 'B_AVG'],
+                    **kwargs)
+
+        for col in ('A', 'B'):
+            expected = groupby_flagged_avg(self.df, 'FLAG', col, **kwargs)
+            np.testing.assert_allclose(
+                df['{}_AVG'.format(col)].values, expected.values
+            )
+
+    def test_columns(self):
+        self._compare()
+
+    def test_columns_interp(self):
+        self._compare(interp=True)
+
+    def test_skip(self):
+        self._compare(skip_start=2, skip_end=3)
+
+    def test_skip_interp(self):
+        self._compare(skip_start=2, skip_end=3, interp=True)
+
+    def test_short_segments(self):
+        df = self.df.copy()
+        flagged_avg(df, 'FLAG', 'A', skip_start=2, skip_end=3)
+
+        # Periods no longer than skip_start + skip_end have no mean
+        self.assertTrue(np.isnan(df['A_FLAG'].values[[51, 60, 82]]).all())
+        self.assertEqual(np.sum(~np.isnan(df['A_FLAG'].values)), 3)
+
+    def test_single_column(self):
+        df = self.df.copy()
+        flagged_avg(df, 'FLAG', 'A', skip_start=1, out_name='OUT')
+        np.testing.assert_allclose(
+            df['OUT'].values,
+            groupby_flagged_avg(self.df, 'FLAG', 'A', skip_start=1).values
+        )
+
+
+class TestSlrs(unittest.TestCase):
+    """
+    Tests for identifying straight and level runs.
+    """
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.index = pd.date_range('2020-01-01', periods=2000, freq='1S')
+
+        wow = np.zeros(2000)
+        wow[:100] = 1
+
+        ps = 500 + rng.normal(0, 0.1, 2000)
+
+        # A turn, and a climb
+        roll = rng.normal(0, 0.1, 2000)
+        roll[800:830] = 20
+        ps[1500:1600] = np.linspace(500, 400, 100)
+        ps[1600:] -= 100
+
+        self.wow = pd.Series(wow, index=self.index)
+        self.ps = pd.Series(ps, index=self.index)
+        self.roll = pd.Series(roll, index=self.index)
+
+    def _mask(self, starts, ends):
+        return time_mask(starts, ends, self.index)
+
+    def test_slrs(self):
+        starts, ends = slrs(self.wow, self.ps, self.roll)
+
+        self.assertEqual(starts.dtype, np.int64)
+        self.assertEqual(len(starts), 3)
+        self.assertTrue(((ends - starts) / 1e9 + 1 >= 120).all())
+
+        mask = self._mask(starts, ends)
+        self.assertFalse(mask[:100].any())
+        self.assertFalse(mask[800:835].any())
+        self.assertFalse(mask[1500:1600].any())
+        self.assertTrue(mask[300:700].all())
+
+    def test_min_length(self):
+        starts, ends = slrs(self.wow, self.ps, self.roll, min_length=800)
+        self.assertEqual(len(starts), 0)
+        self.assertEqual(len(ends), 0)
+
+    def test_max_length(self):
+        starts, ends = slrs(self.wow, self.ps, self.roll)
+        split_starts, split_ends = slrs(
+            self.wow, self.ps, self.roll, max_length=200
+        )
+
+        lengths = (split_ends - split_starts) / 1e9 + 1
+        self.assertTrue((lengths <= 200).all())
+        self.assertTrue((lengths >= 120).all())
+        self.assertTrue((np.diff(split_starts) > 0).all())
+        self.assertGreater(len(split_starts), len(starts))
+
+        # Split runs are contiguous within the original runs, and only
+        # remainders shorter than min_length are dropped
+        full = self._mask(starts, ends)
+        split = self._mask(split_starts, split_ends)
+        self.assertFalse((split & ~full).any())
+
+        for start, end in zip(starts, ends):
+            _run = (self.index.asi8 >= start) & (self.index.asi8 <= end)
+            _rem = _run.sum() % 200
+            self.assertEqual(
+                (split & _run).sum(), _run.sum() - (_rem if _rem < 120 else 0)
+            )
+
+    def test_invalid_max_length(self):
+        with self.assertRaises(ValueError):
+            slrs(self.wow, self.ps, self.roll, max_length=60)
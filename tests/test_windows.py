@@ -0,0 +1,63 @@
+import unittest
+
+import numpy as np
+
+from ppodd.utils.windows import sliding_max, sliding_min, sliding_ptp
+
+
+def naive(x, window, func, partial=False):
+    """Reduce x over sliding windows, one window at a time."""
+    count = len(x) if partial else len(x) - window + 1
+    return np.array([func(x[i:i + window]) for i in range(max(count, 0))])
+
+
+class TestWindows(unittest.TestCase):
+    """
+    Tests for sliding window reductions, against reducing each window in
+    turn.
+    """
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.x = rng.normal(size=257)
+        self.nans = self.x.copy()
+        self.nans[[0, 40, 41, 200, 256]] = np.nan
+
+    def assertMatches(self, x, window, partial=False):
+        for func, ref in ((sliding_max, np.max), (sliding_min, np.min),
+                          (sliding_ptp, np.ptp)):
+            np.testing.assert_array_equal(
+                func(x, window, partial=partial),
+                naive(x, window, ref, partial=partial)
+            )
+
+    def test_windows(self):
+        for window in (1, 2, 3, 16, 64, 100, 256, 257):
+            self.assertMatches(self.x, window)
+            self.assertMatches(self.x, window, partial=True)
+
+    def test_nans(self):
+        for window in (1, 2, 5, 64):
+            self.assertMatches(self.nans, window)
+            self.assertMatches(self.nans, window, partial=True)
+
+    def test_window_of_one(self):
+        np.testing.assert_array_equal(sliding_max(self.nans, 1), self.nans)
+        np.testing.assert_array_equal(sliding_ptp(self.x, 1), 0)
+
+    def test_window_longer_than_data(self):
+        self.assertEqual(len(sliding_max(self.x, 300)), 0)
+        self.assertEqual(len(sliding_max(self.x, 300, partial=True)), 257)
+        np.testing.assert_array_equal(
+            sliding_max(self.x, 300, partial=True)[0], self.x.max()
+        )
+
+    def test_integers(self):
+        x = np.arange(10)
+        result = sliding_max(x, 3)
+        self.assertEqual(result.dtype, float)
+        np.testing.assert_array_equal(result, np.arange(2, 10))
+
+    def test_invalid_window(self):
+        with self.assertRaises(ValueError):
+            sliding_max(self.x, 0)
@@ -0,0 +1,237 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from ppodd.pod import p_turbwinds
+
+from ppodd.utils.winds import lever_arm, rotation, tas_vector, wind_vector
+
+MATMUL = 'ij...,jk...->ik...'
+DOT = 'ij...,j...->i...'
+
+
+def einsum_winds(vn, ve, vz, r, th, ph, rdot, thdot, phdot, tas, alpha, beta,
+                 l):
+    """The wind calculation, composing rotation matrices with np.einsum."""
+    n = len(r)
+    _0, _1 = np.zeros(n), np.ones(n)
+
+    A1 = np.array([
+        [_1, _0, _0], [_0, np.cos(r), -np.sin(r)], [_0, np.sin(r), np.cos(r)]
+    ])
+    A2 = np.array([
+        [np.cos(th), _0, -np.sin(th)], [_0, _1, _0],
+        [np.sin(th), _0, np.cos(th)]
+    ])
+    A3 = np.array([
+        [np.cos(ph), np.sin(ph), _0], [-np.sin(ph), np.cos(ph), _0],
+        [_0, _0, _1]
+    ])
+
+    R = np.einsum(MATMUL, np.einsum(MATMUL, A3, A2), A1)
+
+    tas_p = tas / (1 + np.tan(beta)**2 + np.tan(alpha)**2)**.5
+    TAS = np.array([-tas_p, -tas_p * np.tan(beta), tas_p * np.tan(alpha)])
+    TASR = np.einsum(DOT, R, TAS)
+
+    LEV_L = (
+        np.array([_0, _0, -phdot])
+        + np.einsum(DOT, A3, np.array([_0, -thdot, _0]))
+        + np.einsum(
+            DOT, np.einsum(MATMUL, A3, A2), np.array([rdot, _0, _0])
+        )
+    )
+    LEV_R = np.einsum(DOT, R, l)
+    LEV = np.cross(LEV_L.T, LEV_R.T).T
+
+    return np.array([vn, ve, vz]) + TASR + LEV, R, TASR, LEV
+
+
+def inputs(n, dtype=np.float32, seed=0):
+    """Synthetic GIN and turbulence probe inputs, with occasional gaps."""
+    rng = np.random.default_rng(seed)
+
+    def _series(mean, sd, deg=False):
+        _x = (mean + rng.normal(0, sd, n)).astype(dtype)
+        _x[rng.random(n) < 0.01] = np.nan
+        return np.deg2rad(_x) if deg else _x
+
+    return [
+        _series(100, 10), _series(0, 10), _series(0, 1),
+        _series(0, 10, True), _series(3, 2, True), _series(90, 90, True),
+        _series(0, 2, True), _series(0, 2, True), _series(0, 2, True),
+        _series(120, 10), _series(4, 2, True), _series(0, 1, True),
+        [16, -1, -.5]
+    ]
+
+
+class TestWinds(unittest.TestCase):
+    """
+    Tests that the element-wise wind calculation is identical to composing
+    rotation matrices with np.einsum.
+    """
+
+    def setUp(self):
+        self.args = inputs(5000)
+        self.expected, self.R, self.TASR, self.LEV = einsum_winds(*self.args)
+
+    def test_wind_vector(self):
+        np.testing.assert_array_equal(wind_vector(*self.args), self.expected)
+
+    def test_chunks(self):
+        for chunk_size in (None, 1, 777, 1000, 5000, 10000):
+            np.testing.assert_array_equal(
+                wind_vector(*self.args, chunk_size=chunk_size),
+                self.expected, err_msg=str(chunk_size)
+            )
+
+    def test_out(self):
+        out = np.full((3, 5000), -1.)
+        result = wind_vector(*self.args, chunk_size=777, out=out)
+        self.assertIs(result, out)
+        np.testing.assert_array_equal(out, self.expected)
+
+    def test_double_precision(self):
+        args = inputs(1000, dtype=np.float64)
+        np.testing.assert_array_equal(
+            wind_vector(*args, chunk_size=333), einsum_winds(*args)[0]
+        )
+
+    def test_nans(self):
+        _nan = np.zeros(5000, dtype=bool)
+        for i in self.args[:-1]:
+            _nan |= np.isnan(i)
+
+        self.assertTrue(_nan.any())
+        result = wind_vector(*self.args)
+        np.testing.assert_array_equal(np.isnan(result).any(axis=0), _nan)
+
+    def test_empty(self):
+        args = inputs(0)
+        self.assertEqual(wind_vector(*args).shape, (3, 0))
+
+    def test_components(self):
+        r, th, ph, rdot, thdot, phdot = self.args[3:9]
+        tas, alpha, beta, l = self.args[9:]
+
+        R = rotation(r, th, ph)
+        np.testing.assert_array_equal(R, self.R)
+        np.testing.assert_array_equal(
+            tas_vector(R, tas, alpha, beta), self.TASR
+        )
+        np.testing.assert_array_equal(
+            lever_arm(r, th, ph, rdot, thdot, phdot, l), self.LEV
+        )
+
+    def test_rotation_orthonormal(self):
+        rng = np.random.default_rng(1)
+        r, th, ph = rng.uniform(-np.pi, np.pi, (3, 100))
+
+        R = rotation(r, th, ph)
+        RRt = np.einsum('ij...,kj...->ik...', R, R)
+
+        np.testing.assert_allclose(
+            RRt, np.broadcast_to(np.eye(3)[..., None], RRt.shape), atol=1e-12
+        )
+        np.testing.assert_allclose(
+            np.linalg.det(np.moveaxis(R, -1, 0)), 1, atol=1e-12
+        )
+
+
+def full_series_calibration(module):
+    """
+    Fit the AOA and AOSS corrections as TurbulentWinds did before the
+    calibration was restricted to the fitted subsets, evaluating the
+    turbulence probe and winds over the full series at each step. Returns the
+    fitted corrections and the resulting data.
+    """
+    module.get_dataframe(
+        method='onto', index=module.dataset['PS_RVSM'].index,
+        circular=('HDG_GIN',)
+    )
+    d = module.d
+    d['WOW_IND'] = d['WOW_IND'].ffill()
+
+    consts = {
+        i: module.dataset[i] for i in
+        ('AOA_A0', 'AOA_A1', 'AOSS_B0', 'AOSS_B1', 'TASCOR1', 'TOLER',
+         'INSPOSN', 'BETA_COR', 'ALPHA_COR')
+    }
+
+    _slrs = p_turbwinds.time_mask(
+        *p_turbwinds.slrs(d.WOW_IND, d.PS_RVSM, d.ROLL_GIN), d.index
+    )
+    _in_roll = d.ROLL_GIN.abs() > 10
+
+    for i in range(2):
+        ws = []
+        alphas = [-2, 2]
+        for alpha in alphas:
+            consts['ALPHA_COR'] = [alpha, 1]
+            _d = p_turbwinds.p_turb(d.copy(deep=True), consts)
+            _d = p_turbwinds.p_winds(_d, consts)
+            ws.append(_d.W_C[_slrs].mean())
+        fit = np.polyfit(ws, alphas, 1)
+        consts['ALPHA_COR'] = [np.polyval(fit, 0), 1]
+
+        covs = []
+        betas = [-2, 2]
+        for beta in betas:
+            consts['BETA_COR'] = [beta, 1]
+            _d = p_turbwinds.p_turb(d.copy(deep=True), consts)
+            _d = p_turbwinds.p_winds(_d, consts)
+            covs.append(
+                np.cov(_d.W_C[_in_roll], _d.ROLL_GIN[_in_roll])[0, 1]
+            )
+        fit = np.polyfit(covs, betas, 1)
+        consts['BETA_COR'] = [np.polyval(fit, 0), 1]
+
+    d = p_turbwinds.p_winds(p_turbwinds.p_turb(d, consts), consts)
+
+    return consts, d
+
+
+def turbulent_winds():
+    """
+    A TurbulentWinds test instance, with the roll angle varying during turns
+    so that the sideslip correction can be fitted.
+    """
+    module = p_turbwinds.TurbulentWinds.test_instance()
+
+    roll = module.dataset['ROLL_GIN']
+    _roll = roll.array.astype(float)
+    _turns = np.abs(_roll) > 10
+    _roll[_turns] += 5 * np.sin(np.arange(_turns.sum()) / 20)
+    roll.array = _roll
+
+    return module
+
+
+class TestTurbulentWinds(unittest.TestCase):
+    """
+    Check that calibrating TurbulentWinds on only the straight and level and
+    high roll samples gives the same result as evaluating the full series.
+    """
+
+    def test_calibration(self):
+        module = turbulent_winds()
+        consts, expected = full_series_calibration(module)
+
+        with mock.patch.object(
+            p_turbwinds, '_correct', wraps=p_turbwinds._correct
+        ) as _correct:
+            module.process()
+
+        # The corrections are updated in place, so the last call holds those
+        # finally fitted
+        fitted = _correct.call_args[0][2]
+        for key in ('ALPHA_COR', 'BETA_COR'):
+            self.assertFalse(np.isnan(fitted[key][0]))
+            np.testing.assert_allclose(fitted[key], consts[key], rtol=1e-9)
+
+        for name in ('AOA', 'AOSS', 'TAS', 'PSP_TURB', 'U_C', 'V_C', 'W_C'):
+            np.testing.assert_allclose(
+                module.outputs[name].array, expected[name].values,
+                rtol=1e-6, err_msg=name
+            )